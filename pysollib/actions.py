@@ -755,7 +755,7 @@ class PysolMenubar(PysolMenubarTk):
                 if not self.game.areYouSure(_("Play demo")):
                     return
         # self.app.demo_counter = 0
-        self.game.startDemo(mixed=mixed)
+        self.game.startDemo(mixed=mixed, turbo=self.app.opt.demo_turbo)
 
     #
     # Options menu
@@ -147,6 +147,11 @@ class Application:
             stats=os.path.join(self.dn.config, "statistics.dat"),
             holdgame=os.path.join(self.dn.config, "holdgame.dat"),
             comments=os.path.join(self.dn.config, "comments.dat"),
+            solver_versions=os.path.join(self.dn.config,
+                                         "solver_versions.json"),
+            solver_results=os.path.join(self.dn.config,
+                                        "solver_results.json"),
+            matrix_pdb=os.path.join(self.dn.config, "matrix_pdb_4x4.dat"),
         )
         for k, v in self.dn.__dict__.items():
             if os.name == "nt":
@@ -460,7 +465,7 @@ class Application:
         # start demo/autoplay
         if self.nextgame.startdemo:
             self.nextgame.startdemo = 0
-            self.game.startDemo()
+            self.game.startDemo(turbo=self.opt.demo_turbo)
             self.game.createDemoInfoText()
         elif autoplay:
             self.game.autoPlay()
@@ -25,6 +25,7 @@
 import math
 import time
 import traceback
+from collections import OrderedDict
 from pickle import Pickler, Unpickler, UnpicklingError
 
 import attr
@@ -35,7 +36,7 @@ from pysol_cards.random import random__int2str
 from pysollib.game.dump import pysolDumpGame
 from pysollib.gamedb import GI
 from pysollib.help import help_about
-from pysollib.hint import DefaultHint
+from pysollib.hint import DefaultHint, HintCache, LookaheadHint
 from pysollib.mfxutil import Image, ImageTk, USE_PIL
 from pysollib.mfxutil import Struct, SubclassResponsibility, destruct
 from pysollib.mfxutil import format_time, print_err
@@ -397,6 +398,48 @@ class GameHints(NewStruct):
     list = attr.ib(default=None)
     index = attr.ib(default=-1)
     level = attr.ib(default=-1)
+    cache = attr.ib(factory=HintCache)
+    transpositions = attr.ib(factory=lambda: HintCache(maxsize=20000))
+    searching = attr.ib(default=False)    # see LookaheadHint
+
+
+class GameSnapshots:
+    # An ordered set of position hashes (see Game.getSnapshot) with
+    # O(1) membership tests. If maxlen is set, the oldest snapshots
+    # are dropped first. Saved games store it as a plain list.
+
+    def __init__(self, snapshots=(), maxlen=None):
+        self.maxlen = maxlen
+        self._sn = OrderedDict()
+        for sn in snapshots:
+            self.append(sn)
+
+    def __contains__(self, sn):
+        return sn in self._sn
+
+    def __iter__(self):
+        return iter(self._sn)
+
+    def __len__(self):
+        return len(self._sn)
+
+    def append(self, sn):
+        if sn in self._sn:
+            return
+        self._sn[sn] = None
+        if self.maxlen is not None and len(self._sn) > self.maxlen:
+            self._sn.popitem(last=False)
+
+    def clear(self):
+        self._sn.clear()
+
+    def compact(self, maxlen):
+        # keep only the newest maxlen snapshots
+        while len(self._sn) > maxlen:
+            self._sn.popitem(last=False)
+
+    def tolist(self):
+        return list(self._sn)
 
 
 @attr.s
@@ -530,6 +573,10 @@ class Game(object):
     # the format for a saved game changed (see also canLoadGame())
     GAME_VERSION = 1
 
+    # upper bound of the snapshot stores (None means unbounded); the
+    # oldest snapshots are dropped first
+    MAX_SNAPSHOTS = 100000
+
     # only basic initialization here
     def __init__(self, gameinfo):
         self.preview = 0
@@ -547,8 +594,10 @@ class Game(object):
         self.stackmap = {}              # dict with (x,y) tuples as key
         self.allstacks = []
         self.sn_groups = []  # snapshot groups; list of list of similar stacks
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.zobrist_hash = 0  # position hash; sum of all stack hashes
+        self.position_hash = 0  # the same, but also depends on stack ids
+        self.snapshots = self.createSnapshots()
+        self.failed_snapshots = self.createSnapshots()
         self.stackdesc_list = []
         self.demo_logo = None
         self.pause_logo = None
@@ -750,6 +799,32 @@ class Game(object):
         self.canvas.setInitialSize(self.width, self.height)
         self.busy = old_busy
 
+    # create the game without a view (see pysollib.headless)
+    def createHeadless(self, app):
+        old_busy = self.busy
+        self.__createCommon(app)
+        self.preview = max(1, self.canvas.preview)
+        # create the game
+        self.createGame()
+        # set some defaults
+        self.createSnGroups()
+        # convert stackgroups to tuples (speed)
+        self.allstacks = tuple(self.allstacks)
+        self.sg.to_tuples()
+        self.s.to_tuples()
+        # init the stack view
+        for stack in self.allstacks:
+            stack.prepareStack()
+            stack.assertStack()
+        self.optimizeRegions()
+        # create cards
+        if not self.cards:
+            self.cards = self.createCards()
+        hint_class = self.getHintClass()
+        if hint_class is not None:
+            self.Stuck_Class = hint_class(self, 0)
+        self.busy = old_busy
+
     def destruct(self):
         # help breaking circular references
         for obj in self.cards:
@@ -766,8 +841,8 @@ class Game(object):
         self.hints = GameHints()
         self.saveinfo = GameSaveInfo()
         self.loadinfo = GameLoadInfo()
-        self.snapshots = []
-        self.failed_snapshots = []
+        self.snapshots = self.createSnapshots()
+        self.failed_snapshots = self.createSnapshots()
         # local statistics are reset on each game restart
         self.stats = GameStatsStruct()
         self.startMoves()
@@ -1135,21 +1210,19 @@ class Game(object):
     def leaveState(self, old_state):
         self.moves.state = old_state
 
-    def getSnapshotHash(self):
-        # generate hash (unique string) of current move
-        sn = []
-        for stack in self.allstacks:
-            s = []
-            for card in stack.cards:
-                s.append('%d%03d%d' % (card.suit, card.rank, card.face_up))
-            sn.append(''.join(s))
-        sn = '-'.join(sn)
-        return sn
-
     def getSnapshot(self):
-        # optimisation
-        sn = hash(self.getSnapshotHash())
-        return sn
+        # the incrementally updated position hash; equal for positions
+        # that only differ by a permutation of stacks within a snapshot
+        # group (see pysollib.zobrist)
+        return self.zobrist_hash
+
+    def getPositionHash(self):
+        # like getSnapshot, but different for every arrangement of
+        # the cards on the stacks
+        return self.position_hash
+
+    def createSnapshots(self, snapshots=()):
+        return GameSnapshots(snapshots, maxlen=self.MAX_SNAPSHOTS)
 
     def createSnGroups(self):
         # group stacks by class and cap
@@ -1166,6 +1239,15 @@ class Game(object):
                 sg[s] = [s.id]
         sg = list(sg.values())
         self.sn_groups = sg
+        # start tracking the position hash
+        self.zobrist_hash = 0
+        self.position_hash = 0
+        for i, g in enumerate(sg):
+            for id in g:
+                stack = self.allstacks[id]
+                stack.zobrist_group = i
+                stack.zobrist_hash = 0
+                stack.rehash()
 
     def updateSnapshots(self):
         sn = self.getSnapshot()
@@ -1220,8 +1302,8 @@ class Game(object):
         cards = self._shuffleHook(cards)
         # finally add the shuffled cards to the Talon
         for card in cards:
-            self.s.talon.addCard(card, update=0)
             card.showBack(unhide=0)
+            self.s.talon.addCard(card, update=0)
 
     # shuffle cards, but keep decks together
     def shuffleSeparateDecks(self):
@@ -1235,8 +1317,8 @@ class Game(object):
             cards.extend(deck_cards)
         cards = self._shuffleHook(cards)
         for card in cards:
-            self.s.talon.addCard(card, update=0)
             card.showBack(unhide=0)
+            self.s.talon.addCard(card, update=0)
 
     # subclass overrideable (must use self.random)
     def _shuffleHook(self, cards):
@@ -2089,6 +2171,8 @@ class Game(object):
         won, status, updated = self.getWinStatus()
         if not won:
             return False
+        if self.hints.searching:
+            return True
         self.finishMove()       # just in case
         if self.preview:
             return True
@@ -2500,8 +2584,37 @@ class Game(object):
         hint_class = self.getHintClass()
         if hint_class is None:
             return None
-        hint = hint_class(self, level)      # call constructor
-        return hint.getHints(taken_hint)    # and return all hints
+        # forced moves of the prev. taken hint are not cached
+        if taken_hint and taken_hint[6]:
+            hint = hint_class(self, level)
+            return hint.getHints(taken_hint)
+        key = self.getHintCacheKey(level)
+        depth = self.getHintLookaheadDepth(level)
+        if depth:
+            hint_class = LookaheadHint
+            key += (depth,)
+        hints = self.hints.cache.get(key)
+        if hints is None:
+            hint = hint_class(self, level)  # call constructor
+            hints = hint.getHints(taken_hint)
+            if hints is None:
+                return None
+            self.hints.cache.put(key, tuple(hints))
+        return list(hints)                  # and return all hints
+
+    # games with a solver or their own kind of hints don't search
+    def getHintLookaheadDepth(self, level):
+        if level > 2 or self.Solver_Class is not None:
+            return 0
+        if not issubclass(self.getHintClass(), DefaultHint):
+            return 0
+        return self.app.opt.hint_lookahead_depth
+
+    # hints depend on the position and on the game variables
+    # (see getState); subclasses with other state may extend the key
+    def getHintCacheKey(self, level):
+        return (level, self.getPositionHash(), self.s.talon.round,
+                repr(self.getState()), self.demo is not None)
 
     # give a hint
     def showHint(self, level=0, sleep=1.5, taken_hint=None):
@@ -2534,10 +2647,11 @@ class Game(object):
             assert from_stack is self.s.talon
             return h
         elif from_stack == to_stack:
-            # a flip move, should not happen with level=0/1
-            assert level >= 2
+            # a flip move, only with level=0/1 in games where the player
+            # flips the cards (see drawHintArrow() of LightsOut)
             assert ncards == 1 and len(from_stack.cards) >= ncards
-            return h
+            if level >= 2:
+                return h
         else:
             # a move move
             assert to_stack
@@ -2605,16 +2719,24 @@ class Game(object):
     # Demo - uses showHint()
     #
 
-    def startDemo(self, mixed=1, level=2):
+    # turbo is the number of demo moves played between two redraws,
+    # without animations, sound or hint arrows (0 - a normal demo)
+    def startDemo(self, mixed=1, level=2, turbo=0):
         assert level >= 2               # needed for flip/deal hints
         if not self.top:
             return
+        sleep = self.app.opt.timeouts['demo']
+        if turbo:
+            sleep = 0
         self.demo = Struct(
             level=level,
             mixed=mixed,
-            sleep=self.app.opt.timeouts['demo'],
+            turbo=turbo,
+            turbo_moves=0,
+            start_time=uclock(),
+            sleep=sleep,
             last_deal=[],
-            snapshots=[],
+            snapshots=self.createSnapshots(),
             hint=None,
             keypress=None,
             start_demo_moves=self.stats.demo_moves,
@@ -2628,6 +2750,8 @@ class Game(object):
     def stopDemo(self, event=None):
         if not self.demo:
             return
+        if self.demo.turbo:
+            self.updateStatus(info=None)
         self.canvas.setTopImage(None)
         self.demo_logo = None
         self.demo = None
@@ -2640,8 +2764,12 @@ class Game(object):
             self.stopDemo()
             # self.updateMenus()
             return
-        finished = self.playOneDemoMove(self.demo)
-        self.finishMove()
+        if self.demo.turbo:
+            finished = self.playTurboDemoMoves(self.demo)
+            self.updateStatus(info=self.getTurboDemoText(self.demo))
+        else:
+            finished = self.playOneDemoMove(self.demo)
+            self.finishMove()
         self.top.update_idletasks()
         self.hints.list = None
         player_moves = self.getPlayerMoves()
@@ -2735,7 +2863,7 @@ class Game(object):
                 if self.nextGameFlags(id) == 0:
                     self.endGame()
                     self.newGame(autoplay=0)
-                    self.startDemo(mixed=demo.mixed)
+                    self.startDemo(mixed=demo.mixed, turbo=demo.turbo)
                 else:
                     self.endGame()
                     self.stopDemo()
@@ -2800,6 +2928,40 @@ class Game(object):
             demo.last_deal = []
         return 0
 
+    # play up to demo.turbo demo moves in a row while in the demo event
+    def playTurboDemoMoves(self, demo):
+        opt = self.app.opt
+        saved = (opt.animations, opt.flip_animation, opt.redeal_animation,
+                 opt.sound)
+        opt.animations = 0
+        opt.flip_animation = opt.redeal_animation = opt.sound = False
+        finished = 0
+        # _autoDeal() finishes its own moves, so count them all here
+        demo_moves = self.stats.demo_moves
+        try:
+            for i in range(demo.turbo):
+                finished = self.playOneDemoMove(demo)
+                self.finishMove()
+                if finished or self.isGameWon():
+                    break
+        finally:
+            (opt.animations, opt.flip_animation, opt.redeal_animation,
+             opt.sound) = saved
+            demo.turbo_moves += self.stats.demo_moves - demo_moves
+        return finished
+
+    def getTurboDemoRate(self, demo):
+        # demo moves per second since the demo was started
+        t = uclock() - demo.start_time
+        if t <= 0:
+            return 0.0
+        return demo.turbo_moves / t
+
+    def getTurboDemoText(self, demo):
+        return _("Autopilot: %(moves)d moves, %(rate)d moves/sec") % {
+            'moves': demo.turbo_moves,
+            'rate': int(self.getTurboDemoRate(demo))}
+
     def createDemoInfoText(self):
         # TODO - the text placement is not fully ok
         if DEBUG:
@@ -2879,9 +3041,13 @@ class Game(object):
         self.canvas.setTopImage(self.demo_logo)
 
     def getStuck(self):
-        h = self.Stuck_Class.getHints(None)
+        key = self.getHintCacheKey(self.Stuck_Class.level)
+        h = self.hints.cache.get(key)
+        if h is None:
+            h = self.Stuck_Class.getHints(None)
+            self.hints.cache.put(key, h)
         if h:
-            self.failed_snapshots = []
+            self.failed_snapshots.clear()
             return True
         if not self.canDealCards():
             return False
@@ -3044,7 +3210,8 @@ class Game(object):
     # Finish the current move.
     def finishMove(self):
         current, moves, stats = self.moves.current, self.moves, self.stats
-        if not current:
+        if not current or self.hints.searching:
+            # moves played by the hint search are undone by it
             return 0
         # invalidate hints
         self.hints.list = None
@@ -3130,7 +3297,7 @@ class Game(object):
         self.updateStatus(moves=(self.moves.index, self.stats.total_moves))
         self.updateMenus()
         self.updateStatus(stuck='')
-        self.failed_snapshots = []
+        self.failed_snapshots.clear()
         reset_solver_dialog()
 
     def redo(self):
@@ -3393,7 +3560,7 @@ class Game(object):
         moves = pload(GameMoves)
         game.moves.__dict__.update(moves.__dict__)
         snapshots = pload(list)
-        game.snapshots = snapshots
+        game.snapshots = game.createSnapshots(snapshots)
         if 0 <= bookmark <= 1:
             gstats = pload(GameGlobalStatsStruct)
             game.gstats.__dict__.update(gstats.__dict__)
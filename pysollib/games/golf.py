@@ -69,14 +69,14 @@ class Golf_Hint(AbstractHint):
             assert ncards == 1
             # clone the Waste (including the card that will be dropped) to
             # form our new foundations
-            ww = (self.ClonedStack(w, stackcards=w.cards+[r.cards[-1]]), )
+            ww = (self.ClonedStack(w, extra=(r.cards[-1],)), )
             # now search for a stack that would benefit from this card
             score, color = 10000 + r.id, None
             for t in game.sg.dropstacks:
                 if not t.cards:
                     continue
                 if t is r:
-                    t = self.ClonedStack(r, stackcards=r.cards[:-1])
+                    t = self.ClonedStack(r, ncards=len(r.cards) - 1)
                 if t.canFlipCard():
                     score = score + 100
                 elif t.canDropCards(ww)[0]:
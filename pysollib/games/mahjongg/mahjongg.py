@@ -60,27 +60,18 @@ class Mahjongg_Hint(AbstractHint):
     # FIXME: no intelligence whatsoever is implemented here
     def computeHints(self):
         game = self.game
-        # get free stacks
-        stacks = []
-        for r in game.s.rows:
-            if r.cards and not r.basicIsBlocked():
-                stacks.append(r)
-        # find matching tiles
-        i = 0
-        for r in stacks:
-            for t in stacks[i+1:]:
-                if game.cardsMatch(r.cards[0], t.cards[0]):
-                    # simple scoring...
-                    # score = 10000 + r.id + t.id
-                    rb = r.blockmap
-                    tb = t.blockmap
-                    score = \
-                        10000 + \
-                        1000 * (len(rb.below) + len(tb.below)) + \
-                        len(rb.all_left) + len(rb.all_right) + \
-                        len(tb.all_left) + len(tb.all_right)
-                    self.addHint(score, 1, r, t)
-            i += 1
+        # find matching free tiles
+        for r, t in game.getFreeMatchingPairs():
+            # simple scoring...
+            # score = 10000 + r.id + t.id
+            rb = r.blockmap
+            tb = t.blockmap
+            score = \
+                10000 + \
+                1000 * (len(rb.below) + len(tb.below)) + \
+                len(rb.all_left) + len(rb.all_right) + \
+                len(tb.all_left) + len(tb.all_right)
+            self.addHint(score, 1, r, t)
 
 
 # ************************************************************************
@@ -128,28 +119,37 @@ class Mahjongg_Foundation(OpenStack):
 # ************************************************************************
 
 class Mahjongg_RowStack(OpenStack):
+    # set by AbstractMahjonggGame.createGame
+    blockmap = None
+
     def __init__(self, x, y, game, **cap):
         kwdefault(cap, max_move=1, max_accept=1, max_cards=2,
                   base_rank=NO_RANK)
         OpenStack.__init__(self, x, y, game, **cap)
+        # the number of occupied stacks in blockmap.above, left and right
+        self.occupied_above = 0
+        self.occupied_left = 0
+        self.occupied_right = 0
 
     def basicIsBlocked(self):
         # any of above blocks
-        for stack in self.blockmap.above:
-            if stack.cards:
-                return 1
-        # any of left blocks - but we can try right as well
-        for stack in self.blockmap.left:
-            if stack.cards:
-                break
-        else:
-            return 0
-        # any of right blocks
-        for stack in self.blockmap.right:
-            if stack.cards:
-                return 1
+        if self.occupied_above:
+            return 1
+        # any of left and any of right block
+        if self.occupied_left and self.occupied_right:
+            return 1
         return 0
 
+    # this stack was filled (d = 1) or emptied (d = -1)
+    def _updateOccupied(self, d):
+        bm = self.blockmap
+        for stack in bm.blocks_above:
+            stack.occupied_above += d
+        for stack in bm.blocks_left:
+            stack.occupied_left += d
+        for stack in bm.blocks_right:
+            stack.occupied_right += d
+
     def acceptsCards(self, from_stack, cards):
         if not OpenStack.acceptsCards(self, from_stack, cards):
             return 0
@@ -161,6 +161,23 @@ class Mahjongg_RowStack(OpenStack):
     def canDropCards(self, stacks):
         return (None, 0)
 
+    def addCard(self, card, unhide=1, update=1):
+        card = OpenStack.addCard(self, card, unhide=unhide, update=update)
+        if self.blockmap is not None:
+            if len(self.cards) == 1:
+                self._updateOccupied(1)
+            self.game.updateFreeTiles(self)
+        return card
+
+    def removeCard(self, card=None, unhide=1, update=1, update_positions=0):
+        card = OpenStack.removeCard(self, card, unhide=unhide, update=update,
+                                    update_positions=update_positions)
+        if self.blockmap is not None:
+            if not self.cards:
+                self._updateOccupied(-1)
+            self.game.updateFreeTiles(self)
+        return card
+
     def moveMove(self, ncards, to_stack, frames=-1, shadow=-1):
         self._dropPairMove(ncards, to_stack, frames=-1, shadow=shadow)
 
@@ -343,6 +360,9 @@ class AbstractMahjonggGame(Game):
 
     NCARDS = 144
 
+    # the free tiles by match class (see updateFreeTiles)
+    free_tiles = None
+
     def getTiles(self):
         # decode tile positions
         L = self.L
@@ -509,6 +529,10 @@ class AbstractMahjonggGame(Game):
                 # bottom=bottom,
                 all_left=None,
                 all_right=None,
+                blocks=None,
+                blocks_above=None,
+                blocks_left=None,
+                blocks_right=None,
             )
 
         def get_all_left(s):
@@ -536,6 +560,22 @@ class AbstractMahjonggGame(Game):
             r.blockmap.all_left = tuple(r.blockmap.all_left.keys())
             r.blockmap.all_right = tuple(r.blockmap.all_right.keys())
 
+        # the stacks a stack blocks, by the way it blocks them
+        blocks = dict((r, ([], [], [])) for r in s.rows)
+        for r in s.rows:
+            bm = r.blockmap
+            for i, stacks in enumerate((bm.above, bm.left, bm.right)):
+                for t in stacks:
+                    blocks[t][i].append(r)
+        for r in s.rows:
+            above, left, right = blocks[r]
+            r.blockmap.blocks_above = tuple(above)
+            r.blockmap.blocks_left = tuple(left)
+            r.blockmap.blocks_right = tuple(right)
+            r.blockmap.blocks = tuple(above + left + right)
+            r.free_class = None
+        self.free_tiles = {}
+
         # create other stacks
         for i in range(4):
             for j in range(9):
@@ -661,131 +701,139 @@ class AbstractMahjonggGame(Game):
         return old_cards
 
     def _shuffleHook2(self, rows, cards):
-
         start_time = time.time()
-        iters = [0]
         # limitations
         max_time = 5.0                  # seconds
         max_iters = 2*len(cards)
 
-        def is_suitable(stack, cards):
-            for s in stack.blockmap.below:
-                if cards[s.id] == 1:
-                    continue
-                # check if below stacks are non-empty
-                if cards[s.id] is None:
-                    return False
-
-            for s in stack.blockmap.left:
-                if cards[s.id] == 1:
-                    continue
-                if cards[s.id] is None:
-                    for t in s.blockmap.all_left:
-                        if cards[t.id] == 1:
-                            continue
-                        if cards[t.id] is not None:
-                            # we have empty stack between two non-empty
-                            return False
-
-            for s in stack.blockmap.right:
-                if cards[s.id] == 1:
-                    continue
-                if cards[s.id] is None:
-                    for t in s.blockmap.all_right:
-                        if cards[t.id] == 1:
-                            continue
-                        if cards[t.id] is not None:
-                            # we have empty stack between two non-empty
-                            return False
-            return True
-
-        def create_solvable(cards, new_cards):
-            iters[0] += 1
-            if iters[0] > max_iters:
-                return None
-            if time.time() - start_time > max_time:
-                return None
-            if not cards:
-                return new_cards
-
-            nc = new_cards[:]
-
-            # select two matching cards
-            c1 = cards[0]
-            del cards[0]
-            c2 = None
-            for i in range(len(cards)):
-                if self.cardsMatch(c1, cards[i]):
-                    c2 = cards[i]
-                    del cards[i]
-                    break
-
-            # find suitable stacks
-            #  suitable_stacks = []
-            #  for r in rows:
-            #      if nc[r.id] is None and is_suitable(r, nc):
-            #          suitable_stacks.append(r)
-            suitable_stacks = [r for r in rows
-                               if nc[r.id] is None and is_suitable(r, nc)]
-
-            old_pairs = []
-            i = factorial(len(suitable_stacks))//2 \
-                // factorial(len(suitable_stacks)-2)
-            for j in range(i):
-                if iters[0] > max_iters:
-                    return None
-                if time.time() - start_time > max_time:
-                    return None
-
-                # select two suitable stacks
-                while True:
-                    # create a uniq pair
-                    r1 = self.random.randrange(0, len(suitable_stacks))
-                    r2 = self.random.randrange(0, len(suitable_stacks))
-                    if r1 == r2:
-                        continue
-                    if (r1, r2) not in old_pairs and (r2, r1) not in old_pairs:
-                        old_pairs.append((r1, r2))
-                        break
-                s1 = suitable_stacks[r1]
-                s2 = suitable_stacks[r2]
-                # check if s1 don't block s2
-                nc[s1.id] = c1
-                if not is_suitable(s2, nc):
-                    nc[s1.id] = None
-                    continue
-                nc[s2.id] = c2
-                # check if this layout is solvable (backtracking)
-                ret = create_solvable(cards[:], nc)
-                if ret:
-                    ret = [x for x in ret if x != 1]
-                    return ret
-                nc[s1.id] = nc[s2.id] = None  # try another way
-
-            return None
-
-        new_cards = [None]*len(self.s.rows)  # None - empty stack, 1 - non-used
-        drows = dict.fromkeys(rows)     # optimization
-        for r in self.s.rows:
-            if r not in drows:
-                new_cards[r.id] = 1
-        del drows
-
         while True:
-            ret = create_solvable(cards[:], new_cards)
+            pairs = self._createSolvable(rows, cards, max_iters)
             if DEBUG:
                 print('create_solvable time:', time.time() - start_time)
-            if ret:
+            if pairs == []:
+                break
+            if pairs:
+                new_cards = {}
+                for s1, s2, c1, c2 in pairs:
+                    new_cards[s1] = c1
+                    new_cards[s2] = c2
+                ret = [new_cards[r] for r in rows]
                 ret.reverse()
                 return ret
-            if time.time() - start_time > max_time or \
-                    iters[0] <= max_iters:
-                print('oops! can\'t create a solvable game')
-                return None
-            iters = [0]
+            if time.time() - start_time > max_time:
+                break
         print('oops! can\'t create a solvable game')
         return None
 
+    # Put the cards on the stacks rows in pairs of matching cards, in
+    # the reverse order of their removal: each pair goes on stacks
+    # that will be free when it is removed, and no empty stack is
+    # left between two full ones, so the rest can still be filled.
+    # Returns [(stack1, stack2, card1, card2)], [] if there is no such
+    # layout, or None if none was found in max_iters steps.
+    def _createSolvable(self, rows, cards, max_iters):
+        # pairs of matching cards
+        cards = cards[:]
+        card_pairs = []
+        while cards:
+            c1 = cards.pop(0)
+            for i, c2 in enumerate(cards):
+                if self.cardsMatch(c1, c2):
+                    card_pairs.append((c1, cards.pop(i)))
+                    break
+            else:
+                return None
+
+        used = set(rows)
+        filled = set()
+        # the number of empty stacks below a stack
+        nbelow = {}
+        above = dict((r, []) for r in rows)
+        for r in rows:
+            below = [t for t in r.blockmap.below if t in used]
+            nbelow[r] = len(below)
+            for t in below:
+                above[t].append(r)
+        # the empty stacks with no empty stacks below them
+        placeable = set(r for r in rows if not nbelow[r])
+
+        def fill(stack, d):
+            if d > 0:
+                filled.add(stack)
+                placeable.discard(stack)
+            else:
+                filled.discard(stack)
+                placeable.add(stack)
+            for t in above[stack]:
+                nbelow[t] -= d
+                if nbelow[t]:
+                    placeable.discard(t)
+                else:
+                    placeable.add(t)
+
+        def makesGap(stack):
+            # an empty stack between this one and a full one
+            bm = stack.blockmap
+            for side, all_side in ((bm.left, 'all_left'),
+                                   (bm.right, 'all_right')):
+                for t in side:
+                    if t in used and t not in filled:
+                        for u in getattr(t.blockmap, all_side):
+                            if u in filled:
+                                return True
+            return False
+
+        def isFree(stack):
+            bm = stack.blockmap
+            return not ([t for t in bm.left if t in filled] and
+                        [t for t in bm.right if t in filled])
+
+        def candidates():
+            # all pairs of suitable stacks; the stacks are taken in a
+            # random order and only checked when they are needed
+            free = sorted(placeable, key=lambda r: r.id)
+            suitable = []
+            for i in range(len(free)):
+                j = self.random.randrange(i, len(free))
+                free[i], free[j] = free[j], free[i]
+                s2 = free[i]
+                if makesGap(s2):
+                    continue
+                for s1 in suitable:
+                    yield s1, s2
+                suitable.append(s2)
+
+        placed = []
+        frames = [candidates()]
+        iters = 0
+        while len(placed) < len(card_pairs):
+            for s1, s2 in frames[-1]:
+                iters += 1
+                if iters > max_iters:
+                    return None
+                fill(s1, 1)
+                if makesGap(s2):
+                    fill(s1, -1)
+                    continue
+                fill(s2, 1)
+                if isFree(s1) and isFree(s2):
+                    break
+                fill(s2, -1)
+                fill(s1, -1)
+            else:
+                # try another way
+                frames.pop()
+                if not placed:
+                    return []
+                s1, s2, c1, c2 = placed.pop()
+                fill(s2, -1)
+                fill(s1, -1)
+                continue
+            c1, c2 = card_pairs[len(placed)]
+            placed.append((s1, s2, c1, c2))
+            frames.append(candidates())
+        return placed
+
     def _mahjonggShuffle(self):
         talon = self.s.talon
         rows = []
@@ -874,21 +922,9 @@ a solvable configuration.'''),
             return
 
         # find matching tiles
-        stacks = []
-        for r in self.s.rows:
-            if r.cards and not r.basicIsBlocked():
-                stacks.append(r)
-        f, i = 0, 0
-        for r in stacks:
-            n = 0
-            for t in stacks[i+1:]:
-                if self.cardsMatch(r.cards[0], t.cards[0]):
-                    n += 1
-            # if n == 3: n = 1
-            # elif n == 2: n = 0
-            n = n % 2
-            f += n
-            i += 1
+        f = 0
+        for stacks in self.free_tiles.values():
+            f += len(stacks) // 2
 
         if f == 0:
             f = _('No Free\nMatching\nPairs')
@@ -1000,6 +1036,54 @@ a solvable configuration.'''),
     # Mahjongg extras
     #
 
+    # The free tiles are kept in self.free_tiles, a dict from the match
+    # class of a tile to the free stacks with a tile of that class.
+    # Adding or removing a tile only changes the stack and the stacks
+    # it blocks (see Mahjongg_RowStack._updateOccupied), so only these
+    # are looked at.
+
+    def updateFreeTiles(self, stack):
+        self._updateFreeTile(stack)
+        for s in stack.blockmap.blocks:
+            self._updateFreeTile(s)
+
+    def _updateFreeTile(self, stack):
+        old = stack.free_class
+        new = None
+        if stack.cards and not stack.basicIsBlocked():
+            new = self.getMatchClass(stack.cards[0])
+        if new == old:
+            return
+        if old is not None:
+            stacks = self.free_tiles[old]
+            del stacks[stack]
+            if not stacks:
+                del self.free_tiles[old]
+        if new is not None:
+            self.free_tiles.setdefault(new, {})[stack] = 1
+        stack.free_class = new
+
+    def getFreeMatchingPairs(self):
+        pairs = []
+        for stacks in self.free_tiles.values():
+            stacks = sorted(stacks, key=lambda s: s.id)
+            for i, r in enumerate(stacks):
+                for t in stacks[i+1:]:
+                    pairs.append((r, t))
+        pairs.sort(key=lambda p: (p[0].id, p[1].id))
+        return pairs
+
+    # tiles match if they have the same match class
+    def getMatchClass(self, card):
+        if card.suit == 3:
+            if card.rank >= 8:
+                # flowers
+                return (3, 8)
+            if card.rank >= 4:
+                # seasons
+                return (3, 4)
+        return (card.suit, card.rank)
+
     def cardsMatch(self, card1, card2):
         if card1.suit != card2.suit:
             return 0
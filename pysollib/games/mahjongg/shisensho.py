@@ -45,25 +45,13 @@ class Shisen_Hint(AbstractHint):
     # FIXME: no intelligence whatsoever is implemented here
 
     def computeHints(self):
-        game = self.game
-        # get free stacks
-        stacks = []
-        for r in game.s.rows:
-            if r.cards:
-                stacks.append(r)
-        # find matching tiles
-        i = 0
-        for r in stacks:
-            for t in stacks[i+1:]:
-                # if game.cardsMatch(r.cards[0], t.cards[0]):
-                if r.acceptsCards(t, t.cards):
-                    # simple scoring...
-                    if self.TOP_MATCHING:
-                        score = 2000 - r.rown - t.rown
-                    else:
-                        score = 1000 + r.rown + t.rown
-                    self.addHint(score, 1, r, t)
-            i += 1
+        for r, t, path in self.game.getMatchingPairs():
+            # simple scoring...
+            if self.TOP_MATCHING:
+                score = 2000 - r.rown - t.rown
+            else:
+                score = 1000 + r.rown + t.rown
+            self.addHint(score, 1, r, t)
 
 
 class NotShisen_Hint(Shisen_Hint):
@@ -101,123 +89,27 @@ class Shisen_RowStack(Mahjongg_RowStack):
     def acceptsCards(self, from_stack, cards):
         if not self.game.cardsMatch(self.cards[0], cards[-1]):
             return 0
-
-        cols, rows = self.game.L
-        game_cols = self.game.cols
-        x1, y1 = self.coln+1, self.rown+1
-        x2, y2 = from_stack.coln+1, from_stack.rown+1
-        dx, dy = x2 - x1, y2 - y1
-
-        a = []
-        for i in range(cols+2):
-            a.append([5]*(rows+2))
-
-        def can_move(x, y, nx, ny, direct, d, direct_chng_cnt):
-            if (nx == x2 and ny == y2 and (self.allowAdjacent or
-                                           (abs(dx) > 1 and abs(dy) > 1)
-                                           or direct_chng_cnt > 0)):
-                return 1
-            if nx < 0 or ny < 0 or nx > cols+1 or ny > rows+1:
-                return 0
-            if nx in (0, cols+1) or ny in (0, rows+1) \
-                    or not game_cols[nx-1][ny-1].cards:
-                if direct_chng_cnt == 0:
-                    return 1
-                elif direct_chng_cnt == 1:
-                    if direct != d:
-                        if d == 1 and dy > 0:
-                            return 1
-                        elif d == 2 and dy < 0:
-                            return 1
-                        elif d == 3 and dx > 0:
-                            return 1
-                        elif d == 4 and dx < 0:
-                            return 1
-                    else:
-                        return 1
-                elif direct_chng_cnt == 2:
-                    if direct != d:
-                        if d in (1, 2) and x == x2:
-                            return 1
-                        elif y == y2:
-                            return 1
-                    else:
-                        if d == 1 and y < y2:
-                            return 1
-                        elif d == 2 and y > y2:
-                            return 1
-                        elif d == 3 and x < x2:
-                            return 1
-                        elif d == 4 and x > x2:
-                            return 1
-                elif direct_chng_cnt == 3:
-                    if direct == d:
-                        return 1
-
-            return 0
-
-        res_path = [None]
-
-        def do_accepts(x, y, direct, direct_chng_cnt, path):
-            # if direct_chng_cnt > 3:
-            #    return
-            if a[x][y] < direct_chng_cnt:
-                return
-            # if res_path[0]:
-            #    return
-            a[x][y] = direct_chng_cnt
-            if x == x2 and y == y2:
-                res_path[0] = path
-                return
-
-            if can_move(x, y, x, y+1, direct, 1, direct_chng_cnt):  # 1
-                # dcc = direct == 1 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 1:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x, y+1, 1, dcc, p)
-            if can_move(x, y, x, y-1, direct, 2, direct_chng_cnt):  # 2
-                # dcc = direct == 2 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 2:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x, y-1, 2, dcc, p)
-            if can_move(x, y, x+1, y, direct, 3, direct_chng_cnt):  # 3
-                # dcc = direct == 3 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 3:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x+1, y, 3, dcc, p)
-            if can_move(x, y, x-1, y, direct, 4, direct_chng_cnt):  # 4
-                # dcc = direct == 4 and direct_chng_cnt or direct_chng_cnt+1
-                p = path[:]
-                if direct == 4:
-                    dcc = direct_chng_cnt
-                else:
-                    dcc = direct_chng_cnt+1
-                    p.append((x, y))
-                do_accepts(x-1, y, 4, dcc, p)
-
-        do_accepts(x1, y1, 0, 0, [])
-        # from pprint import pprint
-        # pprint(a)
-
-        if a[x2][y2] > 3:
-            return None
-
-        res_path = res_path[0]
-        res_path.append((x2, y2))
-        # print res_path
-        return res_path
+        return self.getPaths([from_stack]).get(from_stack)
+
+    # the paths from this stack to those of stacks it can be connected to
+    def getPaths(self, stacks):
+        return self.game.findPaths(self, stacks)
+
+    def addCard(self, card, unhide=1, update=1):
+        card = Mahjongg_RowStack.addCard(self, card, unhide=unhide,
+                                         update=update)
+        self.game.grid[self.grid_index] = 1
+        self.game.updateFreeTiles(self)
+        return card
+
+    def removeCard(self, card=None, unhide=1, update=1, update_positions=0):
+        card = Mahjongg_RowStack.removeCard(
+            self, card, unhide=unhide, update=update,
+            update_positions=update_positions)
+        if not self.cards:
+            self.game.grid[self.grid_index] = 0
+        self.game.updateFreeTiles(self)
+        return card
 
     def fillStack(self):
         self.game.fillStack(self)
@@ -349,6 +241,18 @@ class AbstractShisenGame(AbstractMahjonggGame):
         # set game extras
         self.check_dist = l.CW*l.CW + l.CH*l.CH     # see _getClosestStack()
 
+        # the occupancy of the board with a free border around it and
+        # the arrays reused by the path searches, see findPath()
+        size = (cols+2)*(rows+2)
+        self.grid = [0]*size
+        self._seen = [0]*size
+        self._prev = [0]*size
+        self._search_id = 0
+        # the tiles by match class and the paths found on this board
+        self.free_tiles = {}
+        self._paths = {}
+        self._pairs = None
+
         #
         self.cols = [[] for i in range(cols)]
         cl = range(cols)
@@ -362,6 +266,8 @@ class AbstractShisenGame(AbstractMahjonggGame):
                 stack.CARD_XOFFSET = 0
                 stack.CARD_YOFFSET = 0
                 stack.coln, stack.rown = col, row
+                stack.grid_index = (row+1)*(cols+2) + col+1
+                stack.free_class = None
                 s.rows.append(stack)
                 self.cols[col].append(stack)
         # from pprint import pprint
@@ -393,23 +299,165 @@ class AbstractShisenGame(AbstractMahjonggGame):
             self.moveMove(1, from_stack, to_stack, frames=0)
             to_stack = from_stack
 
+    # A path between two tiles has up to three straight segments over
+    # the free cells of self.grid.  The search is breadth first by the
+    # number of segments: the free cells on the lines from the cells
+    # reached with n segments are reached with n+1 segments, so the
+    # first path found to a tile is a shortest one.  The last segment
+    # is not searched, a cell on a free line to a target tile (see
+    # _getLines()) reaches it.  The cells are marked with the id of the
+    # search instead of clearing the arrays.
+
+    def _getRays(self, i):
+        # the steps and their number from cell i to the border
+        W = self.L[0] + 2
+        H = self.L[1] + 2
+        y, x = divmod(i, W)
+        return ((W, H-1-y), (-W, y), (1, W-1-x), (-1, x))
+
+    def _getLines(self, targets):
+        # the free cells on the lines from the targets
+        grid = self.grid
+        lines = {}
+        for j in targets:
+            for step, n in self._getRays(j):
+                i = j
+                for k in range(n):
+                    i += step
+                    if grid[i]:
+                        break
+                    lines.setdefault(i, []).append(j)
+        return lines
+
+    def _searchPaths(self, stack, targets):
+        # the targets (a dict of cells) reached from stack, with the
+        # cell starting the last segment of the path
+        grid, seen, prev = self.grid, self._seen, self._prev
+        self._search_id += 1
+        search_id = self._search_id
+        start = stack.grid_index
+        seen[start] = search_id
+        lines = self._getLines(targets)
+        found = {}
+        # one segment
+        for step, n in self._getRays(start):
+            j = start
+            for k in range(n):
+                j += step
+                if grid[j]:
+                    if j in targets and (k or stack.allowAdjacent):
+                        found[j] = start
+                    break
+        # two and three segments
+        frontier = [start]
+        for segment in range(2):
+            if len(found) == len(targets):
+                break
+            next_frontier = []
+            for i in frontier:
+                for step, n in self._getRays(i):
+                    j = i
+                    for k in range(n):
+                        j += step
+                        if grid[j]:
+                            break
+                        if seen[j] == search_id:
+                            continue
+                        seen[j] = search_id
+                        prev[j] = i
+                        next_frontier.append(j)
+                        for t in lines.get(j, ()):
+                            if t not in found:
+                                found[t] = j
+            frontier = next_frontier
+        return found
+
+    def _makePath(self, start, i, j):
+        # the corners of the path found to j, reached from i
+        W = self.L[0] + 2
+        path = [j]
+        while i != start:
+            path.append(i)
+            i = self._prev[i]
+        path.append(start)
+        return [(i % W, i // W) for i in reversed(path)]
+
+    def findPaths(self, stack, stacks):
+        # the corners of the shortest paths from stack to those of
+        # stacks it can be connected to (on the board with the border,
+        # as (coln+1, rown+1)), searched once for all of them
+        paths = self._paths
+        targets = {}
+        for t in stacks:
+            if (stack, t) not in paths:
+                targets[t.grid_index] = t
+        if targets:
+            start = stack.grid_index
+            found = self._searchPaths(stack, targets)
+            for j, t in targets.items():
+                path = None
+                if j in found:
+                    path = self._makePath(start, found[j], j)
+                    paths[(t, stack)] = path[::-1]
+                paths[(stack, t)] = path
+        res = {}
+        for t in stacks:
+            if paths[(stack, t)]:
+                res[t] = paths[(stack, t)]
+        return res
+
+    def findPath(self, stack1, stack2):
+        return self.findPaths(stack1, [stack2]).get(stack2)
+
+    def getConnectablePairs(self, stacks, first=False):
+        # the pairs (r, t, path) of the stacks that can be connected,
+        # or only the first one found
+        pairs = []
+        for n, r in enumerate(stacks[:-1]):
+            paths = r.getPaths(stacks[n+1:])
+            for t in stacks[n+1:]:
+                if t in paths:
+                    pairs.append((r, t, paths[t]))
+            if first and pairs:
+                break
+        return pairs
+
+    # Every tile is free, the tiles are in self.free_tiles by their
+    # match class (see AbstractMahjonggGame.updateFreeTiles()) and only
+    # the tiles of a class are searched for the matching pairs.  The
+    # paths and pairs found are kept until the board changes.
+
+    def updateFreeTiles(self, stack):
+        self._updateFreeTile(stack)
+        if self._paths:
+            self._paths = {}
+        self._pairs = None
+
+    def getMatchingPairs(self):
+        if self._pairs is None:
+            pairs = []
+            for stacks in self.free_tiles.values():
+                stacks = sorted(stacks, key=lambda s: s.id)
+                pairs += self.getConnectablePairs(stacks)
+            pairs.sort(key=lambda p: (p[0].id, p[1].id))
+            self._pairs = pairs
+        return self._pairs
+
+    def getStuck(self):
+        if self._pairs is not None:
+            return bool(self._pairs)
+        for stacks in self.free_tiles.values():
+            if self.getConnectablePairs(list(stacks), first=True):
+                return True
+        return False
+
     def updateText(self):
         if self.preview > 1 or self.texts.info is None:
             return
 
         if self.app.opt.shisen_show_matching:
             # find matching tiles
-            stacks = self.s.rows
-            f, i = 0, 0
-            for r in stacks:
-                i = i + 1
-                if not r.cards:
-                    continue
-                for t in stacks[i:]:
-                    if not t.cards:
-                        continue
-                    if r.acceptsCards(t, t.cards):
-                        f += 1
+            f = len(self.getMatchingPairs())
             if f == 0:
                 f = _('No Free\nMatching\nPairs')
             else:
@@ -476,13 +524,13 @@ class Shisen_24x12_NoGravity(AbstractShisenGame):
 # ************************************************************************
 
 class NotShisen_RowStack(Shisen_RowStack):
-    def acceptsCards(self, from_stack, cards):
-        if not self.game.cardsMatch(self.cards[0], cards[-1]):
-            return 0
-        if self.coln != from_stack.coln and self.rown != from_stack.rown:
-            return 0
-        return [(self.coln+1, self.rown+1),
-                (from_stack.coln+1, from_stack.rown+1)]
+    def getPaths(self, stacks):
+        paths = {}
+        for t in stacks:
+            if self.coln == t.coln or self.rown == t.rown:
+                paths[t] = [(self.coln+1, self.rown+1),
+                            (t.coln+1, t.rown+1)]
+        return paths
 
 
 class NotShisen_14x6(AbstractShisenGame):
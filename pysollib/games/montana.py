@@ -25,6 +25,7 @@ from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
 from pysollib.hint import DefaultHint
 from pysollib.layout import Layout
+from pysollib.solvers.montana import MontanaSolver
 from pysollib.stack import \
         BasicRowStack, \
         InitialDealTalonStack, \
@@ -37,38 +38,32 @@ from pysollib.stack import \
 from pysollib.util import ACE, NO_SUIT
 
 # ************************************************************************
-# *
+# * Montana Hint - the first move of the way to the most cards in
+# * sequence this round (see Montana.getSolution()) is the best one;
+# * if no more can be put in sequence, the moves are of no use and
+# * there are none. Without a solver for the layout of the game all
+# * the moves are hints.
 # ************************************************************************
 
 
 class Montana_Hint(DefaultHint):
     def computeHints(self):
         game = self.game
-        RSTEP, RBASE = game.RSTEP, game.RBASE
-        freerows = [s for s in game.s.rows if not s.cards]
-        # for each stack
-        for r in game.s.rows:
-            if not r.cards:
+        state, moves = game.getSolution()
+        if state == 'unsolved':
+            return
+        rows = game.s.rows
+        for r, t in game.getGapMoves():
+            if moves and moves[0] == (r, t):
+                score = 60000
+            elif not self.shallMovePile(r, t, r.cards, []):
                 continue
-            assert len(r.cards) == 1 and r.cards[-1].face_up
-            c, pile, rpile = r.cards[0], r.cards, []
-            if r.id % RSTEP > 0:
-                left = game.s.rows[r.id - 1]
+            elif r.id % game.RSTEP > 0 and rows[r.id - 1].cards:
+                # prefer low-rank left neighbours
+                score = 40000 + (self.K - rows[r.id - 1].cards[-1].rank)
             else:
-                left = None
-                if c.rank == RBASE:
-                    # do not move the leftmost card of a row if the
-                    # rank is correct
-                    continue
-            for t in freerows:
-                if self.shallMovePile(r, t, pile, rpile):
-                    # FIXME: this scoring is completely simple
-                    if left and left.cards:
-                        # prefer low-rank left neighbours
-                        score = 40000 + (self.K - left.cards[-1].rank)
-                    else:
-                        score = 50000
-                    self.addHint(score, 1, r, t)
+                score = 50000
+            self.addHint(score, 1, r, t)
 
 
 # ************************************************************************
@@ -162,6 +157,11 @@ class Montana(Game):
     Hint_Class = Montana_Hint
 
     RLEN, RSTEP, RBASE = 52, 13, 1
+    # the rule of pysollib.solvers.montana.MontanaSolver for the moves,
+    # None for a layout the solver does not model
+    SOLVER_RULE = 'montana'
+    SOLVER_ITERS = 10000
+    montana_solver = None
 
     def createGame(self, round_text=True):
         decks = self.gameinfo.decks
@@ -195,6 +195,12 @@ class Montana(Game):
             # create an invisible stack to hold the four Aces
             s.internals.append(InvisibleStack(self))
 
+        if self.SOLVER_RULE is not None:
+            ranks = [r for r in self.gameinfo.ranks if r >= self.RBASE]
+            self.montana_solver = MontanaSolver(
+                len(s.rows) // self.RSTEP, self.RSTEP, ranks,
+                rule=self.SOLVER_RULE, max_iters=self.SOLVER_ITERS)
+
         # define stack-groups
         l.defaultStackGroups()
 
@@ -244,6 +250,39 @@ class Montana(Game):
                 return -1
         return 1
 
+    def _getGrid(self):
+        return [(r.cards[-1].rank, r.cards[-1].suit) if r.cards else None
+                for r in self.s.rows]
+
+    # the moves (from stack, to stack) to the gaps, from the tables of
+    # the solver instead of a look at each stack
+    def getGapMoves(self):
+        rows = self.s.rows
+        if self.montana_solver is None:
+            return [(r, t) for t in rows if not t.cards
+                    for r in rows if r.cards and t.acceptsCards(r, r.cards)
+                    and not (r.id % self.RSTEP == 0 and
+                             r.cards[-1].rank == self.RBASE)]
+        return [(rows[i], rows[j])
+                for i, j in self.montana_solver.getMoves(self._getGrid())]
+
+    # (state, moves) of the solver for this round, the moves as
+    # (from stack, to stack)
+    def getSolution(self):
+        if self.montana_solver is None:
+            return 'intractable', []
+        rows = self.s.rows
+        state, moves = self.montana_solver.solve(
+            self._getGrid(), self.s.talon.canDealCards())
+        return state, [(rows[i], rows[j]) for i, j in moves]
+
+    def getStuck(self):
+        if self.montana_solver is None:
+            return Game.getStuck(self)
+        if self.canDealCards():
+            return True
+        return self.getSolution()[0] != 'unsolved'
+
 
 # ************************************************************************
 # * Spaces
@@ -368,6 +407,7 @@ class Galary_RowStack(Montana_RowStack):
 class Galary(RedMoon):
     RowStack_Class = Galary_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_RULE = 'both_sides'
 
 
 # ************************************************************************
@@ -377,6 +417,7 @@ class Galary(RedMoon):
 class FreeParking(Montana):
     RowStack_Class = Galary_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_RULE = 'both_sides'
 
 
 # ************************************************************************
@@ -397,6 +438,7 @@ class Jungle(BlueMoon):
     Talon_Class = StackWrapper(Montana_Talon, max_rounds=2)
     RowStack_Class = Jungle_RowStack
     Hint_Class = Galary_Hint
+    SOLVER_RULE = 'any_suit'
 
 
 # ************************************************************************
@@ -418,6 +460,7 @@ class SpacesAndAces(BlueMoon):
     Hint_Class = Galary_Hint
     Talon_Class = InitialDealTalonStack
     RowStack_Class = SpacesAndAces_RowStack
+    SOLVER_RULE = 'higher'
 
     def createGame(self):
         Montana.createGame(self, round_text=False)
@@ -27,6 +27,7 @@ from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
 from pysollib.hint import DefaultHint
 from pysollib.layout import Layout
+from pysollib.solvers.pairing import PairingSolver
 from pysollib.stack import \
         AbstractFoundationStack, \
         AutoDealTalonStack, \
@@ -47,8 +48,22 @@ from pysollib.util import ANY_RANK, ANY_SUIT, JACK, KING, NO_RANK, \
 
 
 class MonteCarlo_Hint(DefaultHint):
-    # FIXME: demo is not too clever in this game
-    pass
+    # with a solver (see MonteCarlo.getSolution()), the cards to drop,
+    # the first move of a solution (or the deal, for the demo) first
+    def computeHints(self):
+        game = self.game
+        if game.SOLVER_PRESET is None:
+            DefaultHint.computeHints(self)
+            return
+        solution = game.getSolution()
+        if self.level >= 2 and solution and solution[0][0] is game.s.talon:
+            self.addHint(30000, 0, game.s.talon, None)
+        for r, t in game.getDropMoves():
+            if solution and solution[0] == (r, t):
+                score = 30000
+            else:
+                score = 5000
+            self.addHint(score, 1, r, t)
 
 
 # ************************************************************************
@@ -118,6 +133,10 @@ class MonteCarlo(Game):
     FILL_STACKS_AFTER_DROP = False
     FILL_STACKS_BEFORE_SHIFT = False
 
+    # see pysollib.solvers.pairing; None for the games it does not know
+    SOLVER_PRESET = 'monte_carlo'
+    SOLVER_ITERS = 50000
+
     #
     # game layout
     #
@@ -125,6 +144,7 @@ class MonteCarlo(Game):
     def createGame(self, rows=5, cols=5):
         # create layout
         l, s = Layout(self), self.s
+        self.pairing_solver = None
 
         # set window
         self.setSize(l.XM + (cols+1.5)*l.XS, l.YM + rows*l.YS)
@@ -207,6 +227,43 @@ class MonteCarlo(Game):
                 self.moveMove(1, r, to_stack, frames=4, shadow=0)
         return free
 
+    # the moves (from stack, to stack) of the cards to drop
+    def getDropMoves(self):
+        rows = self.s.rows
+        moves = []
+        for i, r in enumerate(rows):
+            if not r.cards:
+                continue
+            for t in list(self.s.foundations) + \
+                    [t for t in rows[i+1:] if t.cards]:
+                if t.acceptsCards(r, r.cards):
+                    moves.append((r, t))
+        return moves
+
+    # the moves (from stack, to stack) of a solution from here, or None;
+    # a deal is (talon, None)
+    def getSolution(self):
+        if self.pairing_solver is None:
+            self.pairing_solver = PairingSolver(self.SOLVER_PRESET,
+                                                max_iters=self.SOLVER_ITERS)
+        rows = self.s.rows
+        grid = [(r.cards[0].rank, r.cards[0].suit) if r.cards else None
+                for r in rows]
+        talon = [(c.rank, c.suit) for c in reversed(self.s.talon.cards)]
+        state, moves = self.pairing_solver.solve(grid, talon)
+        if state != 'solved':
+            return None
+        f = self.s.foundations[0]
+        return [(self.s.talon, None) if i < 0 else
+                (rows[i], f if j is None else rows[j]) for i, j in moves]
+
+    # the stuck check runs after every move, so it only looks for a
+    # card to drop or a deal; the search is left to the hints
+    def getStuck(self):
+        if self.SOLVER_PRESET is None:
+            return Game.getStuck(self)
+        return bool(self.getDropMoves() or self.canDealCards())
+
 
 class MonteCarlo2Decks(MonteCarlo):
     pass
@@ -233,6 +290,7 @@ class Weddings_Talon(MonteCarlo_Talon):
 
 class Weddings(MonteCarlo):
     Talon_Class = Weddings_Talon
+    SOLVER_PRESET = None
 
     def fillEmptyStacks(self):
         free, n = 0, 0
@@ -267,6 +325,7 @@ class Weddings(MonteCarlo):
 
 class SimpleCarlo(MonteCarlo):
     FILL_STACKS_AFTER_DROP = True
+    SOLVER_PRESET = 'simple_carlo'
 
     def getAutoStacks(self, event=None):
         return ((), (), ())
@@ -294,6 +353,7 @@ class Quatorze(MonteCarlo):
     RowStack_Class = Quatorze_RowStack
     FILL_STACKS_AFTER_DROP = True
     FILL_STACKS_BEFORE_SHIFT = True
+    SOLVER_PRESET = 'quatorze'
 
     def isNeighbour(self, stack1, stack2):
         return (stack1.id // 5 == stack2.id // 5 or
@@ -305,6 +365,8 @@ class Quatorze(MonteCarlo):
 # ************************************************************************
 
 class SimplePairs(MonteCarlo):
+    SOLVER_PRESET = None
+
     def createGame(self):
         # create layout
         l, s = Layout(self), self.s
@@ -405,6 +467,7 @@ class Crispy(SimpleCarlo):
     RowStack_Class = Crispy_RowStack
     FILL_STACKS_AFTER_DROP = False
     FILL_STACKS_BEFORE_SHIFT = True
+    SOLVER_PRESET = None
 
     def createGame(self):
         MonteCarlo.createGame(self, rows=4, cols=4)
@@ -495,6 +558,7 @@ class Neighbour(MonteCarlo):
     RowStack_Class = Neighbour_RowStack
 
     FILL_STACKS_AFTER_DROP = True
+    SOLVER_PRESET = 'neighbour'
 
     def getAutoStacks(self, event=None):
         return ((), self.sg.dropstacks, ())
@@ -1091,6 +1155,7 @@ class AcesSquare_RowStack(MonteCarlo_RowStack):
 class AcesSquare(MonteCarlo):
     Talon_Class = AutoDealTalonStack
     RowStack_Class = AcesSquare_RowStack
+    SOLVER_PRESET = None
 
     def createGame(self):
         MonteCarlo.createGame(self, rows=4, cols=4)
@@ -26,6 +26,7 @@ from pysollib.gamedb import GI, GameInfo, registerGame
 from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
 from pysollib.pysoltk import MfxCanvasText
+from pysollib.solvers.pairing import PairingSolver
 from pysollib.stack import \
         AbstractFoundationStack, \
         DealRowTalonStack, \
@@ -35,20 +36,43 @@ from pysollib.util import ANY_RANK, ANY_SUIT, RANKS, SUITS_PL
 
 
 class PushPin_Hint(AbstractHint):
-
+    # the first move of a solution (see PushPin.getSolution()) is the
+    # best one
     def computeHints(self):
+        game = self.game
+        self.solution = game.getSolution()
+        if self.level >= 2 and self.solution and \
+                self.solution[0][0] is game.s.talon:
+            self.addHint(30000, 0, game.s.talon, None)
+        self.computeMoveHints()
+
+    # the legal moves only, for the stuck check
+    def hasMoves(self):
+        self.reset()
+        self.solution = None
+        self.computeMoveHints()
+        moves = bool(self.hints)
+        self.reset()
+        return moves
+
+    def addMoveHint(self, score, from_stack, to_stack):
+        if self.solution and self.solution[0] == (from_stack, to_stack):
+            score = 30000
+        self.addHint(score, 1, from_stack, to_stack)
+
+    def computeMoveHints(self):
         game = self.game
         rows = game.s.rows
-        for i in range(len(rows)-3):
+        for i in range(len(rows)-2):
             r = rows[i+1]
             if not rows[i+2].cards:
                 break
             if r._checkPair(i, i+2):
-                self.addHint(5000, 1, r, game.s.foundations[0])
-            if not rows[i+3].cards:
+                self.addMoveHint(5000, r, game.s.foundations[0])
+            if i+3 >= len(rows) or not rows[i+3].cards:
                 break
             if r._checkPair(i, i+3):
-                self.addHint(5000, 1, r, rows[i+2])
+                self.addMoveHint(5000, r, rows[i+2])
 
 
 class PushPin_Foundation(AbstractFoundationStack):
@@ -128,6 +152,10 @@ class PushPin(Game):
 
     Comment = False
 
+    # see pysollib.solvers.pairing
+    SOLVER_PRESET = 'push_pin'
+    SOLVER_ITERS = 50000
+
     #
     # game layout
     #
@@ -136,6 +164,8 @@ class PushPin(Game):
         # create layout
         l, s = Layout(self), self.s
 
+        self.pairing_solver = None
+
         pad = 1
         if self.Comment:
             pad = 5
@@ -213,6 +243,32 @@ class PushPin(Game):
     def getAutoStacks(self, event=None):
         return ((), (), ())
 
+    # the card (rank, suit) to be left last, if it matters
+    def getFinalCard(self):
+        return None
+
+    # the moves (from stack, to stack) of a solution from here, or None;
+    # a deal is (talon, None)
+    def getSolution(self):
+        if self.pairing_solver is None:
+            self.pairing_solver = PairingSolver(self.SOLVER_PRESET,
+                                                max_iters=self.SOLVER_ITERS)
+        rows = self.s.rows
+        line = [(r.cards[0].rank, r.cards[0].suit) for r in rows if r.cards]
+        talon = [(c.rank, c.suit) for c in reversed(self.s.talon.cards)]
+        state, moves = self.pairing_solver.solve(line, talon,
+                                                 self.getFinalCard())
+        if state != 'solved':
+            return None
+        f = self.s.foundations[0]
+        return [(self.s.talon, None) if i < 0 else
+                (rows[i], f if j is None else rows[j]) for i, j in moves]
+
+    # the stuck check runs after every move, so it only looks for a
+    # move or a deal; the search is left to the hints
+    def getStuck(self):
+        return self.Stuck_Class.hasMoves() or bool(self.canDealCards())
+
 
 class RoyalMarriage(PushPin):
     def _shuffleHook(self, cards):
@@ -237,30 +293,23 @@ class RoyalMarriage(PushPin):
 # * Bayan (ex. Accordion)
 # ************************************************************************
 
-class Accordion_Hint(AbstractHint):
+class Accordion_Hint(PushPin_Hint):
     VAL1 = 1
     VAL2 = 3
 
-    def computeHints(self):
+    def computeMoveHints(self):
         game = self.game
         rows = game.s.rows
-        for i in range(len(rows)-3):
-            r1, r2 = rows[i], rows[i + self.VAL1]
-            if r1.cards and r2.cards:
-                c1, c2 = r1.cards[0], r2.cards[0]
-                if c1.rank == c2.rank or c1.suit == c2.suit:
-                    if r2.acceptsCards(r1, [c1]):
-                        self.addHint(5000, 1, r1, r2)
-                    if r1.acceptsCards(r2, [c2]):
-                        self.addHint(5000, 1, r2, r1)
-            r1, r2 = rows[i], rows[i + self.VAL2]
-            if r1.cards and r2.cards:
-                c1, c2 = r1.cards[0], r2.cards[0]
-                if c1.rank == c2.rank or c1.suit == c2.suit:
-                    if r2.acceptsCards(r1, [c1]):
-                        self.addHint(6000, 1, r1, r2)
-                    if r1.acceptsCards(r2, [c2]):
-                        self.addHint(6000, 1, r2, r1)
+        for val, score in ((self.VAL1, 5000), (self.VAL2, 6000)):
+            for i in range(len(rows)-val):
+                r1, r2 = rows[i], rows[i + val]
+                if r1.cards and r2.cards:
+                    c1, c2 = r1.cards[0], r2.cards[0]
+                    if c1.rank == c2.rank or c1.suit == c2.suit:
+                        if r2.acceptsCards(r1, [c1]):
+                            self.addMoveHint(score, r1, r2)
+                        if r1.acceptsCards(r2, [c2]):
+                            self.addMoveHint(score, r2, r1)
 
 
 class Accordion_RowStack(PushPin_RowStack):
@@ -282,6 +331,7 @@ class Accordion_RowStack(PushPin_RowStack):
 class Accordion(PushPin):
     Hint_Class = Accordion_Hint
     RowStack_Class = Accordion_RowStack
+    SOLVER_PRESET = 'bayan'
 
     def isGameWon(self):
         return len(self.s.foundations[0].cards) == 52
@@ -314,6 +364,7 @@ class Accordion2_RowStack(Accordion_RowStack):
 
 class Accordion2(Accordion):
     RowStack_Class = Accordion2_RowStack
+    SOLVER_PRESET = 'accordion'
 
     def isGameWon(self):
         return len(self.s.foundations[0].cards) == 51
@@ -329,6 +380,7 @@ class RelaxedAccordion_RowStack(Accordion2_RowStack):
 
 class RelaxedAccordion(Accordion2):
     RowStack_Class = RelaxedAccordion_RowStack
+    SOLVER_PRESET = 'relaxed_accordion'
 
 # ************************************************************************
 # * 23 Skidoo
@@ -347,6 +399,7 @@ class TwoThreeSkidoo_RowStack(Accordion2_RowStack):
 class TwoThreeSkidoo(Accordion2):
     RowStack_Class = TwoThreeSkidoo_RowStack
     Hint_Class = TwoThreeSkidoo_Hint
+    SOLVER_PRESET = 'skidoo'
 
     def isGameWon(self):
         return len(self.s.foundations[0].cards) == 50
@@ -385,6 +438,9 @@ class AccordionsRevenge(Accordion2):
                 self.s.rows[0].cards[0].rank == self.finalrank and
                 self.s.rows[0].cards[0].suit == self.finalsuit)
 
+    def getFinalCard(self):
+        return self.finalrank, self.finalsuit
+
     def _restoreGameHook(self, game):
         self.finalrank = game.loadinfo.dval.get('Rank')
         self.finalsuit = game.loadinfo.dval.get('Suit')
@@ -408,22 +464,23 @@ class AccordionsRevenge(Accordion2):
 # ************************************************************************
 
 
-# Hint should reveal a valid move, but some intelligence should be added.
-class Decade_Hint(AbstractHint):
+class Decade_Hint(PushPin_Hint):
 
-    def computeHints(self):
+    def computeMoveHints(self):
         game = self.game
+        # the line has no gaps: it ends at the first empty row
         rows = game.s.rows
-        for i in range(len(rows)):
-            for j in range(i + 1, len(rows)):
-                total = 0
-                count = 0
-                for k in range(i, j):
-                    if self.game.s.rows[k].cards:
-                        total += min(self.game.s.rows[k].cards[0].rank + 1, 10)
-                        count += 1
-                if total in [10, 20, 30] and count > 1:
-                    self.addHint(5000, 1, rows[i], rows[j - 1])
+        n = 0
+        while n < len(rows) and rows[n].cards:
+            n += 1
+        for i in range(n):
+            total = 0
+            for j in range(i, n):
+                total += min(rows[j].cards[0].rank + 1, 10)
+                if total > 30:
+                    break
+                if j > i and total in [10, 20, 30]:
+                    self.addMoveHint(5000, rows[i], rows[j])
 
 
 class Decade_RowStack(PushPin_RowStack):
@@ -465,6 +522,7 @@ class Decade_RowStack(PushPin_RowStack):
 class Decade(PushPin):
     Hint_Class = Decade_Hint
     RowStack_Class = Decade_RowStack
+    SOLVER_PRESET = 'decade'
 
     def isGameWon(self):
         return len(self.s.foundations[0].cards) == 52
@@ -475,24 +533,23 @@ class Decade(PushPin):
 # ************************************************************************
 
 
-# Hint should reveal a valid move, but some intelligence should be added.
-class SevenUp_Hint(AbstractHint):
+class SevenUp_Hint(PushPin_Hint):
 
-    def computeHints(self):
+    def computeMoveHints(self):
         game = self.game
+        # the line has no gaps: it ends at the first empty row
         rows = game.s.rows
-        for i in range(len(rows)):
-            if rows[i].cards and rows[i].cards[0].rank == 6:
-                self.addHint(5000, 1, rows[i], self.game.s.foundations[0])
-            for j in range(i + 1, len(rows)):
-                total = 0
-                count = 0
-                for k in range(i, j):
-                    if self.game.s.rows[k].cards:
-                        total += self.game.s.rows[k].cards[0].rank + 1
-                        count += 1
-                if total % 7 == 0 and 1 < count <= 4:
-                    self.addHint(5000, 1, rows[i], rows[j - 1])
+        n = 0
+        while n < len(rows) and rows[n].cards:
+            n += 1
+        for i in range(n):
+            if rows[i].cards[0].rank == 6:
+                self.addMoveHint(5000, rows[i], self.game.s.foundations[0])
+            total = 0
+            for j in range(i, min(i + 4, n)):
+                total += rows[j].cards[0].rank + 1
+                if j > i and total % 7 == 0:
+                    self.addMoveHint(5000, rows[i], rows[j])
 
 
 class SevenUp_RowStack(Decade_RowStack):
@@ -530,6 +587,7 @@ class SevenUp_RowStack(Decade_RowStack):
 class SevenUp(Decade):
     Hint_Class = SevenUp_Hint
     RowStack_Class = SevenUp_RowStack
+    SOLVER_PRESET = 'seven_up'
 
 
 registerGame(GameInfo(287, PushPin, "Push Pin",
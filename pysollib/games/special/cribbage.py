@@ -24,9 +24,12 @@
 
 from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
+from pysollib.games.special.poker import PokerSquare_Hint
 from pysollib.layout import Layout
 from pysollib.mygettext import _
 from pysollib.pysoltk import MfxCanvasText
+from pysollib.solvers.hands import SquareAdvisor, cribbageEstimate, \
+        cribbageScore, packCard
 from pysollib.stack import \
         InitialDealTalonStack, \
         InvisibleStack, \
@@ -61,7 +64,7 @@ class CribbageSquare_Talon(OpenTalonStack):
 class CribbageSquare(Game):
     Talon_Class = CribbageSquare_Talon
     RowStack_Class = StackWrapper(CribbageSquare_RowStack, max_move=0)
-    Hint_Class = None
+    Hint_Class = PokerSquare_Hint
 
     WIN_SCORE = 61
     NUM_RESERVE = 0
@@ -124,6 +127,10 @@ class CribbageSquare(Game):
             (r[3], r[3+4], r[3+8], r[3+12])
         ]
         self.cribbage_hands = list(map(tuple, self.cribbage_hands))
+        index = dict([(row.id, i) for i, row in enumerate(r)])
+        self.square_advisor = SquareAdvisor(
+            [[index[row.id] for row in hand] for hand in self.cribbage_hands],
+            cribbageEstimate)
 
         # define stack-groups
         l.defaultStackGroups()
@@ -186,88 +193,15 @@ class CribbageSquare(Game):
         score = self.checkHisHeels(score)
         return score
 
-    def getAllCombinations(self, hand):
-        if hand == ():
-            return ((),)
-
-        x = self.getAllCombinations(hand[1:])
-
-        return x + tuple([(hand[0],) + y for y in x])
-
     def getHandScore(self, hand):
-        same_suit = [0] * 4
-        hand_score = 0
-
+        # the score by the tables of pysollib.solvers.hands, with the
+        # upcard once the board is full
         upcard = None
-        upcard_talon = None
         if self.isBoardFull():
-            upcard_talon = self.getUpcardStack()
-            upcard = upcard_talon.cards[0]
-
-        # First get flushes and his nobs, as these can only be
-        # scored once per hand.
-        for s in hand:
-            if s.cards:
-                suit = s.cards[0].suit
-                same_suit[suit] = same_suit[suit] + 1
-                if upcard is not None and s.cards[0].rank == 10 \
-                        and s.cards[0].suit == upcard.suit:
-                    hand_score += 1  # His nobs
-        #
-        if max(same_suit) == 4:
-            hand_score += 4  # Flush
-            if upcard is not None and upcard.suit == hand[0].cards[0].suit:
-                hand_score += 1  # Flush of five
-
-        if upcard is not None:
-            hand = hand + (upcard_talon,)
-        combos = self.getAllCombinations(hand)
-
-        longest_run = 3
-        run_score = 0
-        # The remaining hands can be scored for every combination.
-        for c in combos:
-            c_same_rank = [0] * 13
-            c_ranks = []
-            total = 0
-            incomplete = False
-
-            for s in c:
-                if s.cards:
-                    rank = s.cards[0].rank
-                    c_same_rank[rank] = c_same_rank[rank] + 1
-                    c_ranks.append(rank)
-
-                    if rank < 10:
-                        total += (rank + 1)
-                    else:
-                        total += 10
-                else:
-                    incomplete = True
-                    break
-
-            if incomplete:
-                continue
-
-            if total == 15:
-                hand_score += 2  # Fifteen
-
-            if len(c) == 2 and max(c_same_rank) == 2:
-                hand_score += 2  # Pair
-
-            # For runs, we only want to consider the longest run
-            if len(c) >= longest_run:
-                if c_same_rank.count(1) == len(c):
-                    d = max(c_ranks) - min(c_ranks)
-                    if d == len(c) - 1:
-                        if len(c) > longest_run:
-                            run_score = 0
-                            longest_run = len(c)
-                        run_score += longest_run  # Runs
-
-        hand_score += run_score
-
-        return hand_score
+            card = self.getUpcardStack().cards[0]
+            upcard = packCard(card.rank, card.suit)
+        return cribbageScore([packCard(s.cards[0].rank, s.cards[0].suit)
+                              for s in hand if s.cards], upcard)
 
     def getUpcardStack(self):
         return self.s.talon
@@ -302,6 +236,7 @@ class CribbageShuffle(CribbageSquare):
     Talon_Class = InitialDealTalonStack
     RowStack_Class = StackWrapper(
         CribbageShuffle_RowStack, max_accept=1, max_cards=2)
+    Hint_Class = None
 
     WIN_SCORE = 61
 
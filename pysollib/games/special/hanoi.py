@@ -23,8 +23,11 @@
 
 from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
-from pysollib.hint import CautiousDefaultHint
+from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
+from pysollib.mygettext import ungettext
+from pysollib.pysoltk import MfxCanvasText
+from pysollib.solvers.hanoi import HanoiSolver
 from pysollib.stack import \
         BasicRowStack, \
         InitialDealTalonStack, \
@@ -35,9 +38,15 @@ from pysollib.stack import \
 # ************************************************************************
 
 
-class TowerOfHanoy_Hint(CautiousDefaultHint):
-    # FIXME: demo is completely clueless
-    pass
+class TowerOfHanoy_Hint(AbstractHint):
+    # the next move of a shortest solution
+    def computeHints(self):
+        game = self.game
+        moves = game.getSolution()
+        if not moves:
+            return
+        i, j = moves[0]
+        self.addHint(10000, 1, game.s.rows[i], game.s.rows[j])
 
 
 class TowerOfHanoy_RowStack(BasicRowStack):
@@ -54,11 +63,12 @@ class TowerOfHanoy_RowStack(BasicRowStack):
 
 class TowerOfHanoy(Game):
     RowStack_Class = TowerOfHanoy_RowStack
-    # FIXME: Re-enable hints if a good hint class can be built.
-    # But if hints are re-enabled, make sure to disable stuck-checking.
-    # You can't get stuck in Hanoi games.
-    # Hint_Class = TowerOfHanoy_Hint
-    Hint_Class = None
+    Hint_Class = TowerOfHanoy_Hint
+
+    # the row to build the tower on (None for any) and whether the cards
+    # have to be in order there
+    SOLVER_TARGET = None
+    SOLVER_IN_ORDER = False
 
     #
     # game layout
@@ -79,10 +89,33 @@ class TowerOfHanoy(Game):
             s.rows.append(
                 self.RowStack_Class(x, y, self, max_accept=1, max_move=1))
         s.talon = InitialDealTalonStack(l.XM, self.height-l.YS, self)
+        if self.preview <= 1:
+            self.texts.info = MfxCanvasText(
+                self.canvas, l.XM + 4*l.XS, l.YM, anchor="nw",
+                font=self.app.getFont("canvas_default"))
+        self.hanoi_solver = HanoiSolver(self.SOLVER_TARGET,
+                                        self.SOLVER_IN_ORDER)
 
         # define stack-groups
         l.defaultStackGroups()
 
+    #
+    # game extras
+    #
+
+    # the moves (from row, to row) of a shortest solution from here
+    def getSolution(self):
+        piles = [[c.rank for c in r.cards] for r in self.s.rows]
+        state, moves = self.hanoi_solver.solve(piles)
+        return moves
+
+    def updateText(self):
+        if self.preview > 1 or not self.texts.info:
+            return
+        n = len(self.getSolution())
+        t = ungettext('%d move\nto go', '%d moves\nto go', n) % n
+        self.texts.info.config(text=t)
+
     #
     # game overrides
     #
@@ -104,6 +137,10 @@ class TowerOfHanoy(Game):
     def getAutoStacks(self, event=None):
         return ((), (), self.sg.dropstacks)
 
+    # You can't get stuck in Hanoi games.
+    def getStuck(self):
+        return True
+
 
 # ************************************************************************
 # * Hanoi Puzzle
@@ -118,6 +155,9 @@ class HanoiPuzzle_RowStack(TowerOfHanoy_RowStack):
 
 class HanoiPuzzle4(TowerOfHanoy):
     RowStack_Class = HanoiPuzzle_RowStack
+    # the last row
+    SOLVER_TARGET = 2
+    SOLVER_IN_ORDER = True
 
     def _shuffleHook(self, cards):
         # no shuffling
@@ -157,6 +197,8 @@ class HanoiPuzzle8(HanoiPuzzle4):
 # ************************************************************************
 
 class HanoiSequence(TowerOfHanoy):
+    SOLVER_IN_ORDER = True
+
     def isGameWon(self):
         for s in self.s.rows:
             if len(s.cards) == len(self.cards) and isRankSequence(s.cards):
@@ -1208,6 +1208,7 @@ class MerlinsMeander(AbstractHexADeckGame):
         while self.base_card.suit == 4:
             self.s.talon.cards.remove(self.base_card)
             self.s.talon.cards.insert(0, self.base_card)
+            self.s.talon.rehash()
             self.base_card = self.s.talon.getCard()
         to_stack = self.s.foundations[2 * self.base_card.suit]
         self.flipMove(self.s.talon)
@@ -1572,6 +1573,8 @@ class MagicMontana(Montana):
     Hint_Class = MagicMontana_Hint
 
     RLEN, RSTEP, RBASE = 72, 18, 0
+    # the wizards are not modelled by the Montana solver
+    SOLVER_RULE = None
 
     def startGame(self):
         frames = 0
@@ -25,14 +25,32 @@ import math
 
 from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
+from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
 from pysollib.mfxutil import kwdefault
 from pysollib.settings import TOOLKIT
+from pysollib.solvers.lightsout import LightsOutSolver
 from pysollib.stack import \
         InitialDealTalonStack, \
         OpenStack
 from pysollib.util import ANY_RANK
 
+# ************************************************************************
+# * Lights Out Hint - the clicks of a solution with the fewest clicks
+# ************************************************************************
+
+
+class LightsOut_Hint(AbstractHint):
+    def computeHints(self):
+        game = self.game
+        clicks = game.getSolution()
+        if not clicks:
+            return
+        for r in game.s.rows:
+            if clicks & (1 << r.id):
+                self.addHint(10000, 1, r, r)
+
+
 # ************************************************************************
 # * Matrix Row Stack
 # ************************************************************************
@@ -63,24 +81,26 @@ class LightsOut_RowStack(OpenStack):
     def clickHandler(self, event):
         self.playFlipMove()
 
-    def playFlipMove(self, sound=True, animation=False):
+    # flip this card and the cards next to it (a click, from the
+    # player or a flip hint)
+    def flipMove(self, animation=False):
         rows = int(math.sqrt(self.game.gameinfo.ncards))
 
         playSpace = self.id
 
         if playSpace % rows != rows - 1:
-            self.game.s.rows[playSpace + 1].flipMove()
+            self.game.flipMove(self.game.s.rows[playSpace + 1])
 
         if playSpace % rows != 0:
-            self.game.s.rows[playSpace - 1].flipMove()
+            self.game.flipMove(self.game.s.rows[playSpace - 1])
 
         if playSpace + rows < rows ** 2:
-            self.game.s.rows[playSpace + rows].flipMove()
+            self.game.flipMove(self.game.s.rows[playSpace + rows])
 
         if playSpace - rows >= 0:
-            self.game.s.rows[playSpace - rows].flipMove()
+            self.game.flipMove(self.game.s.rows[playSpace - rows])
 
-        return OpenStack.playFlipMove(self, sound, animation)
+        OpenStack.flipMove(self, animation=animation)
 
 
 # Talon that can deal randomly flipped cards.
@@ -114,7 +134,7 @@ class LightsOut_Talon(InitialDealTalonStack):
 # ************************************************************************
 
 class LightsOut(Game):
-    Hint_Class = None
+    Hint_Class = LightsOut_Hint
 
     #
     # Game layout
@@ -122,6 +142,7 @@ class LightsOut(Game):
 
     def createGame(self):
         self.shownCards = tuple()
+        self.lights_solver = None
 
         l, s = Layout(self), self.s
         grid = math.sqrt(self.gameinfo.ncards)
@@ -184,6 +205,7 @@ class LightsOut(Game):
                     cards[n - rows].face_up = not cards[n - rows].face_up
 
             n += 1
+        self.s.talon.rehash()
 
         self.startDealSample()
         self.s.talon.dealRow(rows=self.s.rows[:self.gameinfo.ncards],
@@ -198,6 +220,25 @@ class LightsOut(Game):
                 return 0
         return 1
 
+    # the clicks (an int with bit i for row i) of a solution with the
+    # fewest clicks; the solver is built once for the size of the board
+    def getSolution(self):
+        rows = self.s.rows
+        if self.lights_solver is None:
+            size = int(math.sqrt(self.gameinfo.ncards))
+            self.lights_solver = LightsOutSolver(size)
+        board = 0
+        for r in rows:
+            if r.cards and r.cards[0].face_up:
+                board |= 1 << r.id
+        return self.lights_solver.solve(board)
+
+    # a hint is a click: highlight the card
+    def drawHintArrow(self, from_stack, to_stack, ncards, sleep):
+        card = from_stack.cards[-1]
+        color = self.app.opt.colors['samerank_1']
+        self._highlightCards([(from_stack, card, card, color)], sleep)
+
     def shallHighlightMatch(self, stack1, card1, stack2, card2):
         return ((card1.rank + 1 == card2.rank) or
                 (card1.rank - 1 == card2.rank))
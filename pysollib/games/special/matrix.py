@@ -22,17 +22,66 @@
 # ---------------------------------------------------------------------------##
 
 import math
+import threading
 
 from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
+from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
 from pysollib.mfxutil import kwdefault
 from pysollib.pysoltk import bind
+from pysollib.solvers.slidingpuzzle import PatternDatabase, \
+        SlidingPuzzleSolver
 from pysollib.stack import \
         InitialDealTalonStack, \
         OpenStack
 from pysollib.util import ANY_RANK
 
+# ************************************************************************
+# * The pattern databases of the 4x4 boards, by file name. Building them
+# * takes a minute or two, so it is done once, in the background, and
+# * saved; the solver goes without them until they are ready.
+# ************************************************************************
+
+_pattern_dbs = {}
+_pattern_lock = threading.Lock()
+
+
+def _loadPatternDatabase(filename):
+    pdb = PatternDatabase(4)
+    if not pdb.load(filename):
+        pdb.build()
+        pdb.save(filename)
+    _pattern_dbs[filename] = pdb
+
+
+def _getSharedPatternDatabase(filename):
+    with _pattern_lock:
+        if filename not in _pattern_dbs:
+            _pattern_dbs[filename] = None
+            thread = threading.Thread(target=_loadPatternDatabase,
+                                      args=(filename,))
+            thread.daemon = True
+            thread.start()
+    return _pattern_dbs[filename]
+
+
+# ************************************************************************
+# * Matrix Hint - the next move of a solution: the tile to slide into
+# * the empty stack
+# ************************************************************************
+
+
+class Matrix_Hint(AbstractHint):
+    def computeHints(self):
+        game = self.game
+        moves = game.getSolution()
+        if not moves:
+            return
+        empty = [r for r in game.s.rows if not r.cards][0]
+        self.addHint(10000, 1, game.s.rows[moves[0]], empty)
+
+
 # ************************************************************************
 # * Matrix Row Stack
 # ************************************************************************
@@ -132,10 +181,13 @@ class Matrix_RowStack(OpenStack):
 # ************************************************************************
 
 class Matrix(Game):
-    # FIXME: Re-enable hints if a good hint class can be built.
-    # But if hints are re-enabled, make sure to disable stuck-checking.
-    # You can't get stuck in Matrix games.
-    Hint_Class = None
+    Hint_Class = Matrix_Hint
+
+    # the nodes of the search for the fewest moves, with the pattern
+    # databases (a second or so) and without them, before the solver
+    # settles for more moves
+    SOLVER_NODES = 500000
+    SOLVER_NODES_NO_PDB = 50000
 
     #
     # Game layout
@@ -146,6 +198,8 @@ class Matrix(Game):
         grid = math.sqrt(self.gameinfo.ncards)
         assert grid == int(grid)
         grid = int(grid)
+        self.tiles_solver = None
+        self.tiles_results = {}
 
         # Set window size
         w, h = l.XM * 2 + l.CW * grid, l.YM * 2 + l.CH * grid
@@ -211,6 +265,45 @@ class Matrix(Game):
         return ((card1.rank + 1 == card2.rank) or
                 (card1.rank - 1 == card2.rank))
 
+    # You can't get stuck in Matrix games.
+    def getStuck(self):
+        return True
+
+    def _getPatternDatabase(self, size):
+        # only the 4x4 boards need one; kept in a file by the app
+        filename = getattr(getattr(self.app, 'fn', None), 'matrix_pdb', None)
+        if size != 4 or filename is None:
+            return None
+        return _getSharedPatternDatabase(filename)
+
+    # the stack ids of the tiles to slide into the empty stack, in turn,
+    # to win from here
+    def getSolution(self):
+        rows = self.s.rows
+        blank = len(rows) - 1
+        tiles = tuple(r.cards[0].rank if r.cards else blank for r in rows)
+        res = self.tiles_results.get(tiles)
+        if res is not None:
+            moves, n = res
+            return moves[n:]
+        size = int(math.sqrt(len(rows)))
+        if self.tiles_solver is None:
+            self.tiles_solver = SlidingPuzzleSolver(size)
+        solver = self.tiles_solver
+        solver.pattern_db = self._getPatternDatabase(size)
+        if solver.pattern_db is None:
+            solver.max_nodes = self.SOLVER_NODES_NO_PDB
+        else:
+            solver.max_nodes = self.SOLVER_NODES
+        state, moves = solver.solve(tiles)
+        # remember every position on the way
+        tiles = list(tiles)
+        for n, p in enumerate(moves):
+            self.tiles_results[tuple(tiles)] = (moves, n)
+            i = tiles.index(blank)
+            tiles[i], tiles[p] = tiles[p], blank
+        return moves
+
 
 # ************************************************************************
 # * Register a Matrix game
@@ -1023,7 +1023,7 @@ class Dikapala_Hint(AbstractHint):
                 if not pile or len(pile) != 1:
                     continue
                 if r in game.s.tableaux:
-                    rr = self.ClonedStack(r, stackcards=r.cards[:-1])
+                    rr = self.ClonedStack(r, ncards=len(r.cards) - 1)
                     if rr.acceptsCards(None, pile):
                         # do not move a card that is already in correct place
                         continue
@@ -1045,7 +1045,7 @@ class Dikapala_Hint(AbstractHint):
                 pile = r.getPile()
                 if not pile or len(pile) != 1:
                     continue
-                rr = self.ClonedStack(r, stackcards=r.cards[:-1])
+                rr = self.ClonedStack(r, ncards=len(r.cards) - 1)
                 if rr.acceptsCards(None, pile):
                     # do not move a card that is already in correct place
                     continue
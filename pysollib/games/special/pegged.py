@@ -25,6 +25,7 @@ from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
 from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
+from pysollib.solvers.pegged import PeggedSolver
 from pysollib.stack import \
         AbstractFoundationStack, \
         InitialDealTalonStack, \
@@ -34,9 +35,11 @@ from pysollib.util import ANY_SUIT
 
 
 class Pegged_Hint(AbstractHint):
-    # FIXME: no intelligence whatsoever is implemented here
+    # the first jump of a solution (see Pegged.getSolution()) is the
+    # best one, the others are scored at random
     def computeHints(self):
         game = self.game
+        solution = game.getSolution()
         # get free stacks
         stacks = [r for r in game.s.rows if not r.cards]
         #
@@ -45,8 +48,11 @@ class Pegged_Hint(AbstractHint):
                 r = game.map.get((t.pos[0] + dx, t.pos[1] + dy))
                 if not r or not r.cards or not t.acceptsCards(r, r.cards):
                     continue
-                # braindead scoring...
-                score = 10000 + game.app.miscrandom.randint(0, 9999)
+                if solution and solution[0] == (r, t):
+                    score = 30000
+                else:
+                    # braindead scoring...
+                    score = 10000 + game.app.miscrandom.randint(0, 9999)
                 self.addHint(score, 1, r, t)
 
 
@@ -123,6 +129,11 @@ class Pegged(Game):
     STEPS = ((-4, 0), (4, 0), (0, -4), (0, 4))
     ROWS = (3, 5, 7, 7, 7, 5, 3)
     EMPTY_STACK_ID = -1
+    SOLVER_ITERS = 10000
+    # the stuck check after each jump only searches with few pegs
+    # left and a small budget; the results of the hints are used too
+    STUCK_PEGS = 16
+    STUCK_ITERS = 500
 
     GAME_VERSION = 2
 
@@ -141,6 +152,8 @@ class Pegged(Game):
 
         # game extras 1)
         self.map = {}
+        self.pegs_solver = None
+        self.pegs_results = {}
 
         # create stacks
         for i in range(len(self.ROWS)):
@@ -181,8 +194,8 @@ class Pegged(Game):
         cards = list(self.cards)
         cards.reverse()
         for card in cards:
-            self.s.talon.addCard(card, update=0)
             card.showBack(unhide=0)
+            self.s.talon.addCard(card, update=0)
 
     def startGame(self):
         self.startDealSample()
@@ -214,6 +227,73 @@ class Pegged(Game):
         dval = {'EmptyStack': self.emptyStack}
         p.dump(dval)
 
+    # Pegged special: solve the game from here.  The solver (see
+    # pysollib.solvers.pegged) and its results by position and target
+    # hole are kept for the next deals; a solution also gives the
+    # results of the positions on its way. A search with less than
+    # the full budget keeps only the results it found for sure.
+
+    def _getPegs(self):
+        pegs = 0
+        for r in self.s.rows:
+            if r.cards:
+                pegs |= 1 << r.id
+        return pegs
+
+    def _solvePegs(self, target, max_iters=None):
+        rows = self.s.rows
+        if self.pegs_solver is None:
+            self.pegs_solver = PeggedSolver([r.pos for r in rows],
+                                            self.STEPS,
+                                            max_iters=self.SOLVER_ITERS)
+        pegs = self._getPegs()
+        res = self.pegs_results.get((pegs, target))
+        if res is not None:
+            return res
+        self.pegs_solver.max_iters = max_iters or self.SOLVER_ITERS
+        res = self.pegs_solver.solve([r.id for r in rows if r.cards],
+                                     target)
+        state, moves = res
+        if state == 'intractable' and max_iters:
+            return res
+        self.pegs_results[(pegs, target)] = res
+        if state == 'solved':
+            for n, (i, k) in enumerate(moves):
+                (xi, yi), (xk, yk) = rows[i].pos, rows[k].pos
+                over = self.map[((xi + xk) // 2, (yi + yk) // 2)]
+                pegs ^= (1 << i) | (1 << over.id) | (1 << k)
+                self.pegs_results[(pegs, target)] = (state, moves[n+1:])
+        return res
+
+    # the jumps (from stack, to stack) of a solution from here, or None;
+    # a perfect one if there is one
+    def getSolution(self):
+        rows = self.s.rows
+        if not [r for r in rows if not r.cards]:
+            return None
+        targets = [None]
+        if 0 <= self.emptyStack < len(rows):
+            targets.insert(0, self.emptyStack)
+        for target in targets:
+            state, moves = self._solvePegs(target)
+            if state == 'solved':
+                return [(rows[i], rows[k]) for i, k in moves]
+        return None
+
+    # Pegged special: stuck if there is no jump or no solution
+    def getStuck(self):
+        if not self.getHighlightPilesStacks()[0][0]:
+            return False
+        pegs = self._getPegs()
+        if self.emptyStack >= 0 and \
+                self.pegs_results.get((pegs, self.emptyStack),
+                                      ('',))[0] == 'solved':
+            return True
+        if (pegs, None) not in self.pegs_results and \
+                bin(pegs).count('1') > self.STUCK_PEGS:
+            return True
+        return self._solvePegs(None, self.STUCK_ITERS)[0] != 'unsolved'
+
     # Pegged special: check for a perfect game
     def getWinStatus(self):
         won, status, updated = Game.getWinStatus(self)
@@ -23,9 +23,12 @@
 
 from pysollib.game import Game
 from pysollib.gamedb import GI, GameInfo, registerGame
+from pysollib.hint import AbstractHint
 from pysollib.layout import Layout
 from pysollib.mygettext import _
 from pysollib.pysoltk import MfxCanvasText
+from pysollib.solvers.hands import SquareAdvisor, packCard, pokerEstimate, \
+        pokerScore
 from pysollib.stack import \
         InitialDealTalonStack, \
         InvisibleStack, \
@@ -33,6 +36,20 @@ from pysollib.stack import \
         ReserveStack, \
         StackWrapper
 
+# ************************************************************************
+# * Poker Square Hint - the rows for the card of the talon, the best
+# * by the placement advisor (game.square_advisor) first; for Cribbage
+# * Square as well
+# ************************************************************************
+
+
+class PokerSquare_Hint(AbstractHint):
+    def computeHints(self):
+        game = self.game
+        for value, row in game.square_advisor.adviseGame(game):
+            self.addHint(int(value * 100), 1, game.s.talon, row)
+
+
 # ************************************************************************
 # * Poker Square
 # ************************************************************************
@@ -51,7 +68,7 @@ class PokerSquare_RowStack(ReserveStack):
 class PokerSquare(Game):
     Talon_Class = OpenTalonStack
     RowStack_Class = StackWrapper(PokerSquare_RowStack, max_move=0)
-    Hint_Class = None
+    Hint_Class = PokerSquare_Hint
 
     WIN_SCORE = 100
     NUM_RESERVE = 0
@@ -153,6 +170,10 @@ One Pair'''))
             (r[4], r[4+5], r[4+10], r[4+15], r[4+20]),
         ]
         self.poker_hands = list(map(tuple, self.poker_hands))
+        index = dict([(row.id, i) for i, row in enumerate(r)])
+        self.square_advisor = SquareAdvisor(
+            [[index[row.id] for row in hand] for hand in self.poker_hands],
+            pokerEstimate)
 
         # define stack-groups
         l.defaultStackGroups()
@@ -217,47 +238,10 @@ One Pair'''))
         return score
 
     def getHandScore(self, hand):
-        same_rank = [0] * 13
-        same_suit = [0] * 4
-        ranks = []
-        for s in hand:
-            if s.cards:
-                rank, suit = s.cards[0].rank, s.cards[0].suit
-                same_rank[rank] = same_rank[rank] + 1
-                same_suit[suit] = same_suit[suit] + 1
-                ranks.append(rank)
-        #
-        straight = 0
-        if same_rank.count(1) == 5:
-            d = max(ranks) - min(ranks)
-            if d == 4:
-                straight = 1                # normal straight
-            elif d == 12 and same_rank[-4:].count(1) == 4:
-                straight = 2                # straight with Ace ranked high
-        #
-        if max(same_suit) == 5:
-            if straight:
-                if straight == 2:
-                    return 0, 100           # Royal Flush
-                return 1, 75                # Straight Flush
-            return 4, 20                    # Flush
-        #
-        if straight:
-            return 5, 15                    # Straight
-        #
-        if max(same_rank) >= 2:
-            same_rank.sort()
-            if same_rank[-1] == 4:
-                return 2, 50                # Four of a Kind
-            if same_rank[-1] == 3:
-                if same_rank[-2] == 2:
-                    return 3, 25            # Full House
-                return 6, 10                # Three of a Kind
-            if same_rank[-2] == 2:
-                return 7, 5                 # Two Pairs
-            return 8, 2                     # Pair
-        #
-        return -1, 0
+        # (type, value) by the tables of pysollib.solvers.hands;
+        # type is -1 for nothing, else the line of the texts
+        return pokerScore([packCard(s.cards[0].rank, s.cards[0].suit)
+                           for s in hand if s.cards])
 
 
 # ************************************************************************
@@ -284,6 +268,7 @@ class PokerShuffle(PokerSquare):
     Talon_Class = InitialDealTalonStack
     RowStack_Class = StackWrapper(
         PokerShuffle_RowStack, max_accept=1, max_cards=2)
+    Hint_Class = None
 
     WIN_SCORE = 200
 
@@ -48,8 +48,7 @@ class Samegame_Hint(AbstractHint):
         game = self.game
         for r in game.s.rows:
             if r.cards:
-                removeStacks = r.getRemoveStacks()
-                score = 100 * len(removeStacks)
+                score = 100 * game.getGroupSize(r)
                 if score > 100:
                     self.addHint(score, 1, r, game.s.foundations[0])
 
@@ -101,16 +100,30 @@ class Samegame_RowStack(OpenStack):
     def fillStack(self):
         self.game.fillStack(self)
 
+    def addCard(self, card, unhide=1, update=1):
+        card = OpenStack.addCard(self, card, unhide=unhide, update=update)
+        self.game.updateGroups(self)
+        return card
+
+    def removeCard(self, card=None, unhide=1, update=1, update_positions=0):
+        card = OpenStack.removeCard(self, card, unhide=unhide, update=update,
+                                    update_positions=update_positions)
+        self.game.updateGroups(self)
+        return card
+
     def getRemoveStacks(self):
+        labels = self.game.getGroupLabels()
+        label = labels[self.id]
         removeStacks = [self]
         spotsChecked = 0
+        seen = set(removeStacks)
         while spotsChecked < len(removeStacks):
             adjacent = self.getAdjacent(removeStacks[spotsChecked].id)
             for adjacentStack in adjacent:
-                if adjacentStack not in removeStacks and \
-                        len(adjacentStack.cards) > 0 and \
-                        adjacentStack.cards[0].suit == self.cards[0].suit:
+                if adjacentStack not in seen and \
+                        labels[adjacentStack.id] == label:
                     removeStacks.append(adjacentStack)
+                    seen.add(adjacentStack)
             spotsChecked += 1
         return removeStacks
 
@@ -175,6 +188,12 @@ class AbstractSamegameGame(Game):
         h = l.YM + dyy + rows * cardh + d_y + l.YM
         self.setSize(w, h)
 
+        # the groups of tiles, see getGroupLabels()
+        self.changed_col = 0
+        self.group_parents = [[]] + [None] * (cols-1)
+        self.group_labels = None
+        self.group_sizes = None
+
         #
         self.cols = [[] for i in range(cols)]
         cl = range(cols)
@@ -225,6 +244,75 @@ class AbstractSamegameGame(Game):
             self.moveMove(1, from_stack, to_stack, frames=0)
             to_stack = from_stack
 
+    # The groups of adjacent tiles of the same color are found by
+    # union-find over the grid, column by column from the left.  The
+    # parents of the tiles of the columns before column c are kept in
+    # self.group_parents[c] as they were when column c was reached, so
+    # after a move only the columns from the leftmost changed one (see
+    # updateGroups()) are done again.  The label of a tile is the id of
+    # the first stack of its group, that of an empty stack is -1.
+
+    def updateGroups(self, stack):
+        self.changed_col = min(self.changed_col, stack.coln)
+
+    def getGroupLabels(self):
+        cols, rows = self.L
+        c0 = self.changed_col
+        if c0 >= cols:
+            return self.group_labels
+        self.changed_col = cols
+        stacks = self.s.rows
+        parent = self.group_parents[c0] + list(range(c0*rows, cols*rows))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for c in range(c0, cols):
+            self.group_parents[c] = parent[:c*rows]
+            for i in range(c*rows, (c+1)*rows):
+                if not stacks[i].cards:
+                    continue
+                suit = stacks[i].cards[0].suit
+                if i % rows:
+                    neighbours = (i-1, i-rows)
+                else:
+                    neighbours = (i-rows,)
+                for j in neighbours:
+                    if j >= 0 and stacks[j].cards and \
+                            stacks[j].cards[0].suit == suit:
+                        a, b = find(i), find(j)
+                        if a != b:
+                            parent[max(a, b)] = min(a, b)
+        labels = []
+        sizes = {}
+        for i in range(cols*rows):
+            if stacks[i].cards:
+                label = find(i)
+                sizes[label] = sizes.get(label, 0) + 1
+            else:
+                label = -1
+            labels.append(label)
+        self.group_labels = labels
+        self.group_sizes = sizes
+        return labels
+
+    def getGroupSize(self, stack):
+        label = self.getGroupLabels()[stack.id]
+        return self.group_sizes.get(label, 0)
+
+    def hasMoves(self):
+        self.getGroupLabels()
+        for n in self.group_sizes.values():
+            if n > 1:
+                return True
+        return False
+
+    def getStuck(self):
+        return self.hasMoves()
+
     def slideStacks(self):
         # Slide to the left to fill empty columns.
         numrows = self.L[1]
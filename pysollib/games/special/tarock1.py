@@ -426,6 +426,8 @@ class TrumpsRow(Montana):
     Talon_Class = StackWrapper(TrumpsRow_Talon, max_rounds=5)
     RLEN, RSTEP, RBASE = 78, 14, 1
     TRUMPSUIT = 4
+    # the row of trumps is not modelled by the Montana solver
+    SOLVER_RULE = None
 
     def createGame(self, round_text=True):
         decks = self.gameinfo.decks
@@ -61,6 +61,7 @@ class StHelena_Talon(TalonStack):
             return 0
         # redeal
         self.cards.reverse()
+        self.rehash()
         self.game.nextRoundMove(self)
         self.game.startDealSample()
         for i in range(lr):
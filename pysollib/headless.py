@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------
+
+# ************************************************************************
+# * Headless games
+# *
+# * A null view backend that lets any registered game run without a
+# * display: the canvas, its items and the card images are all
+# * replaced by objects that accept every call and draw nothing.
+# *
+# * Usage:
+# *
+# *   app = HeadlessApp()
+# *   game = app.constructHeadlessGame(2)   # Klondike
+# *   game.newGame(random=construct_random('1'))
+# *   hints = game.getHints(0)
+# *   result = app.runDemo(game, range(1, 101))  # demo win rate
+# ************************************************************************
+
+import pysollib.games  # noqa: F401
+import pysollib.games.mahjongg  # noqa: F401
+import pysollib.games.special  # noqa: F401
+from pysollib.app_statistics import Statistics
+from pysollib.gamedb import GAME_DB
+from pysollib.images import Images
+from pysollib.mfxutil import Struct, uclock
+from pysollib.options import Options
+from pysollib.pysolrandom import PysolRandom, construct_random
+from pysollib.resource import CSI, Cardset
+
+# the preview level of a headless game (see Game.preview) - no texts
+# and no animations are created at all
+HEADLESS_PREVIEW = 2
+
+
+# ************************************************************************
+# * canvas
+# ************************************************************************
+
+class NullTk:
+    # the Tcl interpreter of a NullCanvas
+
+    def call(self, *args):
+        return ''
+
+    def splitlist(self, value):
+        return ()
+
+    def split(self, value):
+        return ()
+
+    def getint(self, value):
+        return 0
+
+
+class NullWidget:
+    # toplevel and canvas share the widget interface used by tkutil
+
+    _w = '.null'
+
+    def __init__(self):
+        self.tk = NullTk()
+        self._tclCommands = [None]
+
+    def after(self, ms, func=None, *args):
+        return None
+
+    def after_idle(self, func, *args):
+        return None
+
+    def after_cancel(self, id):
+        pass
+
+    def deletecommand(self, name):
+        pass
+
+    def bind(self, sequence=None, func=None, add=None):
+        return None
+
+    def unbind(self, sequence, funcid=None):
+        pass
+
+    def _register(self, func, subst=None, needcleanup=1):
+        return ''
+
+    def config(self, cnf=None, **kw):
+        pass
+
+    configure = config
+
+    def cget(self, key):
+        return 0
+
+    def update(self):
+        pass
+
+    def update_idletasks(self):
+        pass
+
+    def winfo_ismapped(self):
+        return False
+
+    def winfo_width(self):
+        return 0
+
+    def winfo_height(self):
+        return 0
+
+
+class NullCanvas(NullWidget):
+    # Implements the part of tkinter.Canvas and MfxCanvas used by
+    # the canvas items (MfxCanvasGroup, MfxCanvasImage, ...), so the
+    # regular Stack and Card classes run unmodified on top of it.
+
+    def __init__(self, preview=HEADLESS_PREVIEW):
+        NullWidget.__init__(self)
+        self.preview = preview
+        self.busy = False
+        self.items = {}
+        self.xmargin, self.ymargin = 0, 0
+        self._text_color = "#000000"
+        self._text_items = []
+        self._item_id = 0
+
+    #
+    # tkinter.Canvas
+    #
+
+    def _create(self, itemType, args, kw):
+        # items are never drawn, so they only need a unique id
+        self._item_id += 1
+        return self._item_id
+
+    def _do(self, name, args=()):
+        return ''
+
+    def _getints(self, string):
+        return ()
+
+    def addtag(self, *args):
+        pass
+
+    def dtag(self, *args):
+        pass
+
+    def delete(self, *args):
+        pass
+
+    def move(self, *args):
+        pass
+
+    def coords(self, *args):
+        return [0, 0]
+
+    def bbox(self, *args):
+        return None
+
+    def itemconfig(self, tagOrId, cnf=None, **kw):
+        return None
+
+    itemconfigure = itemconfig
+
+    def gettags(self, *args):
+        return ()
+
+    def type(self, tagOrId):
+        return None
+
+    def tag_raise(self, *args):
+        pass
+
+    def tag_lower(self, *args):
+        pass
+
+    def tag_bind(self, tagOrId, sequence=None, func=None, add=None):
+        return None
+
+    def tag_unbind(self, tagOrId, sequence, funcid=None):
+        pass
+
+    def xview(self, *args):
+        return (0.0, 1.0)
+
+    def yview(self, *args):
+        return (0.0, 1.0)
+
+    #
+    # MfxCanvas
+    #
+
+    def setInitialSize(self, width, height, margins=True, scrollregion=True):
+        pass
+
+    def deleteAllItems(self):
+        self.items = {}
+        self._text_items = []
+
+    def findCard(self, stack, event):
+        return -1
+
+    def setTextColor(self, color):
+        pass
+
+    def setTile(self, image, stretch=0, save_aspect=0):
+        return True
+
+    def setTopImage(self, image, cw=0, ch=0):
+        return True
+
+    def hideAllItems(self):
+        pass
+
+    def showAllItems(self):
+        pass
+
+
+class NullToplevel(NullWidget):
+    # the subset of MfxRoot used by class Game
+
+    def wm_title(self, title=None):
+        pass
+
+    def wm_iconname(self, name=None):
+        pass
+
+    def wm_state(self, newstate=None):
+        return 'normal'
+
+    def wm_geometry(self, newGeometry=None):
+        return ''
+
+    def busyUpdate(self):
+        pass
+
+    def mainquit(self):
+        pass
+
+    def sleep(self, seconds):
+        pass
+
+    def interruptSleep(self):
+        pass
+
+
+# ************************************************************************
+# * images
+# ************************************************************************
+
+class NullImages(Images):
+    # Card metrics of a standard cardset, but no image data at all.
+    # Stacks and cards simply create no bottom/face canvas items.
+
+    def __init__(self, cardw=73, cardh=97):
+        cs = Cardset(ident="headless", name="Headless")
+        # the metrics come from CardsetConfig and can't be passed as
+        # keywords (see Cardset.__init__)
+        cs.version = 6
+        cs.type = CSI.TYPE_FRENCH
+        cs.CARDW, cs.CARDH = cardw, cardh
+        cs.CARD_XOFFSET, cs.CARD_YOFFSET = cardw // 4, cardh // 4
+        cs.SHADOW_XOFFSET, cs.SHADOW_YOFFSET = 0, 0
+        Images.__init__(self, None, cs)
+
+    def resize(self, xf, yf, resample=1):
+        pass
+
+    def getFace(self, deck, suit, rank):
+        return None
+
+    def getBack(self, update=False):
+        return None
+
+    def getTalonBottom(self):
+        return None
+
+    def getReserveBottom(self):
+        return None
+
+    def getBlankBottom(self):
+        return None
+
+    def getSuitBottom(self, suit=-1):
+        return None
+
+    def getBraidBottom(self):
+        return None
+
+    def getLetter(self, rank):
+        return None
+
+    def getShadow(self, ncards):
+        return None
+
+    def getShade(self):
+        return None
+
+    def getHighlightedCard(self, deck, suit, rank, color=None):
+        return None
+
+    def getHighlightedBack(self):
+        return None
+
+
+# ************************************************************************
+# * application
+# ************************************************************************
+
+class HeadlessApp:
+    # A stand-in for class Application that is good enough to create,
+    # deal and play any game. No options or statistics are loaded from
+    # or saved to disk.
+
+    def __init__(self, images=None):
+        self.gdb = GAME_DB
+        self.opt = Options()
+        # no user interaction at all
+        self.opt.animations = 0
+        self.opt.flip_animation = False
+        self.opt.redeal_animation = False
+        self.opt.win_animation = False
+        self.opt.sound = False
+        self.opt.shadow = False
+        self.opt.shade = False
+        self.opt.randomize_place = False
+        self.opt.stuck_notification = False
+        self.opt.statusbar = False
+        self.stats = Statistics()
+        self.top = NullToplevel()
+        self.top_cursor = None
+        self.canvas = NullCanvas()
+        self.menubar = None
+        self.toolbar = None
+        self.statusbar = None
+        self.audio = None
+        if images is None:
+            images = NullImages()
+        self.images = images
+        self.cardset = images.cs
+        self.gimages = Struct(
+            demo=[],
+            pause=[],
+            logos=[],
+            redeal=[None, None],
+        )
+        self.intro = Struct(
+            progress=None,
+        )
+        self.gamerandom = PysolRandom()
+        self.miscrandom = PysolRandom()
+        self.nextgame = Struct(
+            id=0,
+            random=None,
+            loadedgame=None,
+            startdemo=0,
+            cardset=None,
+            holdgame=0,
+            bookmark=None,
+        )
+        self.demo_counter = 0
+
+    def getFont(self, name):
+        return self.opt.fonts.get(name)
+
+    def getGameTitleName(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            return None
+        return gi.name
+
+    def getRandomGameId(self):
+        return self.miscrandom.choice(self.gdb.getGamesIdSortedById())
+
+    def wm_save_state(self):
+        pass
+
+    def constructGame(self, id):
+        gi = self.gdb.get(id)
+        if gi is None:
+            raise Exception("Unknown game (id %d)" % id)
+        return gi.gameclass(gi)
+
+    def constructHeadlessGame(self, id):
+        # construct and create a game that is ready for newGame()
+        game = self.constructGame(id)
+        game.createHeadless(self)
+        return game
+
+    def runDemo(self, game, seeds, turbo=1000):
+        # play a turbo demo (see Game.startDemo) of game for each seed
+        # and count the games in the demo statistics, as
+        # Game.updateStats(demo=1) does for a game that is shown
+        result = Struct(played=0, won=0, moves=0, rate=0.0)
+        start = uclock()
+        for seed in seeds:
+            game.newGame(random=construct_random(str(seed)), autoplay=0)
+            game.startDemo(mixed=0, turbo=turbo)
+            demo = game.demo
+            while not game.playTurboDemoMoves(demo):
+                if game.isGameWon():
+                    break
+            won = game.isGameWon() != 0
+            game.stopDemo()
+            self.stats.updateStats(None, game, int(won))
+            result.played += 1
+            result.won += won
+            result.moves += demo.turbo_moves
+        t = uclock() - start
+        if t > 0:
+            result.rate = result.moves / t
+        return result
@@ -22,21 +22,66 @@
 # ---------------------------------------------------------------------------##
 
 
+import hashlib
+import json
 import os
 import re
+import shlex
+import signal
 import subprocess
+import threading
 import time
-from io import BytesIO
+from collections import OrderedDict
+from shutil import which
 
 from pysollib.mfxutil import destruct
 from pysollib.pysolrandom import construct_random
 from pysollib.settings import DEBUG, FCS_COMMAND
+from pysollib.solvers.freecell import FreeCellSolver, cardValue
+from pysollib.solvers.golf import GolfSolver
 from pysollib.util import KING
 
 import six
+from six.moves import queue
 
 FCS_VERSION = None
 
+# ************************************************************************
+# * HintCache is a LRU cache of computed hint lists. Game.getHints()
+# * keys it by position hash and hint level (see Game.getHintCacheKey),
+# * so undo/redo, the stuck check and the demo don't compute the hints
+# * of a position twice. LookaheadHint uses it as transposition table.
+# ************************************************************************
+
+
+class HintCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key):
+        hints = self._cache.get(key)
+        if hints is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._cache.move_to_end(key)
+        return hints
+
+    def put(self, key, hints):
+        self._cache[key] = hints
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
 # ************************************************************************
 # * HintInterface is an abstract class that defines the public
 # * interface - it only consists of the constructor
@@ -74,6 +119,133 @@ class HintInterface:
         return []
 
 
+# ************************************************************************
+# * CardsView is a copy-on-write list of cards used by cloned stacks.
+# * It shares the card list of the original stack (optionally only the
+# * bottom ncards cards, plus extra cards on top) and copies it only
+# * when it is changed.
+# ************************************************************************
+
+class CardsView:
+    __slots__ = ('_cards', '_n', '_extra')
+
+    def __init__(self, cards, ncards=None, extra=()):
+        if ncards is None:
+            ncards = len(cards)
+        self._cards = cards
+        self._n = ncards
+        self._extra = extra
+
+    def _list(self):
+        # the cards as a private list (copy on write)
+        cards = self._cards
+        if self._n != len(cards) or self._extra or \
+                not isinstance(cards, _OwnedCards):
+            cards = self._cards = _OwnedCards(cards[:self._n])
+            cards.extend(self._extra)
+            self._n = len(cards)
+            self._extra = ()
+        return cards
+
+    def __len__(self):
+        return self._n + len(self._extra)
+
+    def __bool__(self):
+        return self._n > 0 or len(self._extra) > 0
+
+    __nonzero__ = __bool__
+
+    def __getitem__(self, i):
+        if not self._extra and self._n == len(self._cards):
+            return self._cards[i]
+        if isinstance(i, slice):
+            return (self._cards[:self._n] + list(self._extra))[i]
+        if i < 0:
+            i += len(self)
+            if i < 0:
+                raise IndexError(i)
+        if i < self._n:
+            return self._cards[i]
+        return self._extra[i - self._n]
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._cards[i]
+        for c in self._extra:
+            yield c
+
+    def __reversed__(self):
+        return reversed(self[:])
+
+    def __contains__(self, card):
+        return card in self[:]
+
+    def __eq__(self, other):
+        return self[:] == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __add__(self, other):
+        return self[:] + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self[:]
+
+    def index(self, card):
+        return self[:].index(card)
+
+    def count(self, card):
+        return self[:].count(card)
+
+    # changing the view gives it its own list
+
+    def __setitem__(self, i, value):
+        self._list()[i] = value
+
+    def __delitem__(self, i):
+        cards = self._list()
+        del cards[i]
+        self._n = len(cards)
+
+    def append(self, card):
+        cards = self._list()
+        cards.append(card)
+        self._n = len(cards)
+
+    def extend(self, more):
+        cards = self._list()
+        cards.extend(more)
+        self._n = len(cards)
+
+    def insert(self, i, card):
+        cards = self._list()
+        cards.insert(i, card)
+        self._n = len(cards)
+
+    def pop(self, i=-1):
+        cards = self._list()
+        card = cards.pop(i)
+        self._n = len(cards)
+        return card
+
+    def remove(self, card):
+        cards = self._list()
+        cards.remove(card)
+        self._n = len(cards)
+
+    def reverse(self):
+        self._list().reverse()
+
+    def sort(self, *args, **kw):
+        self._list().sort(*args, **kw)
+
+
+class _OwnedCards(list):
+    # marks the private card list of a CardsView
+    pass
+
+
 # ************************************************************************
 # * AbstractHint provides a useful framework for derived hint classes.
 # *
@@ -108,16 +280,23 @@ class AbstractHint(HintInterface):
 
     # Create a shallow copy of a stack.
     class AClonedStack:
-        def __init__(self, stack, stackcards):
+        def __init__(self, stack, cards):
             # copy class identity
             self.__class__ = stack.__class__
             # copy model data (reference copy)
             stack.copyModel(self)
-            # set new cards (shallow copy of the card list)
-            self.cards = stackcards[:]
-
-    def ClonedStack(self, stack, stackcards):
-        s = self.AClonedStack(stack, stackcards)
+            # set new cards (a copy-on-write view of the card list)
+            self.cards = cards
+
+    # The cards of the clone are either stackcards or the bottom ncards
+    # cards of the stack (default: all) plus the extra cards on top.
+    # No card list is copied unless the clone changes it.
+    def ClonedStack(self, stack, stackcards=None, ncards=None, extra=()):
+        if stackcards is None:
+            cards = CardsView(stack.cards, ncards, extra)
+        else:
+            cards = CardsView(stackcards)
+        s = self.AClonedStack(stack, cards)
         self.__clones.append(s)
         return s
 
@@ -583,7 +762,7 @@ class DefaultHint(AbstractHint):
             for t in rows:
                 if t is s or not t.acceptsCards(s, [card]):
                     continue
-                tt = self.ClonedStack(t, stackcards=t.cards+[card])
+                tt = self.ClonedStack(t, extra=(card,))
                 # search a Stack that would benefit from this card
                 for r in dropstacks:
                     if r is t:
@@ -714,6 +893,141 @@ class SpiderType_Hint(DefaultHint):
     pass
 
 
+# ************************************************************************
+# * LookaheadHint searches the moves of a DefaultHint class a few
+# * plies deep and ranks them by the best line that follows, using
+# * the DefaultHint scores as evaluation function.
+# *
+# * The moves are played on the real stacks (without animation) and
+# * undone afterwards. Positions are memoized in a transposition
+# * table keyed by position hash (see Game.getHintCacheKey), and the
+# * search gives up after a given number of nodes or seconds. It is
+# * used by Game.getHints() if options hint_lookahead_* are set.
+# ************************************************************************
+
+class LookaheadHint(HintInterface):
+    # the next move counts this much less than the current one
+    DISCOUNT = 0.5
+    SCORE_WON = 10000000
+    SCORE_DEAD_END = -1000000
+
+    def __init__(self, game, level, depth=None, width=None,
+                 nodes=None, timeout=None):
+        opt = game.app.opt
+        self.game = game
+        self.level = level
+        self.depth = opt.hint_lookahead_depth if depth is None else depth
+        self.width = opt.hint_lookahead_width if width is None else width
+        self.max_nodes = opt.hint_lookahead_nodes if nodes is None else nodes
+        self.timeout = opt.hint_lookahead_time if timeout is None \
+            else timeout
+        # scores are not flattened (level 0) while searching
+        self.hint = game.getHintClass()(game, max(1, min(level, 2)))
+        self.transpositions = game.hints.transpositions
+        self.nodes = 0
+        self.deadline = None
+
+    def getHints(self, taken_hint=None):
+        game = self.game
+        if taken_hint and taken_hint[6]:
+            return [taken_hint[6]]
+        hints = self.hint.getHints()
+        if self.depth <= 0 or len(hints) <= 1 or \
+                game.moves.state != game.S_PLAY:
+            return hints
+        self.nodes = 0
+        self.deadline = time.time() + self.timeout
+        path = set([game.getPositionHash()])
+        result = []
+        for h in hints:
+            value = self._searchMove(h, self.depth - 1, path)
+            result.append((int(value),) + h[1:])
+        result.sort()
+        result.reverse()
+        return result
+
+    def _outOfBudget(self):
+        return (self.nodes >= self.max_nodes or
+                time.time() > self.deadline)
+
+    # the value of a hint: its score plus the discounted value
+    # of the best line after it
+    def _searchMove(self, hint, depth, path):
+        score, pos, ncards, from_stack, to_stack = hint[:5]
+        if ncards == 0 or self._outOfBudget():
+            # deals are not searched
+            return score
+        game = self.game
+        self.nodes += 1
+        moves = self._doMove(hint)
+        try:
+            if game.isGameWon():
+                return self.SCORE_WON
+            h = game.getPositionHash()
+            if h in path:
+                # back to a position of this line
+                return self.SCORE_DEAD_END
+            path.add(h)
+            try:
+                value = self._searchPosition(depth, path)
+            finally:
+                path.discard(h)
+        finally:
+            self._undoMoves(moves)
+        return score + self.DISCOUNT * value
+
+    # the value of the best line in the current position
+    def _searchPosition(self, depth, path):
+        game = self.game
+        key = game.getHintCacheKey(self.hint.level) + (depth, self.width)
+        value = self.transpositions.get(key)
+        if value is not None:
+            return value
+        hints = self.hint.getHints()
+        if not hints:
+            if game.canDealCards():
+                return 0
+            return self.SCORE_DEAD_END
+        if depth <= 0:
+            value = hints[0][0]
+        else:
+            value = max([self._searchMove(h, depth - 1, path)
+                         for h in hints[:self.width]])
+        if not self._outOfBudget():
+            # don't remember values of a cut search
+            self.transpositions.put(key, value)
+        return value
+
+    # play a hint and return the atomic moves
+    def _doMove(self, hint):
+        game = self.game
+        ncards, from_stack, to_stack = hint[2:5]
+        current = game.moves.current
+        game.moves.current = []
+        game.hints.searching = True
+        try:
+            if from_stack is to_stack:
+                from_stack.flipMove()
+            else:
+                from_stack.moveMove(ncards, to_stack, frames=0)
+            if game.app.opt.autofaceup:
+                for s in game.getAutoStacks()[0]:
+                    if s.canFlipCard():
+                        s.flipMove()
+        finally:
+            game.hints.searching = False
+            moves = game.moves.current
+            game.moves.current = current
+        return moves
+
+    def _undoMoves(self, moves):
+        game = self.game
+        old_state, game.moves.state = game.moves.state, game.S_UNDO
+        for atomic_move in reversed(moves):
+            atomic_move.undo(game)
+        game.moves.state = old_state
+
+
 class PySolHintLayoutImportError(Exception):
 
     def __init__(self, msg, cards, line_num):
@@ -726,7 +1040,256 @@ class PySolHintLayoutImportError(Exception):
         return self.msg + ":\n\n" + ', '.join(self.cards)
 
 
+# ************************************************************************
+# * SolverJob runs an external solver in the background. A thread
+# * feeds the board to the solver and queues its output lines, so the
+# * caller can parse them while the solver is still running.
+# ************************************************************************
+
+class SolverJob:
+    result = None
+
+    def __init__(self, command, board):
+        # a command string is run by the shell, an argument list is not
+        kw = {'shell': isinstance(command, six.string_types),
+              'stdin': subprocess.PIPE,
+              'stdout': subprocess.PIPE,
+              'stderr': subprocess.STDOUT}
+        if os.name != 'nt':
+            kw['close_fds'] = True
+            # own process group, so cancel() also kills the shell's child
+            kw['preexec_fn'] = os.setsid
+        try:
+            self.process = subprocess.Popen(command, **kw)
+        except OSError as e:
+            raise RuntimeError('Solver not found: {}'.format(e))
+        self.returncode = None
+        self.cancelled = False
+        self.lines = queue.Queue()
+        self.thread = threading.Thread(target=self._run, args=(board,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self, board):
+        p = self.process
+        try:
+            p.stdin.write(six.binary_type(board, 'utf-8'))
+            p.stdin.close()
+        except (IOError, OSError):
+            # the solver is gone (cancelled)
+            pass
+        for line in iter(p.stdout.readline, b''):
+            self.lines.put(line)
+        p.stdout.close()
+        self.returncode = p.wait()
+        self.lines.put(None)
+
+    # Return the output lines read so far, waiting up to timeout
+    # seconds (None - forever) for the first one. None marks the end
+    # of the output.
+    def readLines(self, timeout=0):
+        lines = []
+        try:
+            if timeout == 0:
+                lines.append(self.lines.get_nowait())
+            else:
+                lines.append(self.lines.get(timeout=timeout))
+            while lines[-1] is not None:
+                lines.append(self.lines.get_nowait())
+        except queue.Empty:
+            pass
+        return lines
+
+    def cancel(self):
+        self.cancelled = True
+        try:
+            if os.name != 'nt':
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except OSError:
+            pass
+
+
+# ************************************************************************
+# * SolverPool keeps long-lived worker threads, each with its own
+# * instance of a solver library (created by factory), so a solve
+# * neither blocks the caller nor pays for starting a process.
+# * PoolSolverJob has the interface of SolverJob; its task is called
+# * with the solver instance and its return value is the result.
+# ************************************************************************
+
+class PoolSolverJob:
+    returncode = 0
+
+    def __init__(self, task):
+        self.task = task
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def run(self, solver):
+        if not self.cancelled:
+            try:
+                self.result = self.task(solver)
+            except Exception as e:
+                self.error = e
+        self.done.set()
+
+    def readLines(self, timeout=0):
+        if not self.done.wait(timeout):
+            return []
+        if self.error is not None:
+            raise self.error
+        return [None]
+
+    def cancel(self):
+        # a running solve can't be interrupted; its result is dropped
+        self.cancelled = True
+
+
+class SolverPool:
+    def __init__(self, factory, size=2):
+        self.factory = factory
+        self.size = size
+        self.tasks = queue.Queue()
+        self.workers = []
+
+    def _work(self):
+        solver = self.factory()
+        while True:
+            job = self.tasks.get()
+            job.run(solver)
+
+    def submit(self, task):
+        if not self.workers:
+            for i in range(self.size):
+                t = threading.Thread(target=self._work)
+                t.daemon = True
+                t.start()
+                self.workers.append(t)
+        job = PoolSolverJob(task)
+        self.tasks.put(job)
+        return job
+
+
+# ************************************************************************
+# * The version of a solver binary is cached in a file, keyed by the
+# * path, size and time of the binary, so it is probed only once.
+# ************************************************************************
+
+def getSolverVersion(argv, cache_file=None):
+    path = which(argv[0]) or argv[0]
+    try:
+        st = os.stat(path)
+        key = '%s:%d:%d' % (os.path.abspath(path), st.st_size,
+                            int(st.st_mtime))
+    except OSError:
+        key = None
+    versions = {}
+    if cache_file and key:
+        try:
+            with open(cache_file, 'r') as fh:
+                versions = json.load(fh)
+        except (IOError, OSError, ValueError):
+            pass
+        if key in versions:
+            return tuple(versions[key])
+    job = SolverJob(argv + ['--version'], '')
+    lines = []
+    while not lines or lines[-1] is not None:
+        lines += job.readLines(timeout=None)
+    out = b''.join(lines[:-1])
+    if job.returncode in (127, 1):
+        raise RuntimeError('Solver exited with {}'.format(job.returncode))
+    m = re.search(r'version ([0-9]+)\.([0-9]+)\.([0-9]+)',
+                  six.text_type(out, encoding='utf-8'))
+    if m:
+        version = (int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    else:
+        version = (0, 0, 0)
+    if cache_file and key:
+        versions[key] = version
+        try:
+            with open(cache_file, 'w') as fh:
+                json.dump(versions, fh)
+        except (IOError, OSError):
+            pass
+    return version
+
+
+def solverArgv(command):
+    return shlex.split(command, posix=(os.name != 'nt'))
+
+
+# ************************************************************************
+# * SolverResultCache keeps solver results in a file: the moves (as
+# * [ncards, from_stack.id, to_stack.id or None]) and the solver_state.
+# * Keys are digests of the board and the solver arguments (see
+# * Base_Solver_Hint.getResultKey). The least recently used results
+# * are dropped if there are more than maxsize.
+# ************************************************************************
+
+class SolverResultCache:
+    def __init__(self, filename, maxsize=1000):
+        self.filename = filename
+        self.maxsize = maxsize
+        self._results = None
+
+    def _load(self):
+        if self._results is None:
+            self._results = OrderedDict()
+            try:
+                with open(self.filename, 'r') as fh:
+                    for key, result in json.load(fh):
+                        self._results[key] = result
+            except (IOError, OSError, ValueError, TypeError):
+                pass
+        return self._results
+
+    def get(self, key):
+        results = self._load()
+        result = results.get(key)
+        if result is not None:
+            results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        results = self._load()
+        results[key] = result
+        results.move_to_end(key)
+        while len(results) > self.maxsize:
+            results.popitem(last=False)
+        try:
+            with open(self.filename, 'w') as fh:
+                json.dump(list(results.items()), fh)
+        except (IOError, OSError):
+            pass
+
+
+_solver_result_caches = {}
+
+
+def getSolverResultCache(filename):
+    if filename not in _solver_result_caches:
+        _solver_result_caches[filename] = SolverResultCache(filename)
+    return _solver_result_caches[filename]
+
+
+# ************************************************************************
+# * Base_Solver_Hint runs a solver for the current position.
+# *
+# * computeHints() solves synchronously; startHints() only starts
+# * the solver, and pollHints() must then be called until it returns
+# * True. A solver run is cancelled by cancelHints() and its result
+# * is thrown away if the position changed meanwhile.
+# ************************************************************************
+
 class Base_Solver_Hint:
+    # the subclass runs a built-in solver (see pysollib.solvers)
+    _builtin = False
+
     def __init__(self, game, dialog, **game_type):
         self.game = game
         self.dialog = dialog
@@ -739,6 +1302,11 @@ class Base_Solver_Hint:
             }
         self.hints = []
         self.hints_index = 0
+        self.solver_state = 'not_started'
+        self.job = None
+        self.position_hash = None
+        self.result_key = None
+        self._parse_done = False
 
         # correct cards rank if foundations.base_rank != 0 (Penguin, Opus)
         if 'base_rank' in game_type:    # (Simple Simon)
@@ -809,22 +1377,118 @@ class Base_Solver_Hint:
             self._v = None
             return False
 
-    def run_solver(self, command, board):
+    def computeHints(self):
+        self.startHints()
+        while not self.pollHints(timeout=None):
+            pass
+
+    # subclass: compute the board and start the solver
+    def startHints(self):
+        pass
+
+    # subclass: parse an output line of the solver; return True to
+    # ignore the rest of the output
+    def parseLine(self, s):
+        return True
+
+    # subclass: set self.hints from the parsed output or the result
+    # of a library solver
+    def finishHints(self, result=None):
+        self.hints = [None]
+
+    def startSolver(self, command, board):
         if DEBUG:
             print(command)
-        kw = {'shell': True,
-              'stdin': subprocess.PIPE,
-              'stdout': subprocess.PIPE,
-              'stderr': subprocess.PIPE}
-        if os.name != 'nt':
-            kw['close_fds'] = True
-        p = subprocess.Popen(command, **kw)
-        bytes_board = six.binary_type(board, 'utf-8')
-        pout, perr = p.communicate(bytes_board)
-        if p.returncode in (127, 1):
-            # Linux and Windows return codes for "command not found" error
-            raise RuntimeError('Solver exited with {}'.format(p.returncode))
-        return BytesIO(pout), BytesIO(perr)
+        self._parse_done = False
+        self.position_hash = self.game.getPositionHash()
+        self.job = SolverJob(command, board)
+
+    def startPoolSolver(self, pool, task):
+        self._parse_done = True
+        self.position_hash = self.game.getPositionHash()
+        self.job = pool.submit(task)
+
+    def getCacheFile(self, name):
+        # None if the app keeps no files (see pysollib.headless)
+        return getattr(getattr(self.game.app, 'fn', None), name, None)
+
+    def isRunning(self):
+        return self.job is not None
+
+    def isStale(self):
+        return (self.position_hash is not None and
+                self.position_hash != self.game.getPositionHash())
+
+    # Parse the new output of the solver; return True when it is done.
+    def pollHints(self, timeout=0):
+        job = self.job
+        if job is None:
+            return True
+        for line in job.readLines(timeout):
+            if line is None:
+                self.job = None
+                if job.returncode in (127, 1):
+                    # Linux and Windows return codes for "command not found"
+                    raise RuntimeError(
+                        'Solver exited with {}'.format(job.returncode))
+                self.finishHints(job.result)
+                if self.isStale():
+                    self.hints = [None]
+                    self.solver_state = 'stale'
+                else:
+                    self.storeResult()
+                return True
+            if not self._parse_done:
+                self._parse_done = self.parseLine(
+                    six.text_type(line, encoding='utf-8'))
+        return False
+
+    # results of earlier runs (see SolverResultCache)
+
+    def getResultKey(self, board):
+        if self._builtin:
+            # see pysollib.solvers
+            board = 'builtin\n' + board
+        key = (self.__class__.__name__, self.game.id, board,
+               self.options['preset'], self.options['max_iters'],
+               sorted(self.game_type.items()))
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def loadResult(self, board):
+        filename = self.getCacheFile('solver_results')
+        self.result_key = None
+        if not filename:
+            return False
+        self.result_key = self.getResultKey(board)
+        result = getSolverResultCache(filename).get(self.result_key)
+        if result is None:
+            return False
+        allstacks = self.game.allstacks
+        self.hints = [[ncards, allstacks[src],
+                       None if dest is None else allstacks[dest]]
+                      for ncards, src, dest in result['moves']]
+        self.hints.append(None)
+        self.solver_state = result['state']
+        self.position_hash = self.game.getPositionHash()
+        self.job = None
+        return True
+
+    def storeResult(self):
+        if not self.result_key or \
+                self.solver_state not in ('solved', 'unsolved',
+                                          'intractable'):
+            return
+        moves = [[ncards, src.id, None if dest is None else dest.id]
+                 for ncards, src, dest in self.hints[:-1]]
+        getSolverResultCache(self.getCacheFile('solver_results')).put(
+            self.result_key, {'state': self.solver_state, 'moves': moves})
+
+    def cancelHints(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+            self.hints = [None]
+            self.solver_state = 'cancelled'
 
     def importFile(solver, fh, s_game, self):
         s_game.endGame()
@@ -843,7 +1507,8 @@ use_fc_solve_lib = False
 
 try:
     import freecell_solver
-    fc_solve_lib_obj = freecell_solver.FreecellSolver()
+    freecell_solver.FreecellSolver()
+    fc_solve_pool = SolverPool(freecell_solver.FreecellSolver)
     use_fc_solve_lib = True
 except BaseException:
     pass
@@ -852,11 +1517,16 @@ use_bh_solve_lib = False
 
 try:
     import black_hole_solver
-    bh_solve_lib_obj = black_hole_solver.BlackHoleSolver()
+    black_hole_solver.BlackHoleSolver()
+    bh_solve_pool = SolverPool(black_hole_solver.BlackHoleSolver)
     use_bh_solve_lib = True
 except BaseException:
     pass
 
+# the built-in solvers of pysollib.solvers, used when neither the
+# library nor the binary of a solver is installed
+builtin_solver_pool = SolverPool(lambda: None, size=1)
+
 
 class FreeCellSolver_Hint(Base_Solver_Hint):
     def _determineIfSolverState(self, line):
@@ -911,6 +1581,7 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
             ret = ret[0]
             game.talon.cards = \
                 cards()[0:ret] + cards()[(ret+1):] + [cards()[ret]]
+            game.talon.rehash()
             s_game.flipMove(game.talon)
             s_game.moveMove(1, game.talon, target, frames=0)
 
@@ -1009,28 +1680,43 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
 
         return self.board
 
-    def computeHints(self):
+    def _useBuiltinSolver(self):
         game = self.game
-        game_type = self.game_type
-        global FCS_VERSION
-        if FCS_VERSION is None:
-            if use_fc_solve_lib:
-                FCS_VERSION = (5, 0, 0)
-            else:
-                pout, _ = self.run_solver(FCS_COMMAND + ' --version', '')
-                s = six.text_type(pout.read(), encoding='utf-8')
-                m = re.search(r'version ([0-9]+)\.([0-9]+)\.([0-9]+)', s)
-                if m:
-                    FCS_VERSION = (int(m.group(1)), int(m.group(2)),
-                                   int(m.group(3)))
-                else:
-                    FCS_VERSION = (0, 0, 0)
+        if use_fc_solve_lib or which(solverArgv(FCS_COMMAND)[0]):
+            return False
+        if not FreeCellSolver.isSupported(self.game_type.get('preset')):
+            return False
+        if [f for f in game.s.foundations if f.cap.suit < 0] or \
+                [r for r in game.s.reserves if len(r.cards) > 1]:
+            return False
+        for s in game.s.rows:
+            if [c for c in s.cards if not c.face_up]:
+                return False
+        return True
 
+    def startHints(self):
+        game = self.game
+        game_type = self.game_type
         progress = self.options['progress']
 
         board = self.calcBoardString()
         if DEBUG:
             print('--------------------\n', board, '--------------------')
+        self._builtin = self._useBuiltinSolver()
+        if self.loadResult(board):
+            return
+        if self._builtin:
+            self._startBuiltinSolver()
+            return
+
+        global FCS_VERSION
+        if FCS_VERSION is None:
+            if use_fc_solve_lib:
+                FCS_VERSION = (5, 0, 0)
+            else:
+                FCS_VERSION = getSolverVersion(
+                    solverArgv(FCS_COMMAND),
+                    self.getCacheFile('solver_versions'))
         args = []
         if use_fc_solve_lib:
             args += ['--reset', '-opt', ]
@@ -1038,12 +1724,13 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
             args += ['-m', '-p', '-opt', '-sel']
             if FCS_VERSION >= (4, 20, 0):
                 args += ['-hoi']
-        if (not use_fc_solve_lib) and progress:
+        self._progress = (not use_fc_solve_lib) and progress
+        self._iter_output_step = None
+        if self._progress:
             args += ['--iter-output']
-            fcs_iter_output_step = None
             if FCS_VERSION >= (4, 20, 0):
-                fcs_iter_output_step = self.options['iters_step']
-                args += ['--iter-output-step', str(fcs_iter_output_step)]
+                self._iter_output_step = self.options['iters_step']
+                args += ['--iter-output-step', str(self._iter_output_step)]
             if DEBUG:
                 args += ['-s']
         if self.options['preset'] and self.options['preset'] != 'none':
@@ -1062,145 +1749,194 @@ class FreeCellSolver_Hint(Base_Solver_Hint):
         if 'esf' in game_type:
             args += ['--empty-stacks-filled-by', game_type['esf']]
 
+        self.solver_state = 'unknown'
+        self._iter = self._depth = self._states = 0
+        self._moves = []
+        if DEBUG:
+            self._start_time = time.time()
         if use_fc_solve_lib:
-            fc_solve_lib_obj.input_cmd_line(args)
-            status = fc_solve_lib_obj.solve_board(board)
+            def solve(lib):
+                lib.input_cmd_line(args)
+                status = lib.solve_board(board)
+                moves = []
+                if status == 0:
+                    m = lib.get_next_move()
+                    while m:
+                        moves.append(m.s[:4])
+                        m = lib.get_next_move()
+                return (status, lib.get_num_times(),
+                        lib.get_num_states_in_collection(), moves)
+            self.startPoolSolver(fc_solve_pool, solve)
         else:
-            command = FCS_COMMAND+' '+' '.join(args)
-            pout, perr = self.run_solver(command, board)
+            argv = solverArgv(FCS_COMMAND) + args
+            self.startSolver(argv, board)
+
+    def _startBuiltinSolver(self):
+        game = self.game
+        game_type = self.game_type
+
+        def value(card):
+            return cardValue(card.suit, (card.rank - self.base_rank) % 13)
+        founds = [(f.cap.suit, len(f.cards)) for f in game.s.foundations]
+        cells = [value(r.cards[-1]) if r.cards else None
+                 for r in game.s.reserves]
+        cols = [[value(c) for c in r.cards] for r in game.s.rows]
+        max_iters = self.options['max_iters']
+
+        def solve(lib):
+            solver = FreeCellSolver(
+                sbb=game_type.get('sbb'), sm=game_type.get('sm'),
+                esf=game_type.get('esf'), max_iters=max_iters,
+                preset=game_type.get('preset'))
+            state, moves = solver.solve(founds, cells, cols)
+            return state, moves, solver.iters, solver.states
+
         self.solver_state = 'unknown'
-        stack_types = {
-            'the': game.s.foundations,
-            'stack': game.s.rows,
-            'freecell': game.s.reserves,
-            }
+        self._progress = False
+        self._moves = []
         if DEBUG:
-            start_time = time.time()
-        if not (use_fc_solve_lib) and progress:
-            iter_ = 0
-            depth = 0
-            states = 0
-
-            for sbytes in pout:
-                s = six.text_type(sbytes, encoding='utf-8')
-                if DEBUG >= 5:
-                    print(s)
-
-                if self.colonPrefixMatch('Iteration', s):
-                    iter_ = self._v
-                elif self.colonPrefixMatch('Depth', s):
-                    depth = self._v
-                elif self.colonPrefixMatch('Stored-States', s):
-                    states = self._v
-                    if iter_ % 100 == 0 or fcs_iter_output_step:
-                        self._setText(iter=iter_, depth=depth, states=states)
-                elif re.search('^(?:-=-=)', s):
-                    break
-                elif self._determineIfSolverState(s):
-                    break
-            self._setText(iter=iter_, depth=depth, states=states)
+            self._start_time = time.time()
+        self.startPoolSolver(builtin_solver_pool, solve)
 
-        hints = []
-        if use_fc_solve_lib:
-            self._setText(
-                iter=fc_solve_lib_obj.get_num_times(),
-                depth=0,
-                states=fc_solve_lib_obj.get_num_states_in_collection(),
-            )
-            if status == 0:
-                m = fc_solve_lib_obj.get_next_move()
-                while m:
-                    type_ = ord(m.s[0])
-                    src = ord(m.s[1])
-                    dest = ord(m.s[2])
-                    hints.append([
-                        (ord(m.s[3]) if type_ == 0
-                         else (13 if type_ == 11 else 1)),
-                        (game.s.rows if (type_ in [0, 1, 4, 11, ])
-                         else game.s.reserves)[src],
-                        (game.s.rows[dest] if (type_ in [0, 2])
-                         else (game.s.reserves[dest]
-                               if (type_ in [1, 3]) else None))])
-
-                    m = fc_solve_lib_obj.get_next_move()
-            else:
-                self.solver_state = 'unsolved'
+    def _addBuiltinMoves(self, result):
+        game = self.game
+        state, moves, iters, states = result
+        self._setText(iter=iters, depth=0, states=states)
+        stacks = {'col': game.s.rows, 'cell': game.s.reserves}
+        for ncards, (src_type, src), dest in moves:
+            if dest is not None:
+                dest = stacks[dest[0]][dest[1]]
+            self._moves.append([ncards, stacks[src_type][src], dest])
+        self.solver_state = state
+
+    def _addLibMoves(self, result):
+        game = self.game
+        status, iters, states, moves = result
+        self._setText(iter=iters, depth=0, states=states)
+        if status == 0:
+            for s in moves:
+                type_ = ord(s[0])
+                src = ord(s[1])
+                dest = ord(s[2])
+                self._moves.append([
+                    (ord(s[3]) if type_ == 0
+                     else (13 if type_ == 11 else 1)),
+                    (game.s.rows if (type_ in [0, 1, 4, 11, ])
+                     else game.s.reserves)[src],
+                    (game.s.rows[dest] if (type_ in [0, 2])
+                     else (game.s.reserves[dest]
+                           if (type_ in [1, 3]) else None))])
         else:
-            for sbytes in pout:
-                s = six.text_type(sbytes, encoding='utf-8')
-                if DEBUG:
-                    print(s)
-                if self._determineIfSolverState(s):
-                    break
-                m = re.match(
-                    'Total number of states checked is ([0-9]+)\\.', s)
-                if m:
-                    self._setText(iter=int(m.group(1)))
+            self.solver_state = 'unsolved'
 
-                m = re.match('This scan generated ([0-9]+) states\\.', s)
+    def parseLine(self, s):
+        game = self.game
+        if self._progress:
+            # the --iter-output lines before the solution
+            if DEBUG >= 5:
+                print(s)
+            if self.colonPrefixMatch('Iteration', s):
+                self._iter = self._v
+            elif self.colonPrefixMatch('Depth', s):
+                self._depth = self._v
+            elif self.colonPrefixMatch('Stored-States', s):
+                self._states = self._v
+                if self._iter % 100 == 0 or self._iter_output_step:
+                    self._setText(iter=self._iter, depth=self._depth,
+                                  states=self._states)
+            elif re.search('^(?:-=-=)', s) or \
+                    self._determineIfSolverState(s):
+                self._progress = False
+                self._setText(iter=self._iter, depth=self._depth,
+                              states=self._states)
+            return False
 
-                if m:
-                    self._setText(states=int(m.group(1)))
+        if DEBUG:
+            print(s)
+        if self._determineIfSolverState(s):
+            return True
+        m = re.match(
+            'Total number of states checked is ([0-9]+)\\.', s)
+        if m:
+            self._setText(iter=int(m.group(1)))
 
-                m = re.match('Move (.*)', s)
-                if not m:
-                    continue
+        m = re.match('This scan generated ([0-9]+) states\\.', s)
 
-                move_s = m.group(1)
+        if m:
+            self._setText(states=int(m.group(1)))
 
-                m = re.match(
-                    'the sequence on top of Stack ([0-9]+) to the foundations',
-                    move_s)
+        m = re.match('Move (.*)', s)
+        if not m:
+            return False
 
-                if m:
-                    ncards = 13
-                    st = stack_types['stack']
-                    sn = int(m.group(1))
-                    src = st[sn]
-                    dest = None
-                else:
-                    m = re.match(
-                        '(?P<ncards>a card|(?P<count>[0-9]+) cards) '
-                        'from (?P<source_type>stack|freecell) '
-                        '(?P<source_idx>[0-9]+) to '
-                        '(?P<dest>the foundations|'
-                        '(?P<dest_type>freecell|stack) '
-                        '(?P<dest_idx>[0-9]+))\\s*', move_s)
-
-                    if not m:
-                        continue
+        move_s = m.group(1)
 
-                    if m.group('ncards') == 'a card':
-                        ncards = 1
-                    else:
-                        ncards = int(m.group('count'))
+        stack_types = {
+            'the': game.s.foundations,
+            'stack': game.s.rows,
+            'freecell': game.s.reserves,
+            }
+        m = re.match(
+            'the sequence on top of Stack ([0-9]+) to the foundations',
+            move_s)
 
-                    st = stack_types[m.group('source_type')]
-                    sn = int(m.group('source_idx'))
-                    src = st[sn]
+        if m:
+            ncards = 13
+            st = stack_types['stack']
+            sn = int(m.group(1))
+            src = st[sn]
+            dest = None
+        else:
+            m = re.match(
+                '(?P<ncards>a card|(?P<count>[0-9]+) cards) '
+                'from (?P<source_type>stack|freecell) '
+                '(?P<source_idx>[0-9]+) to '
+                '(?P<dest>the foundations|'
+                '(?P<dest_type>freecell|stack) '
+                '(?P<dest_idx>[0-9]+))\\s*', move_s)
+
+            if not m:
+                return False
+
+            if m.group('ncards') == 'a card':
+                ncards = 1
+            else:
+                ncards = int(m.group('count'))
+
+            st = stack_types[m.group('source_type')]
+            sn = int(m.group('source_idx'))
+            src = st[sn]
 
-                    dest_s = m.group('dest')
-                    if dest_s == 'the foundations':
-                        dest = None
-                    else:
-                        dt = stack_types[m.group('dest_type')]
-                        dest = dt[int(m.group('dest_idx'))]
+            dest_s = m.group('dest')
+            if dest_s == 'the foundations':
+                dest = None
+            else:
+                dt = stack_types[m.group('dest_type')]
+                dest = dt[int(m.group('dest_idx'))]
 
-                hints.append([ncards, src, dest])
+        self._moves.append([ncards, src, dest])
+        return False
 
+    def finishHints(self, result=None):
+        if result is not None:
+            if self._builtin:
+                self._addBuiltinMoves(result)
+            else:
+                self._addLibMoves(result)
+        if self._progress:
+            # no solution in the output
+            self._setText(iter=self._iter, depth=self._depth,
+                          states=self._states)
         if DEBUG:
-            print('time:', time.time()-start_time)
+            print('time:', time.time()-self._start_time)
 
+        hints = self._moves
         self.hints = hints
         if len(hints) > 0:
             if self.solver_state != 'intractable':
                 self.solver_state = 'solved'
         self.hints.append(None)
 
-        if not use_fc_solve_lib:
-            pout.close()
-            perr.close()
-
 
 class BlackHoleSolver_Hint(Base_Solver_Hint):
     BLACK_HOLE_SOLVER_COMMAND = 'black-hole-solve'
@@ -1233,6 +1969,7 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
             ret = ret[0]
             game.talon.cards = \
                 cards()[0:ret] + cards()[(ret+1):] + [cards()[ret]]
+            game.talon.rehash()
             s_game.flipMove(game.talon)
             s_game.moveMove(1, game.talon, target, frames=0)
 
@@ -1312,29 +2049,62 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
 
         return board
 
-    def computeHints(self):
+    def _useBuiltinSolver(self):
+        if use_bh_solve_lib or \
+                which(solverArgv(self.BLACK_HOLE_SOLVER_COMMAND)[0]):
+            return False
+        if not GolfSolver.isSupported(self.game_type.get('preset')):
+            return False
+        for s in self.game.s.rows:
+            if s.cards and s.basicIsBlocked():
+                # Elevator, Three Fir-trees
+                return False
+            for c in s.cards:
+                if not c.face_up or c.suit == 4:
+                    return False
+        return True
+
+    def _startBuiltinSolver(self):
+        game = self.game
+        game_type = self.game_type
+        founds = [f.cards[-1].rank if f.cards else None
+                  for f in game.s.foundations]
+        cols = [[c.rank for c in s.cards] for s in game.s.rows]
+        talon = [c.rank for c in reversed(game.s.talon.cards)]
+        max_iters = self.options['max_iters']
+
+        def solve(lib):
+            solver = GolfSolver(
+                game_type['preset'],
+                wrap_ranks=game_type.get('wrap_ranks', False),
+                queens_on_kings=game_type.get('queens_on_kings', False),
+                max_iters=max_iters)
+            state, moves = solver.solve(founds, cols, talon)
+            return state, moves, solver.iters, len(solver.dead)
+        self.startPoolSolver(builtin_solver_pool, solve)
+
+    def _addBuiltinMoves(self, result):
         game = self.game
+        state, moves, iters, states = result
+        self._setText(iter=iters, depth=0, states=states)
+        for src, dest in moves:
+            if src < 0:
+                self._moves.append([1, game.s.talon, None])
+            else:
+                self._moves.append(
+                    [1, game.s.rows[src], game.s.foundations[dest]])
+        self.solver_state = state
+
+    def startHints(self):
         game_type = self.game_type
 
         board = self.calcBoardString()
         if DEBUG:
             print('--------------------\n', board, '--------------------')
-        if use_bh_solve_lib:
-            # global bh_solve_lib_obj
-            # bh_solve_lib_obj = bh_solve_lib_obj.new_bhs_user_handle()
-            bh_solve_lib_obj.recycle()
-            bh_solve_lib_obj.read_board(
-                board=board,
-                game_type=game_type['preset'],
-                place_queens_on_kings=(
-                    game_type['queens_on_kings']
-                    if ('queens_on_kings' in game_type) else True),
-                wrap_ranks=(
-                    game_type['wrap_ranks']
-                    if ('wrap_ranks' in game_type) else True),
-            )
-            bh_solve_lib_obj.limit_iterations(self.options['max_iters'])
-        else:
+        self._builtin = self._useBuiltinSolver()
+        if self.loadResult(board):
+            return
+        if not use_bh_solve_lib and not self._builtin:
             args = []
             args += ['--game', game_type['preset'], '--rank-reach-prune']
             args += ['--max-iters', str(self.options['max_iters'])]
@@ -1343,88 +2113,120 @@ class BlackHoleSolver_Hint(Base_Solver_Hint):
             if 'wrap_ranks' in game_type:
                 args += ['--wrap-ranks']
 
-            command = self.BLACK_HOLE_SOLVER_COMMAND + ' ' + ' '.join(args)
+            argv = solverArgv(self.BLACK_HOLE_SOLVER_COMMAND) + args
 
         if DEBUG:
-            start_time = time.time()
+            self._start_time = time.time()
+
+        self._result = None
+        self._moves = []
+        if self._builtin:
+            self._startBuiltinSolver()
+        elif use_bh_solve_lib:
+            max_iters = self.options['max_iters']
+
+            def solve(lib):
+                lib.recycle()
+                lib.read_board(
+                    board=board,
+                    game_type=game_type['preset'],
+                    place_queens_on_kings=(
+                        game_type['queens_on_kings']
+                        if ('queens_on_kings' in game_type) else True),
+                    wrap_ranks=(
+                        game_type['wrap_ranks']
+                        if ('wrap_ranks' in game_type) else True),
+                )
+                lib.limit_iterations(max_iters)
+                ret_code = lib.resume_solution()
+                columns = []
+                if ret_code == 0:
+                    m = lib.get_next_move()
+                    while m:
+                        columns.append(m.get_column_idx())
+                        m = lib.get_next_move()
+                return (ret_code, lib.ret_code_is_suspend(ret_code),
+                        lib.get_num_times(),
+                        lib.get_num_states_in_collection(), columns)
+            self.startPoolSolver(bh_solve_pool, solve)
+        else:
+            self.startSolver(argv, board)
 
-        result = ''
+    def _addLibMoves(self, result):
+        game = self.game
+        ret_code, suspended, iters, states, columns = result
+        self._setText(iter=0, depth=0, states=0)
+        self.solver_state = (
+            'solved' if ret_code == 0 else
+            ('intractable' if suspended else 'unsolved'))
+        self._setText(iter=iters)
+        self._setText(states=states)
+        for found_stack_idx in columns:
+            if len(game.s.rows) > found_stack_idx >= 0:
+                src = game.s.rows[found_stack_idx]
 
-        if use_bh_solve_lib:
-            ret_code = bh_solve_lib_obj.resume_solution()
-        else:
-            pout, perr = self.run_solver(command, board)
+                self._moves.append([1, src, None])
+            else:
+                self._moves.append([1, game.s.talon, None])
 
-            for sbytes in pout:
-                s = six.text_type(sbytes, encoding='utf-8')
-                if DEBUG >= 5:
-                    print(s)
+    def parseLine(self, s):
+        game = self.game
+        if self._result is None:
+            # the lines before the verdict
+            if DEBUG >= 5:
+                print(s)
 
-                m = re.search('^(Intractable|Unsolved|Solved)!', s.rstrip())
-                if m:
-                    result = m.group(1)
-                    break
+            m = re.search('^(Intractable|Unsolved|Solved)!', s.rstrip())
+            if m:
+                self._result = m.group(1)
+                self._setText(iter=0, depth=0, states=0)
+                self.solver_state = self._result.lower()
+            return False
 
-        self._setText(iter=0, depth=0, states=0)
-        hints = []
-        if use_bh_solve_lib:
-            self.solver_state = (
-                'solved' if ret_code == 0 else
-                ('intractable'
-                 if bh_solve_lib_obj.ret_code_is_suspend(ret_code)
-                 else 'unsolved'))
-            self._setText(iter=bh_solve_lib_obj.get_num_times())
-            self._setText(
-                states=bh_solve_lib_obj.get_num_states_in_collection())
-            if self.solver_state == 'solved':
-                m = bh_solve_lib_obj.get_next_move()
-                while m:
-                    found_stack_idx = m.get_column_idx()
-                    if len(game.s.rows) > found_stack_idx >= 0:
-                        src = game.s.rows[found_stack_idx]
-
-                        hints.append([1, src, None])
-                    else:
-                        hints.append([1, game.s.talon, None])
-                    m = bh_solve_lib_obj.get_next_move()
-        else:
-            self.solver_state = result.lower()
-            for sbytes in pout:
-                s = six.text_type(sbytes, encoding='utf-8')
-                if DEBUG:
-                    print(s)
-
-                if s.strip() == 'Deal talon':
-                    hints.append([1, game.s.talon, None])
-                    continue
+        if DEBUG:
+            print(s)
 
-                m = re.match(
-                    'Total number of states checked is ([0-9]+)\\.', s)
-                if m:
-                    self._setText(iter=int(m.group(1)))
-                    continue
+        if s.strip() == 'Deal talon':
+            self._moves.append([1, game.s.talon, None])
+            return False
 
-                m = re.match('This scan generated ([0-9]+) states\\.', s)
+        m = re.match(
+            'Total number of states checked is ([0-9]+)\\.', s)
+        if m:
+            self._setText(iter=int(m.group(1)))
+            return False
 
-                if m:
-                    self._setText(states=int(m.group(1)))
-                    continue
+        m = re.match('This scan generated ([0-9]+) states\\.', s)
 
-                m = re.match(
-                    'Move a card from stack ([0-9]+) to the foundations', s)
-                if not m:
-                    continue
+        if m:
+            self._setText(states=int(m.group(1)))
+            return False
 
-                found_stack_idx = int(m.group(1))
-                src = game.s.rows[found_stack_idx]
+        m = re.match(
+            'Move a card from stack ([0-9]+) to the foundations', s)
+        if not m:
+            return False
+
+        found_stack_idx = int(m.group(1))
+        src = game.s.rows[found_stack_idx]
 
-                hints.append([1, src, None])
-            pout.close()
-            perr.close()
+        self._moves.append([1, src, None])
+        return False
 
+    def finishHints(self, result=None):
+        if result is not None:
+            if self._builtin:
+                self._addBuiltinMoves(result)
+            else:
+                self._addLibMoves(result)
+        elif self._result is None:
+            # no verdict in the output
+            self._setText(iter=0, depth=0, states=0)
+            self.solver_state = ''
         if DEBUG:
-            print('time:', time.time()-start_time)
+            print('time:', time.time()-self._start_time)
 
+        hints = self._moves
         hints.append(None)
         self.hints = hints
 
@@ -134,6 +134,7 @@ class AFlipMove(AtomicMove):
             card.showBack()
         else:
             card.showFace()
+        stack.updateFlipHash()
 
     def redo(self, game):
         self._doMove(game, game.allstacks[self.stack_id])
@@ -154,6 +155,7 @@ class ASingleFlipMove(AFlipMove):
             card.showBack()
         else:
             card.showFace()
+        stack.updateFlipHash()
 
 
 # flip and move one card
@@ -177,6 +179,7 @@ class AFlipAndMoveMove(AtomicMove):
             c.showBack()
         else:
             c.showFace()
+        from_stack.updateFlipHash()
         if not moved:
             cards = from_stack.cards[-1:]
             x, y = to_stack.getPositionForNextCard()
@@ -215,6 +218,7 @@ class AFlipAllMove(AtomicMove):
                 card.showBack()
             else:
                 card.showFace()
+        stack.rehash()
         stack.refreshView()
 
     def undo(self, game):
@@ -224,6 +228,7 @@ class AFlipAllMove(AtomicMove):
                 card.showBack()
             else:
                 card.showFace()
+        stack.rehash()
         stack.refreshView()
 
     def cmpForRedo(self, other):
@@ -255,6 +260,7 @@ class ATurnStackMove(AtomicMove):
             assert card.face_up
             to_stack.addCard(card, unhide=unhide, update=0)
             card.showBack(unhide=unhide)
+            to_stack.updateFlipHash()
             # print 3, unhide, to_stack.getCard().__dict__
         from_stack.updateText()
         to_stack.updateText()
@@ -308,6 +314,8 @@ class NEW_ATurnStackMove(AtomicMove):
                 card.showBack(unhide=0)
         to_stack.cards = from_stack.cards
         from_stack.cards = []
+        from_stack.rehash()
+        to_stack.rehash()
         from_stack.refreshView()
         from_stack.updateText()
         to_stack.refreshView()
@@ -465,6 +473,7 @@ class AShuffleStackMove(AtomicMove):
             j = game.random.randint(0, n)
             seq[n], seq[j] = seq[j], seq[n]
             n = n - 1
+        stack.rehash()
         stack.refreshView()
 
     def undo(self, game):
@@ -476,6 +485,7 @@ class AShuffleStackMove(AtomicMove):
             assert c.id == id
             cards.append(c)
         stack.cards = cards
+        stack.rehash()
         # restore the state
         game.random.setstate(self.state)
         stack.refreshView()
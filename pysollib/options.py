@@ -81,6 +81,10 @@ highlight_samerank = boolean
 highlight_not_matching = boolean
 peek_facedown = boolean
 stuck_notification = boolean
+hint_lookahead_depth = integer(0, 5)
+hint_lookahead_width = integer(1, 20)
+hint_lookahead_nodes = integer(10, 1000000)
+hint_lookahead_time = float(0.1, 60.0)
 mahjongg_show_removed = boolean
 mahjongg_create_solvable = integer(0, 2)
 shisen_show_hint = boolean
@@ -96,6 +100,7 @@ shrink_face_down = boolean
 shade_filled_stacks = boolean
 demo_logo = boolean
 demo_logo_style = string
+demo_turbo = integer(0, 100000)
 pause_text_style = string
 redeal_icon_style = string
 dialog_icon_style = string
@@ -250,6 +255,10 @@ class Options:
         ('highlight_not_matching', 'bool'),
         ('peek_facedown', 'bool'),
         ('stuck_notification', 'bool'),
+        ('hint_lookahead_depth', 'int'),
+        ('hint_lookahead_width', 'int'),
+        ('hint_lookahead_nodes', 'int'),
+        ('hint_lookahead_time', 'float'),
         ('mahjongg_show_removed', 'bool'),
         ('mahjongg_create_solvable', 'int'),
         ('shisen_show_hint', 'bool'),
@@ -267,6 +276,7 @@ class Options:
         ('shade_filled_stacks', 'bool'),
         ('demo_logo', 'bool'),
         ('demo_logo_style', 'str'),
+        ('demo_turbo', 'int'),
         ('pause_text_style', 'str'),
         ('redeal_icon_style', 'str'),
         ('dialog_icon_style', 'str'),
@@ -352,6 +362,11 @@ class Options:
         self.highlight_not_matching = True
         self.peek_facedown = False
         self.stuck_notification = False
+        # lookahead search for hints and demo (0 - off, see LookaheadHint)
+        self.hint_lookahead_depth = 0
+        self.hint_lookahead_width = 4
+        self.hint_lookahead_nodes = 5000
+        self.hint_lookahead_time = 1.0   # seconds
         self.mahjongg_show_removed = False
         self.mahjongg_create_solvable = 2  # 0 - none, 1 - easy, 2 - hard
         self.accordion_deal_all = True
@@ -374,6 +389,8 @@ class Options:
         self.shade_filled_stacks = True
         self.demo_logo = True
         self.demo_logo_style = 'komika'
+        # demo moves between redraws (0 - off, see Game.startDemo)
+        self.demo_turbo = 0
         self.pause_text_style = 'komika'
         self.redeal_icon_style = 'modern'
         self.dialog_icon_style = 'remix'
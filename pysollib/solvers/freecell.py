@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+import heapq
+
+# ************************************************************************
+# * A solver for FreeCell type games - a fallback for fc-solve.
+# *
+# * It understands the game parameters of fc-solve: how sequences are
+# * built (sbb), how they are moved (sm), what may fill an empty
+# * column (esf), and the number of freecells, columns and decks.
+# *
+# * Cards are ints (suit * 13 + rank, the rank relative to the base
+# * rank of the foundations). A position is the tuple (founds, cells,
+# * cols): founds and cells are bytes (EMPTY for a free cell) and
+# * cols is a tuple of bytes, bottom card first. The search is a
+# * best-first search over atomic moves (single cards, plus whole
+# * sequences if sm == 'unlimited'); cards that nothing can be built
+# * on any more go to the foundations at once. Visited positions are
+# * kept in a dict keyed by the position with sorted cells and
+# * columns, so that positions differing only by the order of columns
+# * are searched once.
+# ************************************************************************
+
+EMPTY = 0xff
+
+# the parameters of the fc-solve presets used in the games
+PRESETS = {
+    'bakers_dozen': {'sbb': 'rank', 'esf': 'none'},
+    'good_measure': {'sbb': 'rank', 'esf': 'none'},
+    'cruel': {'sbb': 'suit', 'esf': 'none'},
+    'fan': {'sbb': 'suit', 'esf': 'kings'},
+    'streets_and_alleys': {'sbb': 'rank'},
+    'beleaguered_castle': {'sbb': 'rank'},
+    'freecell': {},
+    'relaxed_freecell': {'sm': 'unlimited'},
+    'eight_off': {'sbb': 'suit', 'esf': 'kings'},
+    'forecell': {'esf': 'kings', 'sm': 'unlimited'},
+    'seahaven_towers': {'sbb': 'suit', 'esf': 'kings'},
+}
+
+
+def cardValue(suit, rank):
+    return suit * 13 + rank
+
+
+class FreeCellSolver:
+    # the parameters default to those of the preset
+    def __init__(self, sbb=None, sm=None, esf=None, max_iters=100000,
+                 preset=None):
+        params = PRESETS.get(preset, {})
+        self.sbb = sbb or params.get('sbb', 'alternate_color')
+        self.sm = sm or params.get('sm', 'limited')
+        self.esf = esf or params.get('esf', 'all')
+        self.max_iters = max_iters
+        self.iters = 0
+        self.states = 0
+        self.fsuits = []
+
+    @staticmethod
+    def isSupported(preset):
+        return preset is None or preset in PRESETS
+
+    # can card a be put on card b
+    def _canBuild(self, a, b):
+        if a % 13 + 1 != b % 13:
+            return False
+        if self.sbb == 'alternate_color':
+            return (a // 26) != (b // 26)
+        if self.sbb == 'suit':
+            return a // 13 == b // 13
+        return True
+
+    def _canFill(self, card):
+        if self.esf == 'all':
+            return True
+        if self.esf == 'kings':
+            return card % 13 == 12
+        return False
+
+    # the foundation a card can go to, or -1
+    def _foundation(self, founds, card):
+        suit, rank = divmod(card, 13)
+        for i, s in enumerate(self.fsuits):
+            if s == suit and founds[i] == rank:
+                return i
+        return -1
+
+    # no card that could be built on this card is left in play
+    def _isSafe(self, founds, card):
+        rank = card % 13
+        if rank <= 1:
+            return True
+        for i, s in enumerate(self.fsuits):
+            if self._canBuild(cardValue(s, rank - 1), card) and \
+                    founds[i] < rank:
+                return False
+        return True
+
+    def _key(self, pos):
+        founds, cells, cols = pos
+        return (founds, bytes(bytearray(sorted(bytearray(cells)))),
+                tuple(sorted(cols)))
+
+    def _score(self, pos):
+        founds, cells, cols = pos
+        score = 100 * sum(bytearray(founds))
+        score += 10 * bytearray(cells).count(EMPTY)
+        for col in cols:
+            if not col:
+                score += 20
+                continue
+            low = 13
+            for c in bytearray(col):
+                r = c % 13
+                if r > low:
+                    # buried lower card
+                    score -= 6
+                low = min(low, r)
+            # a sequence on top
+            n = 1
+            while n < len(col) and \
+                    self._canBuild(bytearray(col)[-n], bytearray(col)[-n-1]):
+                n += 1
+            score += n
+        # the next cards for the foundations should not be buried
+        for i, suit in enumerate(self.fsuits):
+            rank = bytearray(founds)[i]
+            if rank == 13:
+                continue
+            card = cardValue(suit, rank)
+            for col in cols:
+                k = col.rfind(bytes(bytearray([card])))
+                if k >= 0:
+                    score -= 3 * (len(col) - 1 - k)
+        return score
+
+    # positions after a move: [(move, pos)], a move is
+    # (ncards, src, dest) with src and dest ('col', i), ('cell', i)
+    # or None (the foundations)
+    def _moves(self, pos):
+        founds, cells, cols = pos
+        cells = bytearray(cells)
+        result = []
+
+        def toFoundation(card, src, new_cells, new_cols):
+            i = self._foundation(founds, card)
+            if i < 0:
+                return None
+            f = bytearray(founds)
+            f[i] += 1
+            return ((1, src, None),
+                    (bytes(f), bytes(new_cells), new_cols))
+
+        # 1) to the foundations; a safe move is the only one
+        for i, card in enumerate(cells):
+            if card != EMPTY:
+                nc = bytearray(cells)
+                nc[i] = EMPTY
+                m = toFoundation(card, ('cell', i), nc, cols)
+                if m:
+                    if self._isSafe(founds, card):
+                        return [m]
+                    result.append(m)
+        for i, col in enumerate(cols):
+            if col:
+                card = bytearray(col)[-1]
+                new_cols = cols[:i] + (col[:-1],) + cols[i+1:]
+                m = toFoundation(card, ('col', i), cells, new_cols)
+                if m:
+                    if self._isSafe(founds, card):
+                        return [m]
+                    result.append(m)
+        # 2) from a free cell to a column
+        for i, card in enumerate(cells):
+            if card == EMPTY:
+                continue
+            filled = False
+            for j, col in enumerate(cols):
+                if col:
+                    if not self._canBuild(card, bytearray(col)[-1]):
+                        continue
+                elif filled or not self._canFill(card):
+                    continue
+                else:
+                    # all empty columns are alike
+                    filled = True
+                nc = bytearray(cells)
+                nc[i] = EMPTY
+                new_cols = cols[:j] + (col + bytes(bytearray([card])),) + \
+                    cols[j+1:]
+                result.append(((1, ('cell', i), ('col', j)),
+                               (founds, bytes(nc), new_cols)))
+        # 3) from a column to a column
+        for i, col in enumerate(cols):
+            if not col:
+                continue
+            cards = bytearray(col)
+            n = 1
+            if self.sm == 'unlimited':
+                while n < len(cards) and \
+                        self._canBuild(cards[-n], cards[-n-1]):
+                    n += 1
+            for k in range(1, n + 1):
+                card = cards[-k]
+                filled = False
+                for j, dest in enumerate(cols):
+                    if j == i:
+                        continue
+                    if dest:
+                        if not self._canBuild(card, bytearray(dest)[-1]):
+                            continue
+                    elif filled or k == len(cards) or \
+                            not self._canFill(card):
+                        continue
+                    else:
+                        filled = True
+                    new_cols = list(cols)
+                    new_cols[i] = col[:-k]
+                    new_cols[j] = dest + col[-k:]
+                    result.append(((k, ('col', i), ('col', j)),
+                                   (founds, bytes(cells), tuple(new_cols))))
+        # 4) from a column to a free cell
+        if EMPTY in cells:
+            j = cells.index(EMPTY)
+            for i, col in enumerate(cols):
+                if not col:
+                    continue
+                nc = bytearray(cells)
+                nc[j] = bytearray(col)[-1]
+                new_cols = cols[:i] + (col[:-1],) + cols[i+1:]
+                result.append(((1, ('col', i), ('cell', j)),
+                               (founds, bytes(nc), new_cols)))
+        return result
+
+    # Solve a position. founds is a list of (suit, number of cards),
+    # cells a list of cards or None, and cols a list of lists of
+    # cards (see cardValue). Returns (state, moves) where state is
+    # 'solved', 'unsolved' or 'intractable'.
+    def solve(self, founds, cells, cols):
+        self.fsuits = [s for s, n in founds]
+        start = (bytes(bytearray([n for s, n in founds])),
+                 bytes(bytearray([EMPTY if c is None else c
+                                  for c in cells])),
+                 tuple(bytes(bytearray(col)) for col in cols))
+        start_key = self._key(start)
+        parents = {start_key: None}
+        # (priority, order, depth, pos, key)
+        queue = [(0, 0, 0, start, start_key)]
+        count = 1
+        self.iters = 0
+        while queue:
+            if self.iters >= self.max_iters:
+                return 'intractable', []
+            self.iters += 1
+            self.states = count
+            prio, order, depth, pos, key = heapq.heappop(queue)
+            founds, cells, cols = pos
+            if not any(cols) and \
+                    bytearray(cells).count(EMPTY) == len(cells):
+                return 'solved', self._path(parents, key)
+            for move, child in self._moves(pos):
+                ckey = self._key(child)
+                if ckey in parents:
+                    continue
+                parents[ckey] = (key, move)
+                count += 1
+                heapq.heappush(
+                    queue, (depth - self._score(child), count, depth + 1,
+                            child, ckey))
+        return 'unsolved', []
+
+    def _path(self, parents, key):
+        moves = []
+        while parents[key] is not None:
+            key, move = parents[key]
+            moves.append(move)
+        moves.reverse()
+        return moves
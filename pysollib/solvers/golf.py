@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for Golf, Black Hole, All in a Row and Binary Star - a
+# * fallback for black-hole-solve.
+# *
+# * Only ranks matter in these games: a column is a list of ranks,
+# * bottom card first, and a foundation is the rank of its top card
+# * (None if empty). Golf also has a talon, dealt one card at a time
+# * to the waste, its only foundation.
+# *
+# * The search is a depth first search. Every move removes a card
+# * from the columns or the talon, so a position is never reached
+# * twice on one path and a position that was searched without a
+# * solution is dead for good. A position is packed into an int -
+# * the heights of the columns, the talon index and the foundation
+# * ranks - and dead positions are kept in a set.
+# ************************************************************************
+
+PRESETS = ('golf', 'black_hole', 'all_in_a_row', 'binary_star')
+
+KING = 12
+
+
+class GolfSolver:
+    def __init__(self, preset, wrap_ranks=False, queens_on_kings=False,
+                 max_iters=100000):
+        self.preset = preset
+        # only golf has an end of the ranks
+        self.wrap_ranks = wrap_ranks or preset != 'golf'
+        self.queens_on_kings = queens_on_kings
+        self.max_iters = max_iters
+        self.iters = 0
+        self.dead = set()
+
+    @staticmethod
+    def isSupported(preset):
+        return preset in PRESETS
+
+    # can rank be put on a foundation with the top card top
+    def _accepts(self, top, rank):
+        if top is None:
+            return True
+        if top == KING and not (self.queens_on_kings or self.wrap_ranks):
+            return False
+        d = abs(top - rank)
+        return d == 1 or (self.wrap_ranks and d == KING)
+
+    # Some cards left in the columns can never be reached from the
+    # foundations: called when the last card of a rank is gone. The
+    # cards left in the talon can be dealt at any time.
+    def _isDead(self, founds, tpos):
+        counts = self.counts
+        reached = [False] * (KING + 1)
+        todo = [r for r in founds if r is not None]
+        if None in founds:
+            return False
+        for r in self.talon[tpos:]:
+            if not reached[r]:
+                reached[r] = True
+                todo.append(r)
+        while todo:
+            r = todo.pop()
+            for n in self.neighbours[r]:
+                if counts[n] and not reached[n]:
+                    reached[n] = True
+                    todo.append(n)
+        for r in range(KING + 1):
+            if counts[r] and not reached[r]:
+                return True
+        return False
+
+    # the moves (src, dest) of a position, the most promising last;
+    # src is a column or -1 for the talon, dest a foundation
+    def _moves(self, heights, tpos, founds):
+        moves = []
+        cols = self.cols
+        for f, top in enumerate(founds):
+            if top in founds[:f]:
+                # the same as an earlier foundation
+                continue
+            accepts = self.accepts[top]
+            for i, h in enumerate(heights):
+                if h and accepts[cols[i][h-1]]:
+                    # prefer the moves with more moves to follow,
+                    # then the longer columns
+                    next_accepts = self.accepts[cols[i][h-1]]
+                    score = h
+                    for j, h2 in enumerate(heights):
+                        if j == i:
+                            h2 -= 1
+                        if h2 and next_accepts[cols[j][h2-1]]:
+                            score += 16
+                    moves.append((score, i, f))
+        moves.sort()
+        moves = [(i, f) for score, i, f in moves]
+        if tpos < len(self.talon):
+            moves.insert(0, (-1, 0))
+        return moves
+
+    def solve(self, founds, cols, talon=()):
+        self.cols = cols
+        self.talon = talon
+        self.accepts = dict(
+            (top, [self._accepts(top, r) for r in range(KING + 1)])
+            for top in [None] + list(range(KING + 1)))
+        self.neighbours = [[n for n in range(KING + 1)
+                            if self._accepts(r, n) or self._accepts(n, r)]
+                           for r in range(KING + 1)]
+        heights = [len(c) for c in cols]
+        founds = list(founds)
+        tpos = 0
+        self.counts = counts = [0] * (KING + 1)
+        for col in cols:
+            for r in col:
+                counts[r] += 1
+        # the key of a position: the foundations in the low byte (one
+        # foundation is enough to tell them apart), the talon index
+        # and the height of each column
+        bits = max([len(c) for c in cols] + [1]).bit_length()
+        shifts = [16 + i * bits for i in range(len(cols))]
+        hkey = tpos << 8
+        for i, h in enumerate(heights):
+            hkey |= h << shifts[i]
+
+        def fkey():
+            k = 0
+            for r in sorted(-1 if r is None else r for r in founds):
+                k = (k << 4) | (r + 1)
+            return k
+
+        self.iters = 0
+        dead = self.dead = set()
+        path = []
+        frames = [self._moves(heights, tpos, founds)]
+        while frames:
+            moves = frames[-1]
+            if not moves:
+                frames.pop()
+                dead.add(hkey | fkey())
+                if not path:
+                    break
+                src, dest, top = path.pop()
+                founds[dest] = top
+                if src < 0:
+                    tpos -= 1
+                    hkey -= 1 << 8
+                else:
+                    counts[cols[src][heights[src]]] += 1
+                    heights[src] += 1
+                    hkey += 1 << shifts[src]
+                continue
+            if self.iters >= self.max_iters:
+                return 'intractable', []
+            self.iters += 1
+            src, dest = moves.pop()
+            path.append((src, dest, founds[dest]))
+            if src < 0:
+                founds[dest] = talon[tpos]
+                tpos += 1
+                hkey += 1 << 8
+            else:
+                heights[src] -= 1
+                hkey -= 1 << shifts[src]
+                founds[dest] = cols[src][heights[src]]
+                counts[founds[dest]] -= 1
+            if not any(heights):
+                return 'solved', [(s, d) for s, d, top in path]
+            if (hkey | fkey()) in dead or (
+                    (src < 0 or not counts[founds[dest]]) and
+                    self._isDead(founds, tpos)):
+                # no moves: the move is taken back at once
+                frames.append([])
+            else:
+                frames.append(self._moves(heights, tpos, founds))
+        return 'unsolved', []
@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Hand tables for Poker Square and Cribbage Square, and a placement
+# * advisor built on them.
+# *
+# * The cards are packed as in Cactus Kev's poker evaluator:
+# *
+# *   xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp
+# *
+# * a bit for the rank (b), a bit for the suit (cdhs), the rank (r)
+# * and the prime of the rank (p). The product of the primes of a hand
+# * is the same for all hands of the same ranks and differs for all
+# * other hands, so it is the key of the tables of everything that only
+# * depends on the ranks. A flush is found by and-ing the cards, and
+# * the or of the rank bits is its index into the table of the flushes.
+# *
+# * The tables are built the first time they are needed:
+# *   - poker: the (type, value) of PokerSquare.getHandScore() for the
+# *     ranks of up to five cards, and for the flushes
+# *   - cribbage: the fifteens, pairs and runs of up to five cards
+# *   - the expected value a line of a square will have when it is
+# *     full, if the rest of its cards came from a full deck
+# ************************************************************************
+
+from itertools import combinations
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+SUITS = 0xF000
+JACK = 10
+ACE_HIGH = (0, 9, 10, 11, 12)
+
+# the (type, value) of the poker hands
+ROYAL_FLUSH = (0, 100)
+STRAIGHT_FLUSH = (1, 75)
+FOUR_OF_A_KIND = (2, 50)
+FULL_HOUSE = (3, 25)
+FLUSH = (4, 20)
+STRAIGHT = (5, 15)
+THREE_OF_A_KIND = (6, 10)
+TWO_PAIR = (7, 5)
+ONE_PAIR = (8, 2)
+NOTHING = (-1, 0)
+
+
+def packCard(rank, suit):
+    return 1 << (16 + rank) | 1 << (12 + suit) | rank << 8 | PRIMES[rank]
+
+
+def _rank(c):
+    return c >> 8 & 15
+
+
+def _product(cards):
+    q = 1
+    for c in cards:
+        q *= c & 0xFF
+    return q
+
+
+def _suited(cards):
+    # the suit bit of the cards if they are all of one suit
+    suit = SUITS
+    for c in cards:
+        suit &= c
+    return suit
+
+
+def _rankSets(size):
+    # the sorted ranks of all hands of up to size cards of a deck,
+    # the shorter hands first
+    level = [()]
+    sets = [()]
+    for n in range(size):
+        level = [ranks + (r, ) for ranks in level
+                 for r in range(ranks[-1] if ranks else 0, 13)
+                 if ranks.count(r) < 4]
+        sets += level
+    return sets
+
+
+def _rankProduct(ranks):
+    q = 1
+    for r in ranks:
+        q *= PRIMES[r]
+    return q
+
+
+def _flushChances(size):
+    # the chance that the rest of a line of n cards of a suit is of
+    # that suit too, for each n
+    chances = []
+    for n in range(size + 1):
+        p = 1.0
+        for i in range(size - n):
+            p *= float(13 - n - i) / (52 - n - i)
+        chances.append(p)
+    return chances
+
+
+def _expectedValues(values, size):
+    # the expected value of the ranks of a line of size cards, when
+    # the rest of the line comes from a full deck
+    expected = {}
+    for ranks in reversed(_rankSets(size)):
+        q = _rankProduct(ranks)
+        n = len(ranks)
+        if n == size:
+            expected[q] = values[q]
+            continue
+        e = 0
+        for r in range(13):
+            k = ranks.count(r)
+            if k < 4:
+                e += (4 - k) * expected[q * PRIMES[r]]
+        expected[q] = float(e) / (52 - n)
+    return expected
+
+
+# ************************************************************************
+# * Poker
+# ************************************************************************
+
+def _pokerRanks(ranks):
+    # the score of the sorted ranks of a hand that is not a flush
+    counts = sorted([ranks.count(r) for r in set(ranks)], reverse=True)
+    counts += [0, 0]
+    if len(ranks) == 5 and counts[0] == 1:
+        if ranks[4] - ranks[0] == 4 or ranks == ACE_HIGH:
+            return STRAIGHT
+        return NOTHING
+    if counts[0] == 4:
+        return FOUR_OF_A_KIND
+    if counts[0] == 3:
+        if counts[1] == 2:
+            return FULL_HOUSE
+        return THREE_OF_A_KIND
+    if counts[0] == 2:
+        if counts[1] == 2:
+            return TWO_PAIR
+        return ONE_PAIR
+    return NOTHING
+
+
+_poker_tables = None
+POKER_FLUSH_CHANCES = _flushChances(5)
+
+
+def _getPokerTables():
+    global _poker_tables
+    if _poker_tables is None:
+        scores = {}
+        for ranks in _rankSets(5):
+            scores[_rankProduct(ranks)] = _pokerRanks(ranks)
+        flushes = [None] * (1 << 13)
+        for ranks in combinations(range(13), 5):
+            mask = sum([1 << r for r in ranks])
+            if _pokerRanks(ranks) != STRAIGHT:
+                flushes[mask] = FLUSH
+            elif ranks == ACE_HIGH:
+                flushes[mask] = ROYAL_FLUSH
+            else:
+                flushes[mask] = STRAIGHT_FLUSH
+        values = dict([(q, s[1]) for q, s in scores.items()])
+        _poker_tables = (scores, flushes, _expectedValues(values, 5))
+    return _poker_tables
+
+
+def pokerScore(cards):
+    # the (type, value) of the packed cards of a line
+    scores, flushes, expected = _getPokerTables()
+    if len(cards) == 5:
+        c0, c1, c2, c3, c4 = cards
+        if c0 & c1 & c2 & c3 & c4 & SUITS:
+            return flushes[(c0 | c1 | c2 | c3 | c4) >> 16]
+    return scores[_product(cards)]
+
+
+def pokerEstimate(cards):
+    # the expected value of a line when it is full
+    n = len(cards)
+    if n == 5:
+        return pokerScore(cards)[1]
+    scores, flushes, expected = _getPokerTables()
+    value = expected[_product(cards)]
+    if n and _suited(cards):
+        value += FLUSH[1] * POKER_FLUSH_CHANCES[n]
+    return value
+
+
+# ************************************************************************
+# * Cribbage
+# ************************************************************************
+
+def _cribbagePoints(ranks):
+    # the fifteens, pairs and runs of the sorted ranks of a hand
+    values = [min(r + 1, 10) for r in ranks]
+    points = 0
+    for n in range(2, len(values) + 1):
+        for c in combinations(values, n):
+            if sum(c) == 15:
+                points += 2
+    counts = [ranks.count(r) for r in range(13)]
+    for k in counts:
+        points += k * (k - 1)
+    # only the longest runs count, once for each choice of their cards
+    longest, runs = 3, 0
+    r = 0
+    while r < 13:
+        start, ways = r, 1
+        while r < 13 and counts[r]:
+            ways *= counts[r]
+            r += 1
+        if r - start > longest:
+            longest, runs = r - start, ways
+        elif r - start == longest:
+            runs += ways
+        r += 1
+    return points + longest * runs
+
+
+_cribbage_tables = None
+CRIBBAGE_FLUSH_CHANCES = _flushChances(4)
+
+
+def _getCribbageTables():
+    global _cribbage_tables
+    if _cribbage_tables is None:
+        points = {}
+        for ranks in _rankSets(5):
+            points[_rankProduct(ranks)] = _cribbagePoints(ranks)
+        _cribbage_tables = (points, _expectedValues(points, 4))
+    return _cribbage_tables
+
+
+def cribbageScore(cards, upcard=None):
+    # the score of the packed cards of a line, with the upcard when
+    # the board is full
+    points, expected = _getCribbageTables()
+    q = _product(cards)
+    if upcard is not None:
+        q *= upcard & 0xFF
+    score = points[q]
+    if len(cards) == 4:
+        suit = _suited(cards)
+        if suit:
+            score += 4                  # Flush
+            if upcard is not None and upcard & suit:
+                score += 1              # Flush of five
+    if upcard is not None:
+        for c in cards:
+            if _rank(c) == JACK and c & upcard & SUITS:
+                score += 1              # His nobs
+    return score
+
+
+def cribbageEstimate(cards):
+    # the expected value of a line when it is full, without the upcard
+    n = len(cards)
+    if n == 4:
+        return cribbageScore(cards)
+    points, expected = _getCribbageTables()
+    value = expected[_product(cards)]
+    if n and _suited(cards):
+        value += 4 * CRIBBAGE_FLUSH_CHANCES[n]
+    return value
+
+
+# ************************************************************************
+# * The placement advisor: an expectimax search of where to put the next
+# * card. The board is a list of packed cards, None for an empty cell,
+# * and the lines are the cells that score together; estimate() gives
+# * the value of the cards of a line (pokerEstimate, cribbageEstimate).
+# *
+# * A cell for the card is worth the value of the board with the card
+# * in it, plus the value of the best cell for the card after it, on
+# * average over the cards that have not been seen. Only the lines of
+# * the cells change, so the gains of the cells for the card after are
+# * found once and only found again for the cells that share a line
+# * with the cell of the card. adviseGame() takes the board, the card
+# * and the unseen cards from a game.
+# ************************************************************************
+
+class SquareAdvisor:
+    def __init__(self, lines, estimate):
+        self.lines = [tuple(line) for line in lines]
+        self.estimate = estimate
+        ncells = max([max(line) for line in self.lines]) + 1
+        self.cell_lines = [[] for i in range(ncells)]
+        for i, line in enumerate(self.lines):
+            for cell in line:
+                self.cell_lines[cell].append(i)
+        # the cells that share a line with a cell
+        self.crossing = [set([c for i in lines for c in self.lines[i]])
+                         for lines in self.cell_lines]
+
+    def _lineCards(self, board, line):
+        return [board[i] for i in self.lines[line] if board[i] is not None]
+
+    def _gains(self, board, values, cell, cards):
+        # the gain in the value of the board by each card put in cell
+        estimate = self.estimate
+        lines = [(values[i], self._lineCards(board, i))
+                 for i in self.cell_lines[cell]]
+        gains = []
+        for c in cards:
+            g = 0
+            for value, line in lines:
+                g += estimate(line + [c]) - value
+            gains.append(g)
+        return gains
+
+    def advise(self, board, card, unseen):
+        # the (value, cell) of the empty cells for card, the best first
+        board = list(board)
+        unseen = list(unseen)
+        empty = [i for i, c in enumerate(board) if c is None]
+        values = [self.estimate(self._lineCards(board, i))
+                  for i in range(len(self.lines))]
+        total = sum(values)
+        after = {}
+        if unseen:
+            for cell in empty:
+                after[cell] = self._gains(board, values, cell, unseen)
+        advice = []
+        for cell in empty:
+            value = total + self._gains(board, values, cell, [card])[0]
+            others = [c for c in empty if c != cell]
+            if others and unseen:
+                board[cell] = card
+                new_values = values[:]
+                for i in self.cell_lines[cell]:
+                    new_values[i] = self.estimate(self._lineCards(board, i))
+                gains = []
+                for other in others:
+                    if other in self.crossing[cell]:
+                        gains.append(self._gains(board, new_values, other,
+                                                 unseen))
+                    else:
+                        gains.append(after[other])
+                board[cell] = None
+                value += float(sum(map(max, zip(*gains)))) / len(unseen)
+            advice.append((value, cell))
+        advice.sort(key=lambda a: -a[0])
+        return advice
+
+    def adviseGame(self, game):
+        # the (value, row) of the empty rows of a square game (Poker
+        # Square, Cribbage Square...) for the card of its talon; the
+        # rows are the cells of the lines
+        talon = game.s.talon
+        if not talon.cards or not talon.cards[-1].face_up:
+            return []
+        card = talon.cards[-1]
+        seen = set([card.id])
+        board = []
+        for r in game.s.rows:
+            if r.cards:
+                seen.add(r.cards[0].id)
+                board.append(packCard(r.cards[0].rank, r.cards[0].suit))
+            else:
+                board.append(None)
+        for r in game.s.reserves:
+            seen.update([c.id for c in r.cards])
+        unseen = [packCard(c.rank, c.suit) for c in game.cards
+                  if c.id not in seen]
+        advice = self.advise(board, packCard(card.rank, card.suit), unseen)
+        return [(value, game.s.rows[i]) for value, i in advice]
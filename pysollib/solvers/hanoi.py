@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for the Tower of Hanoi games: the cards (of distinct ranks)
+# * on three piles are to be gathered on a pile, moving one card at a
+# * time onto an empty pile or a higher card.
+# *
+# * A position is regular if every pile goes down. From a regular
+# * position, the shortest way to build the tower on a given pile is
+# * the recursive one, and needs no search: going down from the highest
+# * card, a card on the pile it should go to stays, and otherwise the
+# * lower cards are gathered first on the third pile, so that it can
+# * move. The next move is that of the lowest card out of place, and
+# * the number of moves is the sum of 2**k for the k-th lowest cards out
+# * of place.
+# *
+# * The games that deal the cards at random start from positions that
+# * are not regular. These are solved by a breadth-first search over
+# * the positions, of at most max_iters positions.
+# *
+# * A solution is a list of the moves (from pile, to pile).
+# ************************************************************************
+
+import collections
+
+
+class HanoiSolver:
+    # target: the pile to build the tower on, or None for any pile
+    # in_order: False if all the cards on a pile win, in any order
+    def __init__(self, target=None, in_order=True, max_iters=100000):
+        self.target = target
+        self.in_order = in_order
+        self.max_iters = max_iters
+        self.iters = 0
+        # position -> (solution, index of the next move)
+        self.results = {}
+
+    @staticmethod
+    def isRegular(piles):
+        for p in piles:
+            for a, b in zip(p, p[1:]):
+                if a < b:
+                    return False
+        return True
+
+    def getTargets(self, piles):
+        if self.target is None:
+            return list(range(len(piles)))
+        return [self.target]
+
+    # the moves from a regular position to the tower on target
+    def getDistance(self, piles, target):
+        cards = sorted(c for p in piles for c in p)
+        where = dict((c, i) for i, p in enumerate(piles) for c in p)
+        n = 0
+        goal = target
+        for k in range(len(cards) - 1, -1, -1):
+            i = where[cards[k]]
+            if i != goal:
+                n += 2 ** k
+                goal = 3 - i - goal
+        return n
+
+    def _getNextMove(self, piles, target):
+        where = dict((c, i) for i, p in enumerate(piles) for c in p)
+        move = None
+        goal = target
+        for c in sorted(where, reverse=True):
+            i = where[c]
+            if i != goal:
+                move = (i, goal)
+                goal = 3 - i - goal
+        return move
+
+    def _solveRegular(self, piles):
+        target = min(self.getTargets(piles),
+                     key=lambda t: self.getDistance(piles, t))
+        piles = [list(p) for p in piles]
+        moves = []
+        while True:
+            move = self._getNextMove(piles, target)
+            if move is None:
+                return moves
+            i, j = move
+            piles[j].append(piles[i].pop())
+            moves.append(move)
+
+    def _isWon(self, piles):
+        ncards = sum(len(p) for p in piles)
+        for t in self.getTargets(piles):
+            p = piles[t]
+            if len(p) == ncards and (not self.in_order or
+                                     self.isRegular([p])):
+                return True
+        return False
+
+    def _search(self, piles):
+        start = tuple(tuple(p) for p in piles)
+        prev = {start: None}
+        queue = collections.deque([start])
+        self.iters = 0
+        while queue:
+            state = queue.popleft()
+            if self._isWon(state):
+                moves = []
+                while prev[state] is not None:
+                    state, move = prev[state]
+                    moves.append(move)
+                moves.reverse()
+                return 'solved', moves
+            self.iters += 1
+            if self.iters > self.max_iters:
+                return 'intractable', []
+            for i, p in enumerate(state):
+                if not p:
+                    continue
+                for j, q in enumerate(state):
+                    if i == j or (q and q[-1] < p[-1]):
+                        continue
+                    new = list(state)
+                    new[i] = p[:-1]
+                    new[j] = q + p[-1:]
+                    new = tuple(new)
+                    if new not in prev:
+                        prev[new] = (state, (i, j))
+                        queue.append(new)
+        return 'unsolved', []
+
+    def solve(self, piles):
+        key = tuple(tuple(p) for p in piles)
+        res = self.results.get(key)
+        if res is not None:
+            moves, n = res
+            return 'solved', moves[n:]
+        if self.isRegular(piles):
+            state, moves = 'solved', self._solveRegular(piles)
+        else:
+            state, moves = self._search(piles)
+        if state == 'solved':
+            # remember every position on the way
+            piles = [list(p) for p in piles]
+            for n, (i, j) in enumerate(moves):
+                self.results[tuple(tuple(p) for p in piles)] = (moves, n)
+                piles[j].append(piles[i].pop())
+        return state, moves
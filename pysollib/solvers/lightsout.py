@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for Lights Out on a size x size board.
+# *
+# * A board is an int with bit i set if light i is on, light i being
+# * on row i // size and column i % size. Clicking light i toggles the
+# * lights of toggles[i], so a set of clicks x (an int too) turns the
+# * lights b off if the sum over GF(2) of the toggles of x is b - a
+# * system of linear equations over GF(2).
+# *
+# * The matrix of the system only depends on the size. It is reduced
+# * once by Gaussian elimination, keeping the row operations, so a
+# * board is solved by applying these to it. The solutions differ by
+# * the sums of the null space of the matrix (the sets of clicks that
+# * change nothing), which are all tried for the one with the fewest
+# * clicks.
+# ************************************************************************
+
+
+def parity(x):
+    return bin(x).count('1') & 1
+
+
+class LightsOutSolver:
+    def __init__(self, size):
+        self.size = size
+        n = size * size
+        self.toggles = []
+        for i in range(n):
+            t = 1 << i
+            if i % size != size - 1:
+                t |= 1 << (i + 1)
+            if i % size != 0:
+                t |= 1 << (i - 1)
+            if i + size < n:
+                t |= 1 << (i + size)
+            if i - size >= 0:
+                t |= 1 << (i - size)
+            self.toggles.append(t)
+        # the rows of the matrix are the equations, one per light:
+        # light i is toggled by the clicks of the lights in toggles[i]
+        # (the matrix is symmetric). ops[r] are the equations summed
+        # into row r.
+        rows = list(self.toggles)
+        ops = [1 << i for i in range(n)]
+        # (row, column) of the pivots
+        self.pivots = []
+        r = 0
+        for col in range(n):
+            bit = 1 << col
+            for k in range(r, n):
+                if rows[k] & bit:
+                    break
+            else:
+                continue
+            rows[r], rows[k] = rows[k], rows[r]
+            ops[r], ops[k] = ops[k], ops[r]
+            for k in range(n):
+                if k != r and rows[k] & bit:
+                    rows[k] ^= rows[r]
+                    ops[k] ^= ops[r]
+            self.pivots.append((r, col))
+            r += 1
+        self.rows = rows
+        self.ops = ops
+        # the equations that are sums of the others (zero rows): a
+        # board can be solved if these sums of its lights are even
+        self.checks = ops[r:]
+        # a basis of the null space, one vector per free column
+        pivot_cols = 0
+        for r, col in self.pivots:
+            pivot_cols |= 1 << col
+        self.null_space = []
+        for col in range(n):
+            if pivot_cols & (1 << col):
+                continue
+            x = 1 << col
+            for r, pcol in self.pivots:
+                if rows[r] & (1 << col):
+                    x |= 1 << pcol
+            self.null_space.append(x)
+
+    # the board after the clicks
+    def applyClicks(self, board, clicks):
+        for i in range(self.size * self.size):
+            if clicks & (1 << i):
+                board ^= self.toggles[i]
+        return board
+
+    # the fewest clicks (an int) to turn off all the lights of board,
+    # or None if it can not be done
+    def solve(self, board):
+        for check in self.checks:
+            if parity(check & board):
+                return None
+        x = 0
+        for r, col in self.pivots:
+            if parity(self.ops[r] & board):
+                x |= 1 << col
+        best = x
+        # all the sums of the null space, in Gray code order
+        for k in range(1, 1 << len(self.null_space)):
+            low = k & -k
+            x ^= self.null_space[low.bit_length() - 1]
+            if bin(x).count('1') < bin(best).count('1'):
+                best = x
+        return best
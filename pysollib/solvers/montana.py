@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for the Montana family: the cards are in rows of gaps and
+# * cards, a card moves to a gap if it follows the card on the left of
+# * the gap (or, by the rule, precedes the card on its right...); the
+# * first card of a row is the lowest rank. A redeal keeps the cards in
+# * sequence from the left of the rows and deals the others again.
+# *
+# * The grid is the cells of the rows, as (rank, suit) or None for a
+# * gap; ranks are the ranks of a row from the left. A move is the cell
+# * of a card and the cell of a gap.
+# *
+# * The cards that can fill a gap are looked up in a table of the
+# * cards that follow (or precede) each card, and a table of where each
+# * card is, so the moves of a position take O(gaps) time.
+# *
+# * The search is a best first search over the positions of a round,
+# * the most cards in sequence first, the fewest moves second. The
+# * cards in sequence are what a redeal keeps, so with redeals left the
+# * solution is the way to the most of them that can be reached this
+# * round, and without it is a way to win. A position from which no
+# * more cards can be put in sequence is a dead end this round:
+# *   - 'solved': moves to more cards in sequence (all of them without
+# *     a redeal)
+# *   - 'unsolved': none can be reached; with no redeal left the game
+# *     is lost
+# *   - 'intractable': the search saw max_iters positions before it was
+# *     done; the moves are to the most cards in sequence it found,
+# *     if any
+# ************************************************************************
+
+import heapq
+
+RULES = ('montana', 'any_suit', 'both_sides', 'higher')
+
+EMPTY = -1
+# the index of the second copy of a card in the table of where the
+# cards are, for two decks
+COPY = 64
+
+
+def _card(rank, suit):
+    return rank | suit << 4
+
+
+class MontanaSolver:
+    def __init__(self, nrows, rstep, ranks, rule='montana',
+                 max_iters=20000):
+        assert rule in RULES
+        assert len(ranks) == rstep - 1
+        self.nrows = nrows
+        self.rstep = rstep
+        self.ranks = tuple(ranks)
+        self.rule = rule
+        self.max_iters = max_iters
+        self.iters = 0
+        self.ncells = nrows * rstep
+        self.goal = nrows * len(ranks)
+        # grid, redeal -> (state, solution, index of the next move)
+        self.results = {}
+        # the cards that can go right of a card, and left of one
+        self.follow = {}
+        self.precede = {}
+        for suit in range(4):
+            for i, rank in enumerate(ranks):
+                c = _card(rank, suit)
+                if rule == 'higher':
+                    after = [_card(r, suit) for r in ranks[i+1:]]
+                elif i + 1 == len(ranks):
+                    after = []
+                elif rule == 'any_suit':
+                    after = [_card(ranks[i+1], s) for s in range(4)]
+                else:
+                    after = [_card(ranks[i+1], suit)]
+                self.follow[c] = after
+                if rule == 'both_sides' and i > 0:
+                    self.precede[c] = [_card(ranks[i-1], suit)]
+        self.bases = [_card(ranks[0], suit) for suit in range(4)]
+
+    #
+    # positions
+    #
+
+    def _sequenced(self, grid, row):
+        # the cards in sequence from the left of a row
+        i = row * self.rstep
+        c = grid[i]
+        if c == EMPTY:
+            return 0
+        suit = c & 0xF0
+        n = 0
+        for rank in self.ranks:
+            if grid[i + n] != rank | suit:
+                break
+            n += 1
+        return n
+
+    def _cells(self, where, c):
+        cells = []
+        if where[c] != EMPTY:
+            cells.append(where[c])
+        if where[c + COPY] != EMPTY:
+            cells.append(where[c + COPY])
+        return cells
+
+    def _moves(self, grid, where, gaps):
+        rstep = self.rstep
+        moves = []
+        for g in gaps:
+            if g % rstep == 0:
+                # a base card from another column
+                for c in self.bases:
+                    for cell in self._cells(where, c):
+                        if cell % rstep:
+                            moves.append((cell, g))
+                continue
+            left = grid[g - 1]
+            if left != EMPTY:
+                for c in self.follow.get(left, ()):
+                    for cell in self._cells(where, c):
+                        moves.append((cell, g))
+            if self.precede and g + 1 < self.ncells:
+                # the row of a gap on the right ends with the next row
+                right = grid[g + 1]
+                if right != EMPTY:
+                    for c in self.precede.get(right, ()):
+                        for cell in self._cells(where, c):
+                            if (cell, g) not in moves and \
+                                    (cell % rstep or c not in self.bases):
+                                moves.append((cell, g))
+        return moves
+
+    def _move(self, grid, where, gaps, move):
+        f, t = move
+        c = grid[f]
+        grid[t], grid[f] = c, EMPTY
+        if where[c] == f:
+            where[c] = t
+        else:
+            where[c + COPY] = t
+        gaps[gaps.index(t)] = f
+
+    def _pack(self, cards):
+        grid = []
+        where = [EMPTY] * (2 * COPY)
+        gaps = []
+        for i, c in enumerate(cards):
+            if c is None:
+                grid.append(EMPTY)
+                gaps.append(i)
+                continue
+            c = _card(c[0], c[1])
+            grid.append(c)
+            if where[c] == EMPTY:
+                where[c] = i
+            else:
+                where[c + COPY] = i
+        return grid, where, gaps
+
+    def getMoves(self, cards):
+        # the moves of a grid, but the moves of a first card of a row
+        # out of the first column
+        return self._moves(*self._pack(cards))
+
+    def _getTotal(self, grid):
+        return sum([self._sequenced(grid, row) for row in range(self.nrows)])
+
+    def getSequenced(self, cards):
+        # the cards in sequence, that a redeal keeps
+        return self._getTotal(self._pack(cards)[0])
+
+    #
+    # the search
+    #
+
+    def solve(self, cards, redeal=True):
+        grid, where, gaps = self._pack(cards)
+        key = (tuple(grid), redeal)
+        res = self.results.get(key)
+        if res is not None:
+            state, moves, n = res
+            return state, moves[n:]
+        state, moves = self._search(grid, where, gaps, redeal)
+        self.results[key] = (state, moves, 0)
+        # remember every position on the way; the last one can reach
+        # no more, as all it reaches this search has seen, unless the
+        # search was cut short
+        for n, move in enumerate(moves):
+            self._move(grid, where, gaps, move)
+            if n + 1 < len(moves):
+                self.results[(tuple(grid), redeal)] = (state, moves, n + 1)
+            elif state == 'solved' and self._getTotal(grid) < self.goal:
+                self.results[(tuple(grid), redeal)] = ('unsolved', [], 0)
+        return state, moves
+
+    def _search(self, grid, where, gaps, redeal):
+        rstep = self.rstep
+        seq = tuple([self._sequenced(grid, row)
+                     for row in range(self.nrows)])
+        start = best = sum(seq)
+        if start == self.goal:
+            return 'solved', []
+        root = tuple(grid)
+        best_key = root
+        # position -> (previous position, move)
+        parents = {root: None}
+        heap = [(-start, 0, 0, root, seq, tuple(where), tuple(gaps))]
+        n = 0
+        self.iters = 0
+        complete = True
+        while heap:
+            if self.iters >= self.max_iters:
+                complete = False
+                break
+            total, depth, i, key, seq, where, gaps = heapq.heappop(heap)
+            for move in self._moves(key, where, gaps):
+                self.iters += 1
+                grid, new_where, new_gaps = \
+                    list(key), list(where), list(gaps)
+                self._move(grid, new_where, new_gaps, move)
+                new_key = tuple(grid)
+                if new_key in parents:
+                    continue
+                parents[new_key] = (key, move)
+                new_seq = list(seq)
+                for row in (move[0] // rstep, move[1] // rstep):
+                    new_seq[row] = self._sequenced(grid, row)
+                total = sum(new_seq)
+                if total > best:
+                    best, best_key = total, new_key
+                    if total == self.goal:
+                        heap = []
+                        break
+                n += 1
+                heapq.heappush(heap, (-total, depth + 1, n, new_key,
+                                      tuple(new_seq), tuple(new_where),
+                                      tuple(new_gaps)))
+        moves = []
+        key = best_key
+        while parents[key] is not None:
+            key, move = parents[key]
+            moves.append(move)
+        moves.reverse()
+        if best == self.goal:
+            return 'solved', moves
+        if not complete:
+            return 'intractable', moves
+        if redeal and moves:
+            return 'solved', moves
+        return 'unsolved', []
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for the games that take cards out of a line (Push Pin,
+# * Accordion, Decade...) or a grid (Monte Carlo and the like) in
+# * pairs or runs.
+# *
+# * The cards are (rank, suit) pairs. For the line games they are the
+# * line from the left, for the grid games the 25 stacks of the grid,
+# * None for an empty one; the talon is the cards still to be dealt,
+# * the next one first. A move is (i, j) in the terms of the hints of
+# * the games:
+# *   - (i, None): drop the card i
+# *   - (i, j): drop the pair i and j, move the card i onto the card j
+# *     (Accordion) or drop the run from i to j (Decade, Seven Up)
+# *   - (-1, None): deal (and close the gaps of the grid)
+# *
+# * The search is a depth first search over the positions - a tuple
+# * of the cards, packed into ints, and the talon index. No move can
+# * be taken back, so a position that was searched without a solution
+# * is dead for good; the dead positions are kept in a set, by the
+# * cards and the number of cards left in the talon. The set is kept
+# * for the next searches of the same deal, as long as their talon is
+# * the end of the talon of the first one.
+# ************************************************************************
+
+LINE_PRESETS = ('push_pin', 'bayan', 'accordion', 'relaxed_accordion',
+                'skidoo', 'decade', 'seven_up')
+GRID_PRESETS = ('monte_carlo', 'simple_carlo', 'quatorze', 'neighbour')
+PRESETS = LINE_PRESETS + GRID_PRESETS
+
+EMPTY = -1
+KING = 12
+
+
+def _rank(c):
+    return c & 15
+
+
+def _match(c1, c2):
+    return (c1 ^ c2) & 15 == 0 or (c1 ^ c2) >> 4 == 0
+
+
+class PairingSolver:
+    def __init__(self, preset, max_iters=100000):
+        assert preset in PRESETS
+        self.preset = preset
+        self.max_iters = max_iters
+        self.iters = 0
+        self.dead = set()
+        self.dead_talon = None
+        # position -> (state, solution, index of the next move)
+        self.results = {}
+        # the cards left on a won game
+        self.left = {'push_pin': 2, 'accordion': 1, 'relaxed_accordion': 1,
+                     'skidoo': 2}.get(preset, 0)
+        if preset in GRID_PRESETS:
+            self.neighbours = [[j for j in range(25)
+                                if j != i and self._isNeighbour(i, j)]
+                               for i in range(25)]
+
+    @staticmethod
+    def isSupported(preset):
+        return preset in PRESETS
+
+    #
+    # the line games
+    #
+
+    def _lineMoves(self, line):
+        preset = self.preset
+        n = len(line)
+        moves = []
+        if preset == 'push_pin':
+            # the card or the two cards between a matching pair
+            for i in range(n - 2):
+                if _match(line[i], line[i+2]):
+                    moves.append(((i+1, None), line[:i+1] + line[i+2:]))
+                if i + 3 < n and _match(line[i], line[i+3]):
+                    moves.append(((i+1, i+2), line[:i+1] + line[i+3:]))
+        elif preset == 'bayan':
+            for d in (1, 3):
+                for i in range(n - d):
+                    if _match(line[i], line[i+d]):
+                        new = line[:i] + line[i+1:i+d] + line[i+d+1:]
+                        moves.append(((i, i+d), new))
+        elif preset in ('accordion', 'relaxed_accordion', 'skidoo'):
+            jumps = (2, 3) if preset == 'skidoo' else (1, 3)
+            for d in jumps:
+                for i in range(n - d):
+                    j = i + d
+                    if not _match(line[i], line[j]):
+                        continue
+                    # the card j onto the card i; the card that has to
+                    # be left last cannot be covered
+                    if line[i] != self.final:
+                        new = line[:i] + line[j:j+1] + line[i+1:j] + \
+                            line[j+1:]
+                        moves.append(((j, i), new))
+                    if preset == 'relaxed_accordion' and \
+                            line[j] != self.final:
+                        # the card i onto the card j
+                        new = line[:i] + line[i+1:j] + line[i:i+1] + \
+                            line[j+1:]
+                        moves.append(((i, j), new))
+        else:
+            # decade, seven_up
+            for i in range(n):
+                if preset == 'seven_up' and _rank(line[i]) == 6:
+                    moves.append(((i, None), line[:i] + line[i+1:]))
+                total = 0
+                for j in range(i, n):
+                    if preset == 'decade':
+                        total += min(_rank(line[j]) + 1, 10)
+                        if total > 30:
+                            break
+                        ok = j > i and total % 10 == 0
+                    else:
+                        if j - i >= 4:
+                            break
+                        total += _rank(line[j]) + 1
+                        ok = j > i and total % 7 == 0
+                    if ok:
+                        moves.append(((i, j), line[:i] + line[j+1:]))
+        return moves
+
+    #
+    # the grid games
+    #
+
+    def _isNeighbour(self, i, j):
+        if self.preset == 'simple_carlo':
+            return True
+        if self.preset == 'quatorze':
+            return i // 5 == j // 5 or i % 5 == j % 5
+        return abs(i // 5 - j // 5) <= 1 and abs(i % 5 - j % 5) <= 1
+
+    def _gridMatch(self, c1, c2):
+        if self.preset == 'quatorze':
+            return _rank(c1) + _rank(c2) == 12
+        if self.preset == 'neighbour':
+            return _rank(c1) + _rank(c2) == 11
+        return _rank(c1) == _rank(c2)
+
+    def _shift(self, grid):
+        cards = [c for c in grid if c != EMPTY]
+        return cards + [EMPTY] * (len(grid) - len(cards))
+
+    # MonteCarlo.fillEmptyStacks(): close the gaps, then deal to the
+    # empty stacks; Quatorze deals to the gaps while it can
+    def _fill(self, grid, tpos):
+        talon = self.talon
+        free = grid.count(EMPTY)
+        left = len(talon) - tpos
+        before_shift = self.preset == 'quatorze'
+        if not before_shift or not left:
+            grid = self._shift(grid)
+        else:
+            grid = list(grid)
+        for i, c in enumerate(grid):
+            if c == EMPTY and tpos < len(talon):
+                grid[i] = talon[tpos]
+                tpos += 1
+        if before_shift and free > left > 0:
+            grid = self._shift(grid)
+        return tuple(grid), tpos
+
+    def _gridMoves(self, grid, tpos):
+        auto_fill = self.preset != 'monte_carlo'
+        moves = []
+        for i, c in enumerate(grid):
+            if c == EMPTY:
+                continue
+            if self.preset == 'neighbour' and _rank(c) == KING:
+                new = list(grid)
+                new[i] = EMPTY
+                moves.append(((i, None), tuple(new), tpos))
+            for j in self.neighbours[i]:
+                if j > i and grid[j] != EMPTY and self._gridMatch(c, grid[j]):
+                    new = list(grid)
+                    new[i] = new[j] = EMPTY
+                    moves.append(((i, j), tuple(new), tpos))
+        if auto_fill:
+            moves = [(m, ) + self._fill(g, t) for m, g, t in moves]
+        else:
+            g, t = self._fill(grid, tpos)
+            if (g, t) != (grid, tpos):
+                moves.insert(0, ((-1, None), g, t))
+        return moves
+
+    #
+    # the search
+    #
+
+    def _moves(self, cells, tpos):
+        if self.preset in GRID_PRESETS:
+            return self._gridMoves(cells, tpos)
+        # the moves on the left first, dealing last
+        moves = [(m, c, tpos) for m, c in self._lineMoves(cells)]
+        moves.sort(key=lambda m: -m[0][0])
+        if tpos < len(self.talon):
+            moves.insert(0, ((-1, None), cells + self.talon[tpos:tpos+1],
+                             tpos + 1))
+        return moves
+
+    def _isWon(self, cells, tpos):
+        if tpos < len(self.talon):
+            return False
+        if self.preset in GRID_PRESETS:
+            return cells.count(EMPTY) == len(cells)
+        if len(cells) != self.left:
+            return False
+        return self.final is None or cells[0] == self.final
+
+    def solve(self, cards, talon=(), final=None):
+        def pack(c):
+            return EMPTY if c is None else c[0] | c[1] << 4
+        cells = tuple(pack(c) for c in cards)
+        self.talon = tuple(pack(c) for c in talon)
+        self.final = None if final is None else pack(final)
+        key = (cells, self.talon, self.final)
+        res = self.results.get(key)
+        if res is not None:
+            state, moves, n = res
+            return state, moves[n:]
+        state, moves = self._search(cells)
+        self.results[key] = (state, moves, 0)
+        if state == 'solved':
+            # remember every position on the way
+            tpos = 0
+            for n, move in enumerate(moves):
+                self.results[(cells, self.talon[tpos:], self.final)] = \
+                    (state, moves, n)
+                for m, c, t in self._moves(cells, tpos):
+                    if m == move:
+                        cells, tpos = c, t
+                        break
+        return state, moves
+
+    def _getDead(self):
+        talon, deal = self.talon, self.dead_talon
+        if deal is None or deal[0] != self.final or \
+                len(talon) > len(deal[1]) or \
+                talon != deal[1][len(deal[1]) - len(talon):]:
+            self.dead = set()
+            self.dead_talon = (self.final, talon)
+        return self.dead
+
+    def _search(self, cells):
+        tpos = 0
+        self.iters = 0
+        dead = self._getDead()
+        left = len(self.talon)
+        path = []
+        frames = [self._moves(cells, tpos)]
+        if self._isWon(cells, tpos):
+            return 'solved', []
+        while frames:
+            moves = frames[-1]
+            if not moves:
+                frames.pop()
+                dead.add((cells, left - tpos))
+                if not path:
+                    break
+                move, cells, tpos = path.pop()
+                continue
+            if self.iters >= self.max_iters:
+                return 'intractable', []
+            self.iters += 1
+            move, new_cells, new_tpos = moves.pop()
+            if (new_cells, left - new_tpos) in dead:
+                continue
+            path.append((move, cells, tpos))
+            cells, tpos = new_cells, new_tpos
+            if self._isWon(cells, tpos):
+                return 'solved', [m for m, c, t in path]
+            frames.append(self._moves(cells, tpos))
+        return 'unsolved', []
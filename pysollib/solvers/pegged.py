@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for Pegged (peg solitaire) on any board.
+# *
+# * A board is given by the positions of its holes and the steps of
+# * the jumps. A position of the game is a bitboard - an int with bit i
+# * set if hole i has a peg - and every jump is kept with the masks of
+# * the hole it starts from, the hole it jumps over and the hole it
+# * ends in.
+# *
+# * The search is a depth first search. Every jump removes a peg, so a
+# * position is never reached twice on one path and a position that
+# * was searched without a solution is dead for good. Dead positions
+# * are kept in a set by the least of their images under the
+# * symmetries of the board (those that keep the target hole, if the
+# * last peg has to end there), so a position and its mirror images
+# * are searched once.
+# ************************************************************************
+
+from fractions import Fraction
+
+
+class PeggedSolver:
+    def __init__(self, positions, steps, max_iters=100000):
+        index = dict((p, i) for i, p in enumerate(positions))
+        self.size = len(positions)
+        # (from, to, the mask of the three holes, from, over, to masks)
+        self.jumps = []
+        for i, (x, y) in enumerate(positions):
+            for dx, dy in steps:
+                j = index.get((x + dx // 2, y + dy // 2))
+                k = index.get((x + dx, y + dy))
+                if j is not None and k is not None:
+                    self.jumps.append((i, k, (1 << i) | (1 << j) | (1 << k),
+                                       1 << i, 1 << j, 1 << k))
+        self.symmetries = self._getSymmetries(positions, steps, index)
+        self.max_iters = max_iters
+        self.iters = 0
+        # the dead positions and the symmetry tables by target
+        self.dead = {}
+        self.tables = {}
+
+    # The permutations of the holes by the linear maps (around the
+    # centre of the board) that map the steps and the board onto
+    # themselves, the identity included.
+    @staticmethod
+    def _getSymmetries(positions, steps, index):
+        n = len(positions)
+        cx = Fraction(sum(x for x, y in positions), n)
+        cy = Fraction(sum(y for x, y in positions), n)
+        steps = list(steps)
+        s1 = steps[0]
+        s2 = [s for s in steps if s[0] * s1[1] != s[1] * s1[0]][0]
+        det = s1[0] * s2[1] - s2[0] * s1[1]
+        perms = set()
+        for t1 in steps:
+            for t2 in steps:
+                # the map with s1 -> t1 and s2 -> t2
+                m00 = Fraction(t1[0] * s2[1] - t2[0] * s1[1], det)
+                m01 = Fraction(t2[0] * s1[0] - t1[0] * s2[0], det)
+                m10 = Fraction(t1[1] * s2[1] - t2[1] * s1[1], det)
+                m11 = Fraction(t2[1] * s1[0] - t1[1] * s2[0], det)
+                mapped = set((m00 * x + m01 * y, m10 * x + m11 * y)
+                             for x, y in steps)
+                if mapped != set(steps):
+                    continue
+                perm = []
+                for x, y in positions:
+                    px = m00 * (x - cx) + m01 * (y - cy) + cx
+                    py = m10 * (x - cx) + m11 * (y - cy) + cy
+                    if px.denominator != 1 or py.denominator != 1:
+                        break
+                    i = index.get((int(px), int(py)))
+                    if i is None:
+                        break
+                    perm.append(i)
+                else:
+                    perms.add(tuple(perm))
+        return sorted(perms)
+
+    # For each symmetry keeping target, a table per byte of a position
+    # with the image of the holes of each value of the byte.
+    def _getTables(self, target):
+        if target in self.tables:
+            return self.tables[target]
+        tables = []
+        for perm in self.symmetries:
+            if target is not None and perm[target] != target:
+                continue
+            chunks = []
+            for c in range(0, self.size, 8):
+                table = [0] * 256
+                for v in range(1, 256):
+                    low = v & -v
+                    i = c + low.bit_length() - 1
+                    bit = 1 << perm[i] if i < self.size else 0
+                    table[v] = table[v ^ low] | bit
+                chunks.append(table)
+            tables.append(chunks)
+        self.tables[target] = tables
+        return tables
+
+    def getKey(self, pegs, target=None):
+        key = None
+        for chunks in self._getTables(target):
+            k = 0
+            b = pegs
+            for table in chunks:
+                k |= table[b & 255]
+                b >>= 8
+            if key is None or k < key:
+                key = k
+        return key
+
+    def _moves(self, pegs):
+        return [jump for jump in self.jumps
+                if pegs & jump[3] and pegs & jump[4] and not pegs & jump[5]]
+
+    # pegs are the holes with a peg; the last peg has to end in the
+    # hole target, or anywhere if target is None. Returns the state
+    # and the jumps (from, to) of a solution.
+    def solve(self, pegs, target=None):
+        b = 0
+        for i in pegs:
+            b |= 1 << i
+        goal = None if target is None else 1 << target
+        dead = self.dead.setdefault(target, set())
+        getKey = self.getKey
+
+        def solved(b):
+            if goal is None:
+                return not b & (b - 1)
+            return b == goal
+
+        self.iters = 0
+        if solved(b):
+            return 'solved', []
+        if getKey(b, target) in dead:
+            return 'unsolved', []
+        path = []
+        frames = [self._moves(b)]
+        while frames:
+            moves = frames[-1]
+            if not moves:
+                frames.pop()
+                dead.add(getKey(b, target))
+                if not path:
+                    break
+                b ^= path.pop()[2]
+                continue
+            if self.iters >= self.max_iters:
+                return 'intractable', []
+            self.iters += 1
+            jump = moves.pop()
+            b ^= jump[2]
+            path.append(jump)
+            if solved(b):
+                return 'solved', [(jump[0], jump[1]) for jump in path]
+            if not b & (b - 1) or getKey(b, target) in dead:
+                # no moves: the jump is taken back at once
+                frames.append([])
+            else:
+                frames.append(self._moves(b))
+        return 'unsolved', []
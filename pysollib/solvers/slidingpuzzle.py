@@ -0,0 +1,531 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * A solver for the sliding tile puzzles (Matrix) on a size x size
+# * board.
+# *
+# * A board is a list of the tiles by position: tile t belongs at
+# * position t, the blank is tile size * size - 1 and belongs at the
+# * last position. A solution is the list of the positions the blank
+# * moves to (the positions of the tiles slid into it).
+# *
+# * A board of up to 4x4 is searched for the fewest moves by IDA*. The
+# * heuristic is the Manhattan distance plus the linear conflicts - for
+# * each row and column, two moves for each tile to take out of it to
+# * leave its tiles in order - or, if additive pattern databases are
+# * given, the larger of their sums for the board and for its mirror
+# * image by the diagonal. If that search takes more than max_nodes
+# * nodes, the pattern databases are weighted by WEIGHT, which finds a
+# * solution at most WEIGHT times as long as the fewest moves, much
+# * sooner.
+# *
+# * Larger boards, and boards whose search runs out of nodes, are
+# * reduced: the top row and the left column are placed, a tile at a
+# * time and the last two tiles of a line together, until 3x3 tiles
+# * are left, which are solved by IDA*. Placing tiles is a best-first
+# * search over the positions of the blank and of these tiles only, so
+# * the other tiles do not matter.
+# ************************************************************************
+
+import collections
+import heapq
+
+
+class SlidingPuzzleSolver:
+    # the weight of the pattern databases in the search when the
+    # optimal search runs out of nodes
+    WEIGHT = 1.5
+
+    def __init__(self, size, max_nodes=200000, pattern_db=None):
+        self.size = size
+        self.max_nodes = max_nodes
+        self.pattern_db = pattern_db
+        self.nodes = 0
+        n = size * size
+        self.blank = n - 1
+        self.neighbours = []
+        for p in range(n):
+            r, c = divmod(p, size)
+            nb = []
+            if r > 0:
+                nb.append(p - size)
+            if r < size - 1:
+                nb.append(p + size)
+            if c > 0:
+                nb.append(p - 1)
+            if c < size - 1:
+                nb.append(p + 1)
+            self.neighbours.append(nb)
+        # md[t][p]: the Manhattan distance of tile t at position p
+        self.md = [[abs(t // size - p // size) + abs(t % size - p % size)
+                    for p in range(n)] for t in range(n)]
+
+    @staticmethod
+    def isSolvable(tiles):
+        size = int(len(tiles) ** 0.5)
+        blank = len(tiles) - 1
+        perm = [t for t in tiles if t != blank]
+        inversions = 0
+        for i in range(len(perm)):
+            for j in range(i + 1, len(perm)):
+                if perm[i] > perm[j]:
+                    inversions += 1
+        if size % 2:
+            return inversions % 2 == 0
+        # the row of the blank, counted from the bottom
+        row = size - tiles.index(blank) // size
+        return (inversions + row) % 2 == 1
+
+    def solve(self, tiles):
+        if not self.isSolvable(tiles):
+            return 'unsolved', []
+        if self.size <= 4:
+            if self.pattern_db is not None and self.pattern_db.tables:
+                state, moves = self._searchPatterns(tiles, self.max_nodes)
+                if state != 'solved':
+                    state, moves = self._searchPatterns(
+                        tiles, self.max_nodes, self.WEIGHT)
+            else:
+                state, moves = self._searchOptimal(tiles, 0, self.max_nodes)
+            if state == 'solved':
+                return state, moves
+        return 'solved', self._solveReduced(tiles)
+
+    #
+    # IDA*
+    #
+
+    # the number of tiles to take out of a line to leave its tiles (in
+    # the line order, by their goal positions) in order: the length
+    # minus the longest increasing subsequence
+    @staticmethod
+    def _lineConflicts(goals):
+        if len(goals) < 2:
+            return 0
+        lis = []
+        for i, g in enumerate(goals):
+            n = 1
+            for j in range(i):
+                if goals[j] < g and lis[j] + 1 > n:
+                    n = lis[j] + 1
+            lis.append(n)
+        return len(goals) - max(lis)
+
+    def _rowConflicts(self, tiles, r, c0):
+        size = self.size
+        goals = [t for t in tiles[r * size + c0:(r + 1) * size]
+                 if t != self.blank and t // size == r]
+        return self._lineConflicts(goals)
+
+    def _colConflicts(self, tiles, c, r0):
+        size = self.size
+        goals = [t for t in tiles[r0 * size + c::size]
+                 if t != self.blank and t % size == c]
+        return self._lineConflicts(goals)
+
+    # Search the region of the rows from r0 and the columns from r0 -
+    # the whole board or its last 3x3 tiles; the tiles there belong
+    # there. Returns ('solved', moves) or ('intractable', []).
+    def _searchOptimal(self, tiles, r0, max_nodes):
+        size = self.size
+        blank_tile = self.blank
+        md = self.md
+        tiles = list(tiles)
+        cells = [r * size + c for r in range(r0, size)
+                 for c in range(r0, size)]
+        neighbours = [[q for q in nb if q // size >= r0 and q % size >= r0]
+                      for nb in self.neighbours]
+        blank = tiles.index(blank_tile)
+        md_sum = sum(md[tiles[p]][p] for p in cells if p != blank)
+        rows = [0] * size
+        cols = [0] * size
+        for i in range(r0, size):
+            rows[i] = self._rowConflicts(tiles, i, r0)
+            cols[i] = self._colConflicts(tiles, i, r0)
+        lc_sum = sum(rows) + sum(cols)
+        self.nodes = 0
+        bound = md_sum + 2 * lc_sum
+        while True:
+            if bound == 0:
+                return 'solved', []
+            next_bound = None
+            g = 0
+            # (blank, md_sum, lc_sum, line, old conflicts)
+            path = []
+            frames = [list(neighbours[blank])]
+            while frames:
+                cands = frames[-1]
+                if not cands:
+                    frames.pop()
+                    if not path:
+                        break
+                    pos = blank
+                    blank, md_sum, lc_sum, line, old = path.pop()
+                    tile = tiles[blank]
+                    tiles[pos], tiles[blank] = tile, blank_tile
+                    lines = rows if line == 'row' else cols
+                    lines[old[0]], lines[old[2]] = old[1], old[3]
+                    g -= 1
+                    continue
+                pos = cands.pop()
+                tile = tiles[pos]
+                new_md = md_sum - md[tile][pos] + md[tile][blank]
+                # the lines the tile leaves and enters
+                if pos // size == blank // size:
+                    line, lines, i, j = 'col', cols, pos % size, blank % size
+                else:
+                    line, lines, i, j = 'row', rows, pos // size, blank // size
+                old = (i, lines[i], j, lines[j])
+                tiles[blank], tiles[pos] = tile, blank_tile
+                if line == 'col':
+                    lines[i] = self._colConflicts(tiles, i, r0)
+                    lines[j] = self._colConflicts(tiles, j, r0)
+                else:
+                    lines[i] = self._rowConflicts(tiles, i, r0)
+                    lines[j] = self._rowConflicts(tiles, j, r0)
+                new_lc = lc_sum - old[1] - old[3] + lines[i] + lines[j]
+                f = g + 1 + new_md + 2 * new_lc
+                if f > bound:
+                    # take the move back
+                    tiles[pos], tiles[blank] = tile, blank_tile
+                    lines[i], lines[j] = old[1], old[3]
+                    if next_bound is None or f < next_bound:
+                        next_bound = f
+                    continue
+                self.nodes += 1
+                if self.nodes > max_nodes:
+                    return 'intractable', []
+                path.append((blank, md_sum, lc_sum, line, old))
+                blank, md_sum, lc_sum = pos, new_md, new_lc
+                g += 1
+                if md_sum == 0:
+                    moves = [p[0] for p in path[1:]] + [blank]
+                    return 'solved', moves
+                prev = path[-1][0]
+                frames.append([q for q in neighbours[blank] if q != prev])
+            if next_bound is None:
+                return 'unsolved', []
+            bound = next_bound
+
+    # IDA* by the pattern databases alone: the larger of the sum of the
+    # tables for the board and for its mirror image by the diagonal,
+    # which maps the rows of the tables on the columns.
+    def _searchPatterns(self, tiles, max_nodes, weight=1):
+        size = self.size
+        n = size * size
+        blank_tile = self.blank
+        neighbours = self.neighbours
+        pdb = self.pattern_db
+        tables = pdb.tables
+        mirror = [(p % size) * size + p // size for p in range(n)]
+        # for each tile: its table and weight for the board and for the
+        # mirror image
+        rg, rw, cg, cw = [0] * n, [0] * n, [0] * n, [0] * n
+        for t in range(n):
+            if t != blank_tile:
+                rg[t], rw[t] = pdb.weights[t]
+                cg[t], cw[t] = pdb.weights[mirror[t]]
+        tiles = list(tiles)
+        rindex = [0] * len(tables)
+        cindex = [0] * len(tables)
+        for p, t in enumerate(tiles):
+            if t != blank_tile:
+                rindex[rg[t]] += p * rw[t]
+                cindex[cg[t]] += mirror[p] * cw[t]
+        rsum = sum(table[i] for table, i in zip(tables, rindex))
+        csum = sum(table[i] for table, i in zip(tables, cindex))
+        path = []
+        self.nodes = 0
+        # the bound of the next iteration and whether the budget is out
+        state = {'next': None, 'out': False}
+
+        def search(blank, prev, g, rsum, csum, bound):
+            for pos in neighbours[blank]:
+                if pos == prev:
+                    continue
+                tile = tiles[pos]
+                g1, g2 = rg[tile], cg[tile]
+                t1, t2 = tables[g1], tables[g2]
+                i1, i2 = rindex[g1], cindex[g2]
+                j1 = i1 + (blank - pos) * rw[tile]
+                j2 = i2 + (mirror[blank] - mirror[pos]) * cw[tile]
+                r = rsum - t1[i1] + t1[j1]
+                c = csum - t2[i2] + t2[j2]
+                h = r if r > c else c
+                f = g + 1 + weight * h
+                if f > bound:
+                    if state['next'] is None or f < state['next']:
+                        state['next'] = f
+                    continue
+                self.nodes += 1
+                if self.nodes > max_nodes:
+                    state['out'] = True
+                    return False
+                tiles[blank], tiles[pos] = tile, blank_tile
+                rindex[g1], cindex[g2] = j1, j2
+                path.append(pos)
+                if h == 0 or search(pos, blank, g + 1, r, c, bound):
+                    return True
+                path.pop()
+                tiles[pos], tiles[blank] = tile, blank_tile
+                rindex[g1], cindex[g2] = i1, i2
+                if state['out']:
+                    return False
+            return False
+
+        blank = tiles.index(blank_tile)
+        bound = weight * max(rsum, csum)
+        while True:
+            if bound == 0:
+                return 'solved', []
+            state['next'] = None
+            if search(blank, None, 0, rsum, csum, bound):
+                return 'solved', path
+            if state['out']:
+                return 'intractable', []
+            if state['next'] is None:
+                return 'unsolved', []
+            bound = state['next']
+
+    #
+    # reduction
+    #
+
+    def _solveReduced(self, tiles):
+        size = self.size
+        tiles = list(tiles)
+        moves = []
+        fixed = set()
+        r0 = c0 = 0
+        while size - r0 > 3 or size - c0 > 3:
+            if size - r0 >= size - c0:
+                line = [r0 * size + c for c in range(c0, size)]
+                # the side of the line the other tiles are
+                side = size
+                r0 += 1
+            else:
+                line = [r * size + c0 for r in range(r0, size)]
+                side = 1
+                c0 += 1
+            for p in line[:-2]:
+                self._placeTile(tiles, p, p, fixed, moves)
+                fixed.add(p)
+            self._placeLastTiles(tiles, line[-2], line[-1], side, fixed,
+                                 moves)
+            fixed.update(line[-2:])
+        state, rest = self._searchOptimal(tiles, r0, float('inf'))
+        return moves + rest
+
+    def _moveBlank(self, tiles, pos):
+        blank = tiles.index(self.blank)
+        tiles[blank], tiles[pos] = tiles[pos], self.blank
+
+    # The last two tiles of a line, at p1 and p2, can't be placed one
+    # after the other: the tile of p2 is put at p1 and the tile of p1
+    # next to it, away from the line, together (one after the other
+    # could shut the tile of p1 in at p2), and the blank takes them
+    # round from p2.
+    def _placeLastTiles(self, tiles, p1, p2, side, fixed, moves):
+        if tiles[p1] == p1 and tiles[p2] == p2:
+            return
+        self._placeTiles(tiles, {p2: p1, p1: p1 + side}, fixed, moves)
+        self._moveBlankTo(tiles, p2, fixed | set([p1, p1 + side]), moves)
+        for p in (p1, p1 + side):
+            self._moveBlank(tiles, p)
+            moves.append(p)
+
+    # Move the blank to pos, not moving the tiles at fixed, by a
+    # breadth-first search.
+    def _moveBlankTo(self, tiles, pos, fixed, moves):
+        start = tiles.index(self.blank)
+        prev = {start: None}
+        queue = collections.deque([start])
+        while queue:
+            blank = queue.popleft()
+            if blank == pos:
+                break
+            for q in self.neighbours[blank]:
+                if q not in fixed and q not in prev:
+                    prev[q] = blank
+                    queue.append(q)
+        path = []
+        while blank != start:
+            path.append(blank)
+            blank = prev[blank]
+        path.reverse()
+        for p in path:
+            self._moveBlank(tiles, p)
+        moves.extend(path)
+
+    def _placeTile(self, tiles, tile, cell, fixed, moves):
+        self._placeTiles(tiles, {tile: cell}, fixed, moves)
+
+    # Slide the tiles to their cells (targets: tile -> cell), not moving
+    # the tiles at fixed, by a search over the positions of the blank and
+    # of these tiles. It is a best-first search by the moves so far and
+    # an estimate of the moves left: taking the blank next to a tile,
+    # then five moves for each step of a tile (the blank goes round it),
+    # which is not a lower bound, so the moves are few but not the
+    # fewest.
+    def _placeTiles(self, tiles, targets, fixed, moves):
+        md = self.md
+        blank_tile = self.blank
+        cells = list(targets.values())
+        start = (tiles.index(blank_tile),) + tuple(
+            tiles.index(t) for t in targets)
+
+        def h(state):
+            blank = state[0]
+            near, est = None, 0
+            for pos, cell in zip(state[1:], cells):
+                if pos != cell:
+                    est += 5 * md[cell][pos] - 4
+                    if near is None or md[blank][pos] < near:
+                        near = md[blank][pos]
+            if near is None:
+                return 0
+            return est + near - 1
+
+        prev = {start: None}
+        queue = [(h(start), 0, start)]
+        while queue:
+            f, g, state = heapq.heappop(queue)
+            if f == g:
+                # all the tiles at their cells
+                break
+            blank = state[0]
+            for q in self.neighbours[blank]:
+                if q in fixed:
+                    continue
+                new = (q,) + tuple(blank if p == q else p for p in state[1:])
+                if new not in prev:
+                    prev[new] = state
+                    heapq.heappush(queue, (g + 1 + h(new), g + 1, new))
+        path = []
+        while state != start:
+            path.append(state[0])
+            state = prev[state]
+        path.reverse()
+        for p in path:
+            self._moveBlank(tiles, p)
+        moves.extend(path)
+
+
+# ************************************************************************
+# * Additive pattern databases: the tiles are split into groups, and for
+# * each group a table gives, for the positions of its tiles, the number
+# * of moves of these tiles needed to bring them home, found by a
+# * breadth-first search back from the goal. As no move moves tiles of
+# * two groups, the sum of the tables is a lower bound of the moves
+# * left.
+# ************************************************************************
+
+class PatternDatabase:
+    def __init__(self, size, groups=None):
+        self.size = size
+        n = size * size
+        if groups is None and size == 4:
+            # three blocks of five tiles
+            groups = [[0, 1, 4, 5, 8], [2, 3, 6, 7, 11], [9, 10, 12, 13, 14]]
+        elif groups is None:
+            # by rows, the last row with the blank
+            groups = [list(range(r * size, min((r + 1) * size, n - 1)))
+                      for r in range(size)]
+        self.groups = groups
+        self.tables = None
+        # tile -> (group, weight of its position in the index)
+        self.weights = {}
+        for g, tiles in enumerate(groups):
+            for k, t in enumerate(tiles):
+                self.weights[t] = (g, n ** k)
+
+    def getIndex(self, tiles):
+        index = [0] * len(self.groups)
+        for p, t in enumerate(tiles):
+            if t in self.weights:
+                g, w = self.weights[t]
+                index[g] += p * w
+        return index, sum(table[i] for table, i in zip(self.tables, index))
+
+    def build(self):
+        self.tables = [self._buildTable(tiles) for tiles in self.groups]
+
+    def _buildTable(self, tiles):
+        size = self.size
+        n = size * size
+        k = len(tiles)
+        neighbours = SlidingPuzzleSolver(size).neighbours
+        weights = [n ** (i + 1) for i in range(k)]
+        # a state is the blank + n * the index of the positions of the
+        # tiles; a 0-1 breadth-first search, as only the moves of the
+        # tiles count
+        start = n - 1 + sum(t * w for t, w in zip(tiles, weights))
+        dist = bytearray(b'\xff') * (n ** (k + 1))
+        dist[start] = 0
+        table = bytearray(b'\xff') * (n ** k)
+        queue = collections.deque([start])
+        while queue:
+            state = queue.popleft()
+            d = dist[state]
+            index = state // n
+            if d < table[index]:
+                table[index] = d
+            blank = state % n
+            positions = []
+            i = index
+            for w in weights:
+                i, p = divmod(i, n)
+                positions.append(p)
+            for q in neighbours[blank]:
+                if q in positions:
+                    new = state + (blank - q) * weights[positions.index(q)]
+                    new += q - blank
+                    if dist[new] > d + 1:
+                        dist[new] = d + 1
+                        queue.append(new)
+                else:
+                    new = state + q - blank
+                    if dist[new] > d:
+                        dist[new] = d
+                        queue.appendleft(new)
+        return table
+
+    def load(self, filename):
+        sizes = [self.size ** (2 * len(tiles)) for tiles in self.groups]
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return False
+        if len(data) != sum(sizes):
+            return False
+        self.tables = []
+        for s in sizes:
+            self.tables.append(bytearray(data[:s]))
+            data = data[s:]
+        return True
+
+    def save(self, filename):
+        try:
+            with open(filename, 'wb') as f:
+                for table in self.tables:
+                    f.write(table)
+        except (IOError, OSError):
+            pass
@@ -37,6 +37,9 @@ from pysollib.settings import DEBUG
 from pysollib.settings import TOOLKIT
 from pysollib.util import ACE, KING
 from pysollib.util import ANY_RANK, ANY_SUIT, NO_RANK
+from pysollib.zobrist import ZOBRIST_MASK
+from pysollib.zobrist import zobristFlipKey, zobristKey
+from pysollib.zobrist import zobristPositionKey, zobristStackHash
 
 # ************************************************************************
 # * Let's start with some test methods for cards.
@@ -153,6 +156,10 @@ class Stack:
     MIN_VISIBLE_YOFFSET = 3
     SHRINK_FACTOR = 2.
 
+    # snapshot group (see Game.createSnGroups); the position hash of
+    # stacks without a group (cloned stacks, previews) is not tracked
+    zobrist_group = None
+
     def __init__(self, x, y, game, cap={}):
         # Arguments are the stack's nominal x and y position (the top
         # left corner of the first card placed in the stack), and the
@@ -181,6 +188,7 @@ class Stack:
         model.id = id
         model.game = game
         model.cards = []
+        model.zobrist_hash = 0
         #
         model.is_filled = False
 
@@ -394,6 +402,10 @@ class Stack:
     def addCard(self, card, unhide=1, update=1):
         model, view = self, self
         model.cards.append(card)
+        if model.zobrist_group is not None:
+            model._updateHash(zobristKey(
+                model.zobrist_group, len(model.cards) - 1,
+                card.suit, card.rank, card.face_up))
         card.tkraise(unhide=unhide)
         if view.can_hide_cards and len(model.cards) >= 3:
             # we only need to display the 2 top cards
@@ -408,6 +420,7 @@ class Stack:
     def insertCard(self, card, position, unhide=1, update=1):
         model, view = self, self
         model.cards.insert(position, card)
+        model.rehash()
         for c in model.cards[position:]:
             c.tkraise(unhide=unhide)
         if (view.can_hide_cards and len(model.cards) >= 3 and
@@ -428,6 +441,10 @@ class Stack:
         assert len(model.cards) > 0
         if card is None:
             card = model.cards[-1]
+            if model.zobrist_group is not None:
+                model._updateHash(zobristKey(
+                    model.zobrist_group, len(model.cards) - 1,
+                    card.suit, card.rank, card.face_up))
             # optimized a little bit (compare with the else below)
             card.item.dtag(view.group)
             if unhide and self.can_hide_cards:
@@ -446,6 +463,7 @@ class Stack:
                         model.cards[-3].unhide()
             card_index = model.cards.index(card)
             model.cards.remove(card)
+            model.rehash()
             if update_positions:
                 for c in model.cards[card_index:]:
                     view._position(c)
@@ -456,6 +474,38 @@ class Stack:
         self.is_filled = False
         return card
 
+    #
+    # Position hash {model}
+    #
+
+    def _updateHash(self, key):
+        # xor a key into the stack hash and keep the game hashes in sync
+        old = self.zobrist_hash
+        new = self.zobrist_hash = old ^ key
+        game = self.game
+        game.zobrist_hash = (game.zobrist_hash - old + new) & ZOBRIST_MASK
+        game.position_hash = (game.position_hash -
+                              zobristPositionKey(self.id, old) +
+                              zobristPositionKey(self.id, new)) & ZOBRIST_MASK
+
+    # Call this after turning over a card that lies on the stack.
+    def updateFlipHash(self, card_index=-1):
+        if self.zobrist_group is None:
+            return
+        if card_index < 0:
+            card_index += len(self.cards)
+        card = self.cards[card_index]
+        self._updateHash(zobristFlipKey(self.zobrist_group, card_index,
+                                        card.suit, card.rank))
+
+    # Recompute the hash after the cards were changed in place (shuffled,
+    # reordered, flipped directly).
+    def rehash(self):
+        if self.zobrist_group is None:
+            return
+        self._updateHash(self.zobrist_hash ^
+                         zobristStackHash(self.zobrist_group, self.cards))
+
     # Get the top card {model}
     def getCard(self):
         if self.cards:
@@ -122,13 +122,19 @@ class BaseSolverDialog:
         focus = self.createButtons(bottom_frame, kw)
         self.start_button = self.buttons[0]
         self.play_button = self.buttons[1]
+        self.start_text = self.start_button['text']
+        self.solver = None              # the running solver
+        self.poll_timer = None
         self._reset()
         self.connectGame(self.app.game)
         self.mainloop(focus, kw.timeout, transient=False)
 
     def mDone(self, button):
         if button == 0:
-            self.startSolving()
+            if self.solver is not None:
+                self.stopSolving()
+            else:
+                self.startSolving()
         elif button == 1:
             self.startPlay()
         elif button == 2:
@@ -136,6 +142,7 @@ class BaseSolverDialog:
         elif button == 3:
             global solver_dialog
             solver_dialog = None
+            self.stopSolving()
             self.destroy()
         return EVENT_HANDLED
 
@@ -160,10 +167,10 @@ class BaseSolverDialog:
 
     def reset(self):
         self.play_button.config(state='disabled')
+        # a move cancels the solver
+        self.stopSolving()
 
     def startSolving(self):
-        from pysollib.mygettext import ungettext
-
         self._reset()
         game = self.app.game
         solver = game.Solver_Class(game, self)  # create solver instance
@@ -175,10 +182,54 @@ class BaseSolverDialog:
         solver.config(preset=preset, max_iters=max_iters, progress=progress,
                       iters_step=iters_step)
         try:
-            solver.computeHints()
+            solver.startHints()
+        except RuntimeError:
+            self.result_label['text'] = _('Solver not found in the PATH')
+            return
+        self.solver = solver
+        self.start_button.config(text=_('Stop'))
+        self.pollSolving()
+
+    def pollSolving(self):
+        # parse the output of the solver while it runs
+        self.poll_timer = None
+        solver = self.solver
+        if solver is None:
+            return
+        if solver is not self.app.game.solver or solver.isStale():
+            # the game was changed or a move was made
+            self.stopSolving()
+            return
+        try:
+            done = solver.pollHints()
         except RuntimeError:
+            self._stopped()
             self.result_label['text'] = _('Solver not found in the PATH')
             return
+        if not done:
+            self.poll_timer = self.top.after(100, self.pollSolving)
+            return
+        self._stopped()
+        self.showResult(solver)
+
+    def stopSolving(self):
+        solver = self.solver
+        if solver is None:
+            return
+        solver.cancelHints()
+        self._stopped()
+        self.result_label['text'] = _('Solving was cancelled.')
+
+    def _stopped(self):
+        self.solver = None
+        if self.poll_timer is not None:
+            self.top.after_cancel(self.poll_timer)
+            self.poll_timer = None
+        self.start_button.config(text=self.start_text)
+
+    def showResult(self, solver):
+        from pysollib.mygettext import ungettext
+
         hints_len = len(solver.hints)-1
         if hints_len > 0:
             if solver.solver_state == 'intractable':
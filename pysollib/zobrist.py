@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- mode: python; coding: utf-8; -*-
+# ---------------------------------------------------------------------------##
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ---------------------------------------------------------------------------##
+
+# ************************************************************************
+# * Zobrist keys
+# *
+# * The position hash of a game (see Game.getSnapshot) is the sum of
+# * the hashes of all stacks, and the hash of a stack is the xor of
+# * the keys of its cards. A key depends on the snapshot group of the
+# * stack (see Game.createSnGroups), the depth of the card in the stack,
+# * its suit, rank and face_up - but not on the stack itself, so
+# * positions that only differ by a permutation of similar stacks
+# * hash equal. Decks are indistinguishable.
+# *
+# * Keys are derived from a fixed mixing function and do not depend
+# * on the python hash seed, so hashes are stable between runs.
+# *
+# * The exact position hash (see Game.getPositionHash) also takes the
+# * stack ids into account; it is what caches of per-stack data like
+# * hints must be keyed by.
+# ************************************************************************
+
+ZOBRIST_MASK = 0xffffffffffffffff
+
+_keys = {}
+
+
+def _mix64(x):
+    # splitmix64 finalizer
+    x = (x + 0x9e3779b97f4a7c15) & ZOBRIST_MASK
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & ZOBRIST_MASK
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & ZOBRIST_MASK
+    return x ^ (x >> 31)
+
+
+def zobristKey(group, depth, suit, rank, face_up):
+    k = (group, depth, suit, rank, face_up)
+    key = _keys.get(k)
+    if key is None:
+        n = ((((group << 12) | depth) << 8 | (suit & 0xff)) << 12 |
+             (rank & 0xfff)) << 1 | (1 if face_up else 0)
+        key = _keys[k] = _mix64(n)
+    return key
+
+
+def zobristFlipKey(group, depth, suit, rank):
+    # xor this into a stack hash when a card is turned over
+    return (zobristKey(group, depth, suit, rank, 0) ^
+            zobristKey(group, depth, suit, rank, 1))
+
+
+def zobristPositionKey(stack_id, stack_hash):
+    # the part of a stack in the exact position hash
+    if not stack_hash:
+        return 0
+    return _mix64(stack_hash ^ _mix64(stack_id))
+
+
+def zobristStackHash(group, cards):
+    h = 0
+    for i, c in enumerate(cards):
+        h ^= zobristKey(group, i, c.suit, c.rank, c.face_up)
+    return h
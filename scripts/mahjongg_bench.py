@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- mode: python; coding: utf-8; -*-
+
+# Time the dealing of solvable Mahjongg games (the "hard" solvable
+# deals of AbstractMahjonggGame._shuffleHook2) for every layout.
+#
+# usage: scripts/mahjongg_bench.py [number of deals per layout]
+
+import os
+import sys
+import time
+
+pysollib_path = os.path.join(sys.path[0], '..')
+sys.path[0] = os.path.normpath(pysollib_path)
+
+from pysollib.gamedb import GI  # noqa: E402
+from pysollib.headless import HeadlessApp  # noqa: E402
+from pysollib.pysolrandom import construct_random  # noqa: E402
+
+
+def main(args):
+    ndeals = int(args[0]) if args else 3
+    app = HeadlessApp()
+    total = 0.0
+    failed = 0
+    for gameid in app.gdb.getGamesIdSortedById():
+        gi = app.gdb.get(gameid)
+        if gi.si.game_type != GI.GT_MAHJONGG:
+            continue
+        game = app.constructHeadlessGame(gameid)
+        times = []
+        for seed in range(1, ndeals + 1):
+            game.random = construct_random(str(seed))
+            start = time.time()
+            if game._shuffleHook2(game.s.rows, game.cards[:]) is None:
+                failed += 1
+            times.append(time.time() - start)
+        total += sum(times)
+        print('%5d  %-40s %4d tiles  avg %.4fs  max %.4fs' % (
+            gameid, gi.name, len(game.s.rows), sum(times) / len(times),
+            max(times)))
+    print('total %.2fs, %d failed' % (total, failed))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
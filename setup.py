@@ -92,7 +92,8 @@ kw = {
                  'pysollib.game',
                  'pysollib.games',
                  'pysollib.games.special',
-                 'pysollib.games.mahjongg'],
+                 'pysollib.games.mahjongg',
+                 'pysollib.solvers'],
     'data_files': data_files,
     }
 
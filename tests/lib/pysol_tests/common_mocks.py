@@ -6,8 +6,9 @@
 #
 # Distributed under terms of the MIT license.
 
-import pysollib.stack
 from pysollib.acard import AbstractCard
+from pysollib.headless import HeadlessApp, NullCanvas
+from pysollib.pysolrandom import construct_random
 
 """
 
@@ -25,8 +26,9 @@ class MockItem:
         return
 
 
-class MockCanvas:
+class MockCanvas(NullCanvas):
     def __init__(self):
+        NullCanvas.__init__(self)
         self.xmargin = self.ymargin = 50
 
 
@@ -54,9 +56,12 @@ class MockTalon:
         for c in self.cards:
             c.item = MockItem()
 
-
-def _empty_override(*args):
-    return True
+    def rehash(self):
+        pass
 
 
-pysollib.stack.MfxCanvasGroup = _empty_override
+def new_headless_game(gameid, seed='1'):
+    app = HeadlessApp()
+    game = app.constructHeadlessGame(gameid)
+    game.newGame(random=construct_random(seed))
+    return game
@@ -0,0 +1,51 @@
+import unittest
+
+from pysollib.headless import HeadlessApp
+
+from .common_mocks import new_headless_game
+
+
+class DemoTests(unittest.TestCase):
+    def test_turbo_event(self):
+        game = new_headless_game(2)
+        opt = game.app.opt
+        opt.animations = 3
+        game.startDemo(mixed=0, turbo=20)
+        game.demoEvent()
+        moves = game.demo.turbo_moves
+        # a batch of moves in one event
+        # TEST
+        self.assertTrue(1 < moves <= 20)
+        # TEST
+        self.assertEqual(game.stats.demo_moves, moves)
+        # TEST
+        self.assertEqual(game.moves.index, moves)
+        # TEST
+        self.assertEqual(opt.animations, 3)
+        # TEST
+        self.assertEqual(game.demo.sleep, 0)
+        game.stopDemo()
+        game.startDemo(mixed=0)
+        game.demoEvent()
+        # TEST
+        self.assertEqual(game.moves.index, moves + 1)
+
+    def test_run_demo(self):
+        app = HeadlessApp()
+        game = app.constructHeadlessGame(795)
+        result = app.runDemo(game, range(1, 7))
+        # TEST
+        self.assertEqual(result.played, 6)
+        stat = app.stats.games_stats[None][795]
+        # TEST
+        self.assertEqual((stat.num_won, stat.num_lost),
+                         (result.won, result.played - result.won))
+        # TEST
+        self.assertTrue(result.moves > 0 and result.rate > 0)
+        # TEST
+        self.assertEqual(game.demo, None)
+        # the same seed plays the same demo
+        again = app.runDemo(game, range(1, 7))
+        # TEST
+        self.assertEqual((again.won, again.moves),
+                         (result.won, result.moves))
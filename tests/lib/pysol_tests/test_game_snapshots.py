@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from pysollib.game import GameSnapshots
+
+from .common_mocks import new_headless_game
+
+
+class GameSnapshotsTests(unittest.TestCase):
+    def test_membership_and_order(self):
+        s = GameSnapshots([3, 1, 3, 2])
+        # TEST
+        self.assertEqual(len(s), 3)
+        # TEST
+        self.assertTrue(1 in s)
+        # TEST
+        self.assertFalse(4 in s)
+        # TEST
+        self.assertEqual(s.tolist(), [3, 1, 2])
+
+    def test_bounded(self):
+        s = GameSnapshots(maxlen=3)
+        for sn in range(10):
+            s.append(sn)
+        # TEST
+        self.assertEqual(s.tolist(), [7, 8, 9])
+        s.compact(1)
+        # TEST
+        self.assertEqual(s.tolist(), [9])
+        s.clear()
+        # TEST
+        self.assertEqual(len(s), 0)
+
+    def test_save_and_load(self):
+        game = new_headless_game(2)
+        for i in range(3):
+            game.dealCards()
+            game.finishMove()
+        snapshots = game.snapshots.tolist()
+        # TEST
+        self.assertEqual(len(snapshots), 4)
+        fd, filename = tempfile.mkstemp(suffix='.pso')
+        os.close(fd)
+        try:
+            game._saveGame(filename)
+            loaded = game._loadGame(filename, game.app)
+        finally:
+            os.remove(filename)
+        # TEST
+        self.assertTrue(isinstance(loaded.snapshots, GameSnapshots))
+        # TEST
+        self.assertEqual(loaded.snapshots.tolist(), snapshots)
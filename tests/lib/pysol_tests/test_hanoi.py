@@ -0,0 +1,42 @@
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class HanoiTests(unittest.TestCase):
+    def _play_hints(self, game):
+        n = 0
+        while True:
+            hints = game.getHints(0)
+            if not hints:
+                return n
+            # TEST
+            self.assertTrue(game.getStuck())
+            hint = hints[0]
+            # TEST
+            self.assertTrue(hint[4].acceptsCards(hint[3], hint[3].cards[-1:]))
+            hint[3].playMoveMove(1, hint[4])
+            n += 1
+
+    def test_solution_hints(self):
+        for gameid, seed in ((124, '1'), (124, '2'), (207, '1'),
+                             (781, '1'), (769, '3')):
+            game = new_headless_game(gameid, seed)
+            moves = game.getSolution()
+            # TEST
+            self.assertEqual(self._play_hints(game), len(moves))
+            # TEST
+            self.assertTrue(game.isGameWon())
+
+    def test_puzzle(self):
+        game = new_headless_game(207)
+        # TEST
+        self.assertEqual(len(game.getSolution()), 15)
+        # the lowest card goes to the middle row first
+        game.s.rows[0].playMoveMove(1, game.s.rows[2])
+        # TEST
+        self.assertEqual(len(game.getSolution()), 15)
+        game.undo()
+        game.s.rows[0].playMoveMove(1, game.s.rows[1])
+        # TEST
+        self.assertEqual(len(game.getSolution()), 14)
@@ -0,0 +1,43 @@
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class HeadlessTests(unittest.TestCase):
+    def test_klondike_deal(self):
+        game = new_headless_game(2)
+        # TEST
+        self.assertEqual(len(game.s.rows), 7)
+        # TEST
+        self.assertEqual([len(r.cards) for r in game.s.rows],
+                         [1, 2, 3, 4, 5, 6, 7])
+        # TEST
+        self.assertEqual(len(game.s.talon.cards), 23)
+        # TEST
+        self.assertEqual(len(game.s.waste.cards), 1)
+        # TEST
+        self.assertFalse(game.isGameWon())
+
+    def test_freecell_hints_and_undo(self):
+        game = new_headless_game(8, '24')
+        hints = game.getHints(0)
+        # TEST
+        self.assertTrue(hints)
+        score, pos, ncards, from_stack, to_stack, color, forced = hints[0]
+        before = [len(s.cards) for s in game.allstacks]
+        game.startMoves()
+        from_stack.playMoveMove(ncards, to_stack)
+        game.finishMove()
+        # TEST
+        self.assertNotEqual([len(s.cards) for s in game.allstacks], before)
+        game.undo()
+        # TEST
+        self.assertEqual([len(s.cards) for s in game.allstacks], before)
+
+    def test_same_seed_same_deal(self):
+        g1 = new_headless_game(2, '12345')
+        g2 = new_headless_game(2, '12345')
+        # TEST
+        self.assertEqual(
+            [[c.id for c in s.cards] for s in g1.allstacks],
+            [[c.id for c in s.cards] for s in g2.allstacks])
@@ -1,9 +1,32 @@
 # Written by Shlomi Fish, under the MIT Expat License.
 
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
 import unittest
 
 from pysollib.acard import AbstractCard
-from pysollib.hint import Base_Solver_Hint
+from pysollib.hint import Base_Solver_Hint, BlackHoleSolver_Hint, \
+    CardsView, FreeCellSolver_Hint, HintCache, LookaheadHint, SolverJob, \
+    SolverPool, getSolverVersion
+from pysollib.mfxutil import Struct
+
+from .common_mocks import new_headless_game
+
+
+class MockSolverDialog:
+    def __init__(self):
+        self.texts = []
+
+    def setText(self, **kw):
+        self.texts.append(kw)
+
+
+def python_command(code):
+    return '"%s" -c "%s"' % (sys.executable, code)
 
 
 class HintTests(unittest.TestCase):
@@ -20,3 +43,249 @@ class HintTests(unittest.TestCase):
         # TEST
         self.assertEqual(got, '8D', 'card2str2 works')
         # diag('got == ' + got)
+
+    def test_cache_lru(self):
+        cache = HintCache(maxsize=2)
+        cache.put('a', [1])
+        cache.put('b', [2])
+        # TEST
+        self.assertEqual(cache.get('a'), [1])
+        cache.put('c', [3])
+        # TEST
+        self.assertIsNone(cache.get('b'))
+        # TEST
+        self.assertEqual(cache.get('c'), [3])
+        # TEST
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        # TEST
+        self.assertEqual(len(cache), 2)
+
+    def test_cache_undo(self):
+        game = new_headless_game(2)
+        hints = game.getHints(0)
+        score, pos, ncards, from_stack, to_stack, color, forced = hints[0]
+        from_stack.playMoveMove(ncards, to_stack)
+        hits = game.hints.cache.hits
+        game.undo()
+        # TEST
+        self.assertEqual(game.getHints(0), hints)
+        # TEST
+        self.assertEqual(game.hints.cache.hits, hits + 1)
+
+    def test_cards_view(self):
+        base = [1, 2, 3, 4]
+        v = CardsView(base, 2, (9,))
+        # TEST
+        self.assertEqual(len(v), 3)
+        # TEST
+        self.assertEqual(v[-1], 9)
+        # TEST
+        self.assertEqual(v[:], [1, 2, 9])
+        # TEST
+        self.assertEqual(list(v), [1, 2, 9])
+        v.append(5)
+        del v[0]
+        # TEST
+        self.assertEqual(v[:], [2, 9, 5])
+        # TEST
+        self.assertEqual(base, [1, 2, 3, 4])
+        shared = CardsView(base)
+        # TEST
+        self.assertEqual(shared.pop(), 4)
+        # TEST
+        self.assertEqual(base, [1, 2, 3, 4])
+
+    def test_cloned_stack(self):
+        game = new_headless_game(2)
+        hint = game.getHintClass()(game, 0)
+        r = game.s.rows[6]
+        rr = hint.ClonedStack(r, ncards=len(r.cards) - 1)
+        # TEST
+        self.assertEqual(rr.cards[:], r.cards[:-1])
+        # TEST
+        self.assertIs(rr.getCard(), r.cards[-2])
+        hint.reset()
+
+    def test_lookahead(self):
+        game = new_headless_game(2)
+        h = game.getPositionHash()
+        base = game.getHints(2)
+        hints = LookaheadHint(game, 2, depth=3, width=3,
+                              nodes=500, timeout=60).getHints()
+        # TEST
+        self.assertEqual(game.getPositionHash(), h)
+        # TEST
+        self.assertEqual(len(game.moves.current), 0)
+        # TEST
+        self.assertEqual(sorted(x[1:] for x in hints),
+                         sorted(x[1:] for x in base))
+        game.app.opt.hint_lookahead_depth = 2
+        try:
+            for i in range(10):
+                hints = game.getHints(2)
+                score, pos, ncards, from_stack, to_stack, color, forced = \
+                    hints[0]
+                if ncards == 0:
+                    game.dealCards()
+                elif from_stack is to_stack:
+                    from_stack.playFlipMove()
+                else:
+                    # TEST
+                    self.assertTrue(to_stack.acceptsCards(
+                        from_stack, from_stack.cards[-ncards:]))
+                    from_stack.playMoveMove(ncards, to_stack)
+        finally:
+            game.app.opt.hint_lookahead_depth = 0
+        # TEST
+        self.assertTrue(len(game.hints.transpositions) > 0)
+
+    def test_solver_job(self):
+        job = SolverJob(python_command(
+            'import sys; sys.stdout.write(sys.stdin.read().upper())'),
+            'a\nb\n')
+        lines = []
+        while not lines or lines[-1] is not None:
+            lines += job.readLines(timeout=None)
+        # TEST
+        self.assertEqual(lines, [b'A\n', b'B\n', None])
+        # TEST
+        self.assertEqual(job.returncode, 0)
+        job = SolverJob(python_command('import time; time.sleep(60)'), '')
+        job.cancel()
+        job.thread.join(30)
+        # TEST
+        self.assertFalse(job.thread.is_alive())
+
+    def _black_hole_solver(self, game, output):
+        solver = BlackHoleSolver_Hint(
+            game, MockSolverDialog(), preset='black_hole', base_rank=0)
+        solver.BLACK_HOLE_SOLVER_COMMAND = python_command(
+            'import sys; sys.stdin.read(); sys.stdout.write(%r)' % output)
+        return solver
+
+    def test_solver_poll(self):
+        game = new_headless_game(98)
+        solver = self._black_hole_solver(
+            game, 'Solved!\\nMove a card from stack 3 to the foundations\\n')
+        solver.startHints()
+        while not solver.pollHints(timeout=1):
+            pass
+        # TEST
+        self.assertEqual(solver.solver_state, 'solved')
+        # TEST
+        self.assertEqual(solver.hints, [[1, game.s.rows[3], None], None])
+        solver.startHints()
+        score, pos, ncards, from_stack, to_stack, color, forced = \
+            game.getHints(0)[0]
+        from_stack.playMoveMove(ncards, to_stack)
+        while not solver.pollHints(timeout=1):
+            pass
+        # TEST
+        self.assertEqual(solver.solver_state, 'stale')
+        # TEST
+        self.assertEqual(solver.hints, [None])
+
+    def test_solver_pool(self):
+        pool = SolverPool(lambda: [], size=1)
+        jobs = [pool.submit(lambda lib, i=i: lib.append(i) or len(lib))
+                for i in range(3)]
+        for job in jobs:
+            # TEST
+            self.assertEqual(job.readLines(timeout=None), [None])
+        # TEST
+        self.assertEqual([job.result for job in jobs], [1, 2, 3])
+
+    @unittest.skipIf(os.name == 'nt', 'needs a shell script')
+    def test_solver_version_cache(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            binary = os.path.join(tmpdir, 'fc-solve')
+            with open(binary, 'w') as fh:
+                fh.write('#!/bin/sh\necho "fc-solve version 4.20.1"\n')
+            os.chmod(binary, stat.S_IRWXU)
+            cache_file = os.path.join(tmpdir, 'versions.json')
+            # TEST
+            self.assertEqual(getSolverVersion([binary], cache_file),
+                             (4, 20, 1))
+            with open(cache_file) as fh:
+                versions = json.load(fh)
+            # TEST
+            self.assertEqual(list(versions.values()), [[4, 20, 1]])
+            for key in versions:
+                versions[key] = [9, 9, 9]
+            with open(cache_file, 'w') as fh:
+                json.dump(versions, fh)
+            # TEST
+            self.assertEqual(getSolverVersion([binary], cache_file),
+                             (9, 9, 9))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_solver_result_cache(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            game = new_headless_game(98)
+            game.app.fn = Struct(
+                solver_results=os.path.join(tmpdir, 'results.json'))
+            solver = self._black_hole_solver(
+                game,
+                'Solved!\\nMove a card from stack 3 to the foundations\\n')
+            solver.computeHints()
+            # the result is read from the cache, the solver doesn't run
+            solver = self._black_hole_solver(game, '')
+            solver.BLACK_HOLE_SOLVER_COMMAND = 'no-such-solver'
+            solver._useBuiltinSolver = lambda: False
+            solver.computeHints()
+            # TEST
+            self.assertEqual(solver.solver_state, 'solved')
+            # TEST
+            self.assertEqual(solver.hints,
+                             [[1, game.s.rows[3], None], None])
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_builtin_freecell_solver(self):
+        game = new_headless_game(8)
+        solver = FreeCellSolver_Hint(game, MockSolverDialog())
+        # as if neither fc-solve nor its library was installed
+        solver._useBuiltinSolver = lambda: True
+        solver.config(max_iters=20000)
+        solver.computeHints()
+        # TEST
+        self.assertEqual(solver.solver_state, 'solved')
+        # TEST
+        self.assertTrue(solver.dialog.texts)
+        while True:
+            hints = solver.getHints()
+            if hints is None:
+                break
+            score, pos, ncards, from_stack, to_stack, color, forced = \
+                hints[0]
+            cards = from_stack.cards[-ncards:]
+            # TEST
+            self.assertTrue(to_stack.acceptsCards(from_stack, cards))
+            from_stack.playMoveMove(ncards, to_stack)
+        # TEST
+        self.assertTrue(game.isGameWon())
+
+    def test_builtin_black_hole_solver(self):
+        game = new_headless_game(98, '2')
+        solver = BlackHoleSolver_Hint(
+            game, MockSolverDialog(), preset='black_hole')
+        # as if neither black-hole-solve nor its library was installed
+        solver._useBuiltinSolver = lambda: True
+        solver.computeHints()
+        # TEST
+        self.assertEqual(solver.solver_state, 'solved')
+        while True:
+            hints = solver.getHints()
+            if hints is None:
+                break
+            score, pos, ncards, from_stack, to_stack, color, forced = \
+                hints[0]
+            cards = from_stack.cards[-ncards:]
+            # TEST
+            self.assertTrue(to_stack.acceptsCards(from_stack, cards))
+            from_stack.playMoveMove(ncards, to_stack)
+        # TEST
+        self.assertTrue(game.isGameWon())
@@ -0,0 +1,51 @@
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class LightsOutTests(unittest.TestCase):
+    def _lights(self, game):
+        return [r for r in game.s.rows if r.cards[0].face_up]
+
+    def test_solution_hints(self):
+        for gameid, seed in ((22400, '1'), (22401, '2'), (22405, '3')):
+            game = new_headless_game(gameid, seed)
+            # TEST
+            self.assertTrue(self._lights(game))
+            clicks = game.getSolution()
+            hints = game.getHints(0)
+            # TEST
+            self.assertEqual(len(hints), bin(clicks).count('1'))
+            n = 0
+            while hints:
+                hints[0][3].playFlipMove()
+                n += 1
+                hints = game.getHints(0)
+                # TEST
+                self.assertTrue(len(hints) < len(game.s.rows))
+            # TEST
+            self.assertEqual(n, bin(clicks).count('1'))
+            # TEST
+            self.assertEqual(self._lights(game), [])
+
+    def test_flip_hints(self):
+        # the demo plays the flip hints of level 2 by flipMove()
+        game = new_headless_game(22402, '4')
+        while self._lights(game):
+            hints = game.getHints(2)
+            # TEST
+            self.assertTrue(hints)
+            # TEST
+            self.assertTrue(hints[0][3] is hints[0][4])
+            last = hints[0][3]
+            last.flipMove()
+            game.finishMove()
+        # TEST
+        self.assertFalse(game.getHints(2))
+        # one undo takes back a click
+        game.undo()
+        lights = 0
+        for r in self._lights(game):
+            lights |= 1 << r.id
+        # TEST
+        self.assertEqual(lights, game.lights_solver.toggles[last.id])
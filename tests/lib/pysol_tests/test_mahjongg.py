@@ -0,0 +1,91 @@
+import random
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class MahjonggTests(unittest.TestCase):
+    def _is_blocked(self, stack):
+        bm = stack.blockmap
+        if [s for s in bm.above if s.cards]:
+            return True
+        return bool([s for s in bm.left if s.cards] and
+                    [s for s in bm.right if s.cards])
+
+    def _check_blocked(self, game):
+        for r in game.s.rows:
+            # TEST
+            self.assertEqual(bool(r.basicIsBlocked()), self._is_blocked(r))
+
+    def _scan_pairs(self, game):
+        # the free matching pairs by a scan of all stacks
+        stacks = [r for r in game.s.rows
+                  if r.cards and not self._is_blocked(r)]
+        pairs = []
+        for i, r in enumerate(stacks):
+            for t in stacks[i+1:]:
+                if game.cardsMatch(r.cards[0], t.cards[0]):
+                    pairs.append((r, t))
+        return pairs
+
+    def test_free_matching_pairs(self):
+        game = new_headless_game(5001)
+        rnd = random.Random(1)
+        while True:
+            pairs = game.getFreeMatchingPairs()
+            # TEST
+            self.assertEqual(pairs, self._scan_pairs(game))
+            if not pairs:
+                break
+            r, t = rnd.choice(pairs)
+            r.playMoveMove(1, t)
+        self._check_blocked(game)
+        while game.moves.index > 0:
+            game.undo()
+        self._check_blocked(game)
+        # TEST
+        self.assertEqual(game.getFreeMatchingPairs(),
+                         self._scan_pairs(game))
+        # TEST
+        self.assertEqual(len(game.getHints(0)),
+                         len(self._scan_pairs(game)))
+
+    def test_match_class(self):
+        game = new_headless_game(5001)
+        cards = [c for c in game.cards if c.suit == 3]
+        flowers = [c for c in cards if c.rank >= 8]
+        seasons = [c for c in cards if 4 <= c.rank < 8]
+        # TEST
+        self.assertEqual(len(set(game.getMatchClass(c) for c in flowers)),
+                         1)
+        # TEST
+        self.assertEqual(len(set(game.getMatchClass(c) for c in seasons)),
+                         1)
+        for c1 in cards:
+            for c2 in cards:
+                # TEST
+                self.assertEqual(
+                    game.getMatchClass(c1) == game.getMatchClass(c2),
+                    bool(game.cardsMatch(c1, c2)))
+
+    def test_create_solvable(self):
+        game = new_headless_game(5001)
+        rows = game.s.rows
+        pairs = game._createSolvable(rows, game.cards[:], 10 * len(rows))
+        # TEST
+        self.assertEqual(len(pairs), len(rows) // 2)
+        # remove the pairs in the reverse order
+        present = set(rows)
+        for s1, s2, c1, c2 in reversed(pairs):
+            # TEST
+            self.assertTrue(game.cardsMatch(c1, c2))
+            for s in (s1, s2):
+                bm = s.blockmap
+                # TEST
+                self.assertFalse([t for t in bm.above if t in present])
+                # TEST
+                self.assertFalse([t for t in bm.left if t in present] and
+                                 [t for t in bm.right if t in present])
+            present -= set((s1, s2))
+        # TEST
+        self.assertFalse(present)
@@ -0,0 +1,44 @@
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class MatrixTests(unittest.TestCase):
+    def _play_hints(self, game):
+        n = 0
+        while True:
+            hints = game.getHints(0)
+            if not hints:
+                return n
+            # TEST
+            self.assertEqual(len(hints), 1)
+            # TEST
+            self.assertTrue(game.getStuck())
+            hint = hints[0]
+            # TEST
+            self.assertFalse(hint[4].cards)
+            hint[3].playMoveMove(1, hint[4])
+            n += 1
+
+    def test_solution_hints(self):
+        for gameid, seed in ((22223, '1'), (22224, '2'), (22226, '3'),
+                             (22230, '4')):
+            game = new_headless_game(gameid, seed)
+            moves = game.getSolution()
+            # TEST
+            self.assertTrue(moves)
+            # TEST
+            self.assertEqual(self._play_hints(game), len(moves))
+            # TEST
+            self.assertTrue(game.isGameWon())
+
+    def test_undo(self):
+        game = new_headless_game(22224, '4')
+        moves = game.getSolution()
+        hint = game.getHints(0)[0]
+        hint[3].playMoveMove(1, hint[4])
+        # TEST
+        self.assertEqual(game.getSolution(), moves[1:])
+        game.undo()
+        # TEST
+        self.assertEqual(game.getSolution(), moves)
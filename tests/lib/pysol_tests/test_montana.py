@@ -0,0 +1,138 @@
+import collections
+import random
+import unittest
+
+from pysollib.gamedb import GAME_DB
+from pysollib.games.montana import Montana
+
+from .common_mocks import new_headless_game
+
+
+class MontanaTests(unittest.TestCase):
+    def _scan_moves(self, game):
+        # the moves by a look at each stack for each gap
+        rows = game.s.rows
+        moves = []
+        for t in rows:
+            if t.cards:
+                continue
+            for r in rows:
+                if not r.cards or not t.acceptsCards(r, r.cards):
+                    continue
+                if r.id % game.RSTEP == 0 and \
+                        r.cards[0].rank == game.RBASE:
+                    continue
+                moves.append((r, t))
+        return moves
+
+    def test_gap_moves(self):
+        for gameid in (53, 63, 275, 276, 380, 381, 706, 770, 794):
+            game = new_headless_game(gameid)
+            rnd = random.Random(gameid)
+            for i in range(30):
+                moves = game.getGapMoves()
+                # TEST
+                self.assertEqual(
+                    sorted([(r.id, t.id) for r, t in moves]),
+                    sorted([(r.id, t.id) for r, t in self._scan_moves(game)]))
+                if not moves:
+                    break
+                r, t = rnd.choice(moves)
+                r.playMoveMove(1, t)
+
+    def _can_win(self, game):
+        # a breadth first search over the moves of a Pretzel deal,
+        # (rank, suit) in the rows
+        rstep = game.RSTEP
+        start = tuple((r.cards[0].rank, r.cards[0].suit) if r.cards
+                      else None for r in game.s.rows)
+        seen = set([start])
+        todo = collections.deque([start])
+        while todo:
+            grid = todo.popleft()
+            if all(grid[i*rstep+j] == (j+1, grid[i*rstep][1])
+                   for i in range(4) for j in range(rstep-1)
+                   if grid[i*rstep]):
+                return True
+            for t, gap in enumerate(grid):
+                if gap is not None:
+                    continue
+                for f, c in enumerate(grid):
+                    if c is None:
+                        continue
+                    if t % rstep == 0:
+                        if c[0] != 1 or f % rstep == 0:
+                            continue
+                    elif grid[t-1] is None or \
+                            grid[t-1] != (c[0]-1, c[1]):
+                        continue
+                    new = list(grid)
+                    new[t], new[f] = c, None
+                    new = tuple(new)
+                    if new not in seen:
+                        seen.add(new)
+                        todo.append(new)
+        return False
+
+    def test_pretzel(self):
+        for seed in range(1, 13):
+            game = new_headless_game(795, str(seed))
+            state, moves = game.getSolution()
+            # TEST
+            self.assertEqual(state == 'solved', self._can_win(game))
+            # TEST
+            self.assertEqual(game.getStuck(), state == 'solved')
+            if state != 'solved':
+                # TEST
+                self.assertFalse(game.getHints(0))
+                continue
+            for r, t in moves:
+                hints = game.getHints(0)
+                # TEST
+                self.assertEqual((hints[0][3], hints[0][4]), (r, t))
+                r.playMoveMove(1, t)
+            # TEST
+            self.assertTrue(game.isGameWon())
+
+    def test_redeal(self):
+        game = new_headless_game(53)
+        solver = game.montana_solver
+        sequenced = solver.getSequenced(game._getGrid())
+        state, moves = game.getSolution()
+        # TEST
+        self.assertNotEqual(state, 'unsolved')
+        for r, t in moves:
+            r.playMoveMove(1, t)
+        # TEST
+        self.assertTrue(solver.getSequenced(game._getGrid()) > sequenced)
+        if state == 'solved':
+            # no more this round, but there is a redeal
+            # TEST
+            self.assertEqual(game.getSolution(), ('unsolved', []))
+            # TEST
+            self.assertTrue(game.getStuck())
+            hints = game.getHints(2)
+            # TEST
+            self.assertEqual([h[2] for h in hints], [0])
+
+    def test_all_games(self):
+        # every game on the Montana layout, with a solver or without
+        # one (Magic Montana, Trumps Row)
+        ids = [i for i in GAME_DB.getGamesIdSortedById()
+               if issubclass(GAME_DB.get(i).gameclass, Montana)]
+        # TEST
+        self.assertTrue(16682 in ids and 13169 in ids)
+        for gameid in ids:
+            game = new_headless_game(gameid)
+            # TEST
+            self.assertEqual(game.montana_solver is None,
+                             gameid in (13169, 16682))
+            for i in range(20):
+                game.getStuck()
+                hints = game.getHints(0)
+                if not hints:
+                    break
+                hint = hints[0]
+                # TEST
+                self.assertTrue(hint[4].acceptsCards(hint[3], hint[3].cards))
+                hint[3].playMoveMove(1, hint[4])
@@ -0,0 +1,92 @@
+import unittest
+
+from pysollib.pysolrandom import construct_random
+
+from .common_mocks import new_headless_game
+
+
+class PairingTests(unittest.TestCase):
+    def _play_solution(self, game):
+        moves = game.getSolution()
+        if moves is None:
+            return False
+        for from_stack, to_stack in moves:
+            if from_stack is game.s.talon:
+                # TEST
+                self.assertTrue(game.dealCards(sound=False))
+            else:
+                # TEST
+                self.assertTrue(to_stack.acceptsCards(from_stack,
+                                                      from_stack.cards))
+                from_stack.playMoveMove(1, to_stack)
+        # TEST
+        self.assertTrue(game.isGameWon())
+        return True
+
+    def _play_games(self, gameids, seeds):
+        for gameid in gameids:
+            solved = 0
+            for seed in seeds:
+                game = new_headless_game(gameid, seed)
+                if self._play_solution(game):
+                    solved += 1
+            # TEST
+            self.assertTrue(solved, gameid)
+
+    def test_line_games(self):
+        self._play_games((656, 772, 773, 816, 883, 918), '123')
+
+    def test_grid_games(self):
+        self._play_games((89, 90, 92, 810, 216), '123')
+
+    def test_talon(self):
+        game = new_headless_game(918)
+        game.app.opt.accordion_deal_all = False
+        for seed in '1234':
+            game.newGame(random=construct_random(seed))
+            # TEST
+            self.assertTrue(game.s.talon.cards)
+            if self._play_solution(game):
+                break
+        else:
+            self.fail('no solution')
+
+    def test_hints(self):
+        game = new_headless_game(772, '2')
+        moves = game.getSolution()
+        # TEST
+        self.assertTrue(moves)
+        n = 0
+        while not game.isGameWon():
+            hints = game.getHints(0)
+            hint = hints[0]
+            # TEST
+            self.assertEqual((hint[3], hint[4]), game.getSolution()[0])
+            hint[3].playMoveMove(1, hint[4])
+            n += 1
+        # TEST
+        self.assertEqual(n, len(moves))
+
+    def test_run_hints(self):
+        # the hints of the games that take out runs of cards never start
+        # or end at an empty row, playing them to the end
+        for gameid in (816, 918):
+            game = new_headless_game(gameid, '3')
+            while True:
+                hints = [h for h in game.Stuck_Class.getHints(None) if h[2]]
+                if not hints:
+                    break
+                for h in hints:
+                    # TEST
+                    self.assertTrue(h[3].cards and h[4].cards or
+                                    h[4] in game.s.foundations)
+                hints[-1][3].playMoveMove(1, hints[-1][4])
+
+    def test_stuck(self):
+        for gameid in (89, 811, 816):
+            game = new_headless_game(gameid, '1')
+            # TEST
+            self.assertTrue(game.getStuck())
+            # no search for the stuck check
+            # TEST
+            self.assertEqual(game.pairing_solver, None)
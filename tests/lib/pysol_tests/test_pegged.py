@@ -0,0 +1,62 @@
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class PeggedTests(unittest.TestCase):
+    def _pegs(self, game):
+        return [r for r in game.s.rows if r.cards]
+
+    def test_solution_hints(self):
+        game = new_headless_game(210)
+        while True:
+            # TEST
+            self.assertTrue(game.getStuck())
+            solution = game.getSolution()
+            # TEST
+            self.assertEqual(len(solution), len(self._pegs(game)) - 1)
+            hints = game.getHints(0)
+            if not hints:
+                break
+            r, t = hints[0][3], hints[0][4]
+            # TEST
+            self.assertEqual((r, t), solution[0])
+            r.playMoveMove(1, t)
+            if len(self._pegs(game)) == 1:
+                break
+        # TEST
+        self.assertTrue(game.isGameWon())
+
+    def test_stuck(self):
+        game = new_headless_game(210)
+        # a jump to a position with jumps left but no solution
+        dead = 0
+        while game.getHints(0):
+            hints = game.getHints(0)
+            r, t = hints[-1][3], hints[-1][4]
+            r.playMoveMove(1, t)
+            solvable = game._solvePegs(None)[0] == 'solved'
+            # TEST
+            self.assertEqual(game.getStuck(),
+                             bool(game.getHints(0)) and solvable)
+            if game.getHints(0) and not solvable:
+                dead += 1
+        # TEST
+        self.assertTrue(dead)
+
+    def test_stuck_budget(self):
+        game = new_headless_game(184)
+        # no search with many pegs left
+        # TEST
+        self.assertTrue(game.getStuck())
+        # TEST
+        self.assertEqual(game.pegs_results, {})
+        game.STUCK_PEGS = 100
+        # TEST
+        self.assertTrue(game.getStuck())
+        # TEST
+        self.assertTrue(game.pegs_solver.iters <= game.STUCK_ITERS)
+        # an unfinished search of the stuck check is not kept for
+        # the hints
+        # TEST
+        self.assertEqual(game.pegs_results, {})
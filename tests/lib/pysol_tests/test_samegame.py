@@ -0,0 +1,58 @@
+import random
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class SamegameTests(unittest.TestCase):
+    def _flood_fill(self, game, stack):
+        # the group of stack by a flood fill
+        group = set([stack])
+        todo = [stack]
+        while todo:
+            s = todo.pop()
+            for t in s.getAdjacent(s.id):
+                if t not in group and t.cards and \
+                        t.cards[0].suit == stack.cards[0].suit:
+                    group.add(t)
+                    todo.append(t)
+        return group
+
+    def _check_groups(self, game):
+        moves = False
+        for r in game.s.rows:
+            if not r.cards:
+                continue
+            group = self._flood_fill(game, r)
+            moves = moves or len(group) > 1
+            # TEST
+            self.assertEqual(game.getGroupSize(r), len(group))
+            # TEST
+            self.assertEqual(set(r.getRemoveStacks()), group)
+            # TEST
+            self.assertEqual(r.getRemoveStacks()[0], r)
+        # TEST
+        self.assertEqual(game.getStuck(), moves)
+        # the same labels as found from the first column
+        labels = game.getGroupLabels()[:]
+        game.changed_col = 0
+        # TEST
+        self.assertEqual(game.getGroupLabels(), labels)
+
+    def test_groups(self):
+        game = new_headless_game(19009)
+        rnd = random.Random(1)
+        while True:
+            self._check_groups(game)
+            hints = game.getHints(0)
+            if not hints:
+                break
+            # TEST
+            self.assertTrue(game.getStuck())
+            hint = rnd.choice(hints)
+            hint[3].playMoveMove(1, hint[4])
+        # TEST
+        self.assertFalse(game.getStuck())
+        while game.moves.index > 0:
+            game.undo()
+        self._check_groups(game)
@@ -0,0 +1,156 @@
+import collections
+import random
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class ShisenShoTests(unittest.TestCase):
+    def _free(self, game, x, y):
+        cols, rows = game.L
+        if x in (0, cols+1) or y in (0, rows+1):
+            return True
+        return not game.cols[x-1][y-1].cards
+
+    def _min_segments(self, game, r, t):
+        # the number of segments of a shortest path, by a 0-1 BFS over
+        # the cells and directions
+        cols, rows = game.L
+        start = (r.coln+1, r.rown+1)
+        end = (t.coln+1, t.rown+1)
+        dirs = ((0, 1), (0, -1), (1, 0), (-1, 0))
+        best = {}
+        queue = collections.deque()
+        for d in dirs:
+            queue.append((1, start, d, 0))
+        while queue:
+            n, (x, y), d, steps = queue.popleft()
+            if n > 3:
+                continue
+            x, y = x+d[0], y+d[1]
+            if (x, y) == end:
+                if steps or r.allowAdjacent:
+                    return n
+                continue
+            if not (0 <= x <= cols+1 and 0 <= y <= rows+1) or \
+                    not self._free(game, x, y):
+                continue
+            if best.get((x, y, d), 4) <= n:
+                continue
+            best[(x, y, d)] = n
+            for nd in dirs:
+                if nd == d:
+                    queue.appendleft((n, (x, y), nd, steps+1))
+                else:
+                    queue.append((n+1, (x, y), nd, steps+1))
+        return None
+
+    def _check_path(self, game, r, t, path):
+        # TEST
+        self.assertEqual(path[0], (r.coln+1, r.rown+1))
+        # TEST
+        self.assertEqual(path[-1], (t.coln+1, t.rown+1))
+        # TEST
+        self.assertEqual(len(path)-1, self._min_segments(game, r, t))
+        cells = []
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            # TEST
+            self.assertTrue(x1 == x2 or y1 == y2)
+            dx, dy = (x2 > x1) - (x2 < x1), (y2 > y1) - (y2 < y1)
+            while (x1, y1) != (x2, y2):
+                x1, y1 = x1+dx, y1+dy
+                cells.append((x1, y1))
+        for x, y in cells[:-1]:
+            # TEST
+            self.assertTrue(self._free(game, x, y))
+
+    def _play(self, gameid, seed):
+        game = new_headless_game(gameid, seed)
+        rnd = random.Random(seed)
+        while True:
+            stacks = [r for r in game.s.rows if r.cards]
+            pairs = []
+            for i, r in enumerate(stacks):
+                for t in stacks[i+1:]:
+                    if not game.cardsMatch(r.cards[0], t.cards[0]):
+                        continue
+                    path = game.findPath(r, t)
+                    if path:
+                        self._check_path(game, r, t, path)
+                        pairs.append((r, t))
+                    else:
+                        # TEST
+                        self.assertEqual(self._min_segments(game, r, t),
+                                         None)
+            if not pairs:
+                return game
+            r, t = rnd.choice(pairs)
+            r.playMoveMove(1, t)
+
+    def test_find_path(self):
+        game = self._play(11001, '1')
+        # TEST
+        self.assertEqual(game.grid.count(1),
+                         len([r for r in game.s.rows if r.cards]))
+        self._play(11004, '2')
+
+    def test_find_path_four_rivers(self):
+        self._play(11014, '1')
+
+    def test_connectable_pairs(self):
+        game = new_headless_game(11001)
+        classes = {}
+        for r in game.s.rows:
+            classes.setdefault(game.getMatchClass(r.cards[0]), []).append(r)
+        for stacks in classes.values():
+            pairs = []
+            for i, r in enumerate(stacks):
+                for t in stacks[i+1:]:
+                    path = game.findPath(r, t)
+                    if path:
+                        pairs.append((r, t, path))
+            # TEST
+            self.assertEqual(game.getConnectablePairs(stacks), pairs)
+
+    def _scan_pairs(self, game):
+        # the matching pairs by a search for every pair of tiles
+        stacks = [r for r in game.s.rows if r.cards]
+        pairs = []
+        for i, r in enumerate(stacks):
+            for t in stacks[i+1:]:
+                if not game.cardsMatch(r.cards[0], t.cards[0]):
+                    continue
+                if game.gameinfo.id in (11011, 11012, 11013):
+                    if r.coln == t.coln or r.rown == t.rown:
+                        pairs.append((r, t))
+                elif self._min_segments(game, r, t) is not None:
+                    pairs.append((r, t))
+        return pairs
+
+    def _check_pairs(self, game):
+        # TEST
+        self.assertEqual(game.getStuck(), bool(self._scan_pairs(game)))
+        pairs = game.getMatchingPairs()
+        # TEST
+        self.assertEqual([(r, t) for r, t, path in pairs],
+                         self._scan_pairs(game))
+        # TEST
+        self.assertEqual(len(game.getHints(0)), len(pairs))
+        for r, t, path in pairs:
+            # TEST
+            self.assertEqual(t.acceptsCards(r, r.cards), path[::-1])
+        return pairs
+
+    def test_matching_pairs(self):
+        for gameid in (11001, 11011, 11015):
+            game = new_headless_game(gameid, '3')
+            rnd = random.Random(3)
+            while True:
+                pairs = self._check_pairs(game)
+                if not pairs:
+                    break
+                r, t, path = rnd.choice(pairs)
+                r.playMoveMove(1, t)
+            while game.moves.index > 0:
+                game.undo()
+            self._check_pairs(game)
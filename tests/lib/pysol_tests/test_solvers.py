@@ -0,0 +1,530 @@
+import random
+import unittest
+
+from pysollib.solvers.freecell import FreeCellSolver, cardValue
+from pysollib.solvers.golf import GolfSolver
+from pysollib.solvers.hands import SquareAdvisor, cribbageScore, \
+        packCard, pokerEstimate, pokerScore
+from pysollib.solvers.hanoi import HanoiSolver
+from pysollib.solvers.montana import MontanaSolver
+from pysollib.solvers.pairing import PairingSolver
+from pysollib.solvers.pegged import PeggedSolver
+from pysollib.solvers.slidingpuzzle import PatternDatabase, \
+        SlidingPuzzleSolver
+
+
+class FreeCellSolverTests(unittest.TestCase):
+    def _deal(self):
+        # the two of spades covers the ace of clubs
+        founds = [(0, 0), (1, 0)]
+        cols = [[cardValue(1, 0), cardValue(0, 0), cardValue(1, 1)], []]
+        return founds, cols
+
+    def test_freecell(self):
+        founds, cols = self._deal()
+        solver = FreeCellSolver()
+        state, moves = solver.solve(founds, [None], cols)
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(moves[0][1], ('col', 0))
+        # TEST
+        self.assertEqual(moves[-1][2], None)
+
+    def test_empty_stacks_filled_by(self):
+        founds, cols = self._deal()
+        state, moves = FreeCellSolver(esf='all').solve(founds, [], cols)
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(moves[0], (1, ('col', 0), ('col', 1)))
+        state, moves = FreeCellSolver(preset='fan').solve(founds, [], cols)
+        # TEST
+        self.assertEqual(state, 'unsolved')
+        # TEST
+        self.assertEqual(moves, [])
+
+    def test_intractable(self):
+        founds, cols = self._deal()
+        solver = FreeCellSolver(max_iters=1)
+        # TEST
+        self.assertEqual(solver.solve(founds, [None], cols),
+                         ('intractable', []))
+        # TEST
+        self.assertEqual(solver.iters, 1)
+
+    def test_presets(self):
+        # TEST
+        self.assertTrue(FreeCellSolver.isSupported(None))
+        # TEST
+        self.assertTrue(FreeCellSolver.isSupported('bakers_dozen'))
+        # TEST
+        self.assertFalse(FreeCellSolver.isSupported('simple_simon'))
+        solver = FreeCellSolver(preset='cruel', esf='kings')
+        # TEST
+        self.assertEqual((solver.sbb, solver.sm, solver.esf),
+                         ('suit', 'limited', 'kings'))
+
+
+class GolfSolverTests(unittest.TestCase):
+    def test_black_hole(self):
+        solver = GolfSolver('black_hole')
+        # TEST
+        self.assertEqual(solver.solve([0], [[2, 1], [3]]),
+                         ('solved', [(0, 0), (0, 0), (1, 0)]))
+        # a king goes on an ace
+        # TEST
+        self.assertEqual(solver.solve([0], [[12]]), ('solved', [(0, 0)]))
+        # TEST
+        self.assertEqual(solver.solve([0], [[5, 1], [2]]),
+                         ('unsolved', []))
+
+    def test_golf(self):
+        solver = GolfSolver('golf')
+        # nothing on a king
+        # TEST
+        self.assertEqual(solver.solve([12], [[11]]), ('unsolved', []))
+        # TEST
+        self.assertEqual(solver.solve([12], [[11]], [10]),
+                         ('solved', [(-1, 0), (0, 0)]))
+        solver = GolfSolver('golf', queens_on_kings=True)
+        # TEST
+        self.assertEqual(solver.solve([12], [[11]], [10]),
+                         ('solved', [(0, 0)]))
+        # TEST
+        self.assertEqual(solver.solve([12], [[0]]), ('unsolved', []))
+        solver = GolfSolver('golf', wrap_ranks=True)
+        # TEST
+        self.assertEqual(solver.solve([12], [[0]]), ('solved', [(0, 0)]))
+
+    def test_binary_star(self):
+        solver = GolfSolver('binary_star')
+        state, moves = solver.solve([0, 12], [[3, 2, 11], [4, 1]])
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(sorted(moves), [(0, 0), (0, 0), (0, 1), (1, 0),
+                                         (1, 0)])
+
+    def test_intractable(self):
+        solver = GolfSolver('all_in_a_row', max_iters=1)
+        # TEST
+        self.assertEqual(solver.solve([None], [[2, 1], [3]]),
+                         ('intractable', []))
+
+
+class HanoiSolverTests(unittest.TestCase):
+    def _play(self, piles, moves):
+        piles = [list(p) for p in piles]
+        for i, j in moves:
+            # TEST
+            self.assertTrue(not piles[j] or piles[j][-1] > piles[i][-1])
+            piles[j].append(piles[i].pop())
+        return piles
+
+    def test_regular(self):
+        solver = HanoiSolver(2)
+        piles = [[3, 2, 1, 0], [], []]
+        # TEST
+        self.assertEqual(solver.getDistance(piles, 2), 15)
+        state, moves = solver.solve(piles)
+        # TEST
+        self.assertEqual(len(moves), 15)
+        # TEST
+        self.assertEqual(self._play(piles, moves), [[], [], [3, 2, 1, 0]])
+        # the two higher cards are home, and the lowest card is where
+        # it has to go to let the next one move
+        piles = [[1], [0], [3, 2]]
+        # TEST
+        self.assertEqual(solver.getDistance(piles, 2), 2)
+        # TEST
+        self.assertEqual(solver.solve(piles), ('solved', [(0, 2), (1, 2)]))
+
+    def test_any_pile(self):
+        solver = HanoiSolver()
+        state, moves = solver.solve([[1, 0], [2], []])
+        # TEST
+        self.assertEqual(moves, [(0, 2), (0, 1), (2, 1)])
+
+    def test_irregular(self):
+        piles = [[0, 2], [1], []]
+        state, moves = HanoiSolver(in_order=False).solve(piles)
+        # TEST
+        self.assertEqual(moves, [(1, 0)])
+        state, moves = HanoiSolver().solve(piles)
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(len(moves), 3)
+        # TEST
+        self.assertTrue([2, 1, 0] in self._play(piles, moves))
+        # TEST
+        self.assertEqual(HanoiSolver(max_iters=1).solve(piles),
+                         ('intractable', []))
+
+
+class HandsTests(unittest.TestCase):
+    def _pack(self, cards):
+        return [packCard(rank, suit) for rank, suit in cards]
+
+    def test_poker(self):
+        for cards, score in (
+                ([(0, 1), (12, 1), (11, 1), (10, 1), (9, 1)], (0, 100)),
+                ([(4, 1), (5, 1), (6, 1), (7, 1), (8, 1)], (1, 75)),
+                ([(0, 1), (12, 1), (11, 1), (10, 1), (9, 2)], (5, 15)),
+                ([(0, 1), (1, 1), (11, 1), (10, 1), (9, 1)], (4, 20)),
+                ([(3, 0), (3, 1), (3, 2), (5, 0), (5, 1)], (3, 25)),
+                ([(3, 0), (3, 1), (3, 2), (3, 3)], (2, 50)),
+                ([(3, 0), (3, 1), (5, 2), (5, 3)], (7, 5)),
+                ([(3, 0), (3, 1)], (8, 2)),
+                ([(11, 1), (0, 1), (1, 1), (2, 1), (3, 1)], (4, 20)),
+                ([(1, 1), (2, 1), (3, 1), (4, 1)], (-1, 0)),
+                ([], (-1, 0))):
+            # TEST
+            self.assertEqual(pokerScore(self._pack(cards)), score)
+
+    def test_cribbage(self):
+        five = self._pack([(4, 0), (4, 1), (4, 2), (10, 3)])
+        # TEST
+        self.assertEqual(cribbageScore(five), 14)
+        # the best hand: the upcard is the fourth five
+        # TEST
+        self.assertEqual(cribbageScore(five, packCard(4, 3)), 29)
+        # a fifteen, a pair, a double run of four and a flush
+        run = self._pack([(1, 0), (2, 0), (3, 0), (4, 0)])
+        # TEST
+        self.assertEqual(cribbageScore(run, packCard(3, 1)),
+                         2 + 2 + 2 * 4 + 4)
+        # two fifteens, a run of four and a flush of five
+        # TEST
+        self.assertEqual(cribbageScore(run, packCard(12, 0)), 4 + 4 + 5)
+        # TEST
+        self.assertEqual(cribbageScore(run[:3]), 3)
+
+    def test_estimate(self):
+        pair = self._pack([(3, 0), (3, 1)])
+        # TEST
+        self.assertTrue(pokerEstimate(pair) > 2)
+        # TEST
+        self.assertTrue(pokerEstimate(pair) > pokerEstimate(pair[:1]))
+        # TEST
+        self.assertEqual(pokerEstimate(pair + self._pack(
+            [(3, 2), (5, 0), (5, 1)])), 25)
+
+    def test_advisor(self):
+        # a line of three cells, scored as poker lines
+        advisor = SquareAdvisor([(0, 1, 2), (3, 4, 5)], pokerEstimate)
+        board = self._pack([(3, 0), (7, 1)]) + [None] + \
+            self._pack([(9, 2)]) + [None, None]
+        advice = advisor.advise(board, packCard(9, 0), [packCard(1, 3)])
+        # the nine goes with the nine
+        # TEST
+        self.assertEqual([cell for value, cell in advice], [4, 5, 2])
+        # with no cards to come, the value of the board
+        advice = advisor.advise(board, packCard(9, 0), [])
+        # TEST
+        self.assertEqual(advice[0][1], 4)
+        # TEST
+        self.assertAlmostEqual(advice[0][0], pokerEstimate(board[:2]) +
+                               pokerEstimate(self._pack([(9, 2), (9, 0)])))
+
+
+class MontanaSolverTests(unittest.TestCase):
+    # four rows of four cards (2 to 5) and a gap, as Pretzel
+    def _won(self):
+        grid = []
+        for suit in range(4):
+            grid += [(rank, suit) for rank in range(1, 5)] + [None]
+        return grid
+
+    def test_solve(self):
+        solver = MontanaSolver(4, 5, (1, 2, 3, 4))
+        grid = self._won()
+        # TEST
+        self.assertEqual(solver.solve(grid), ('solved', []))
+        grid[18], grid[19] = None, grid[18]
+        # TEST
+        self.assertEqual(solver.getSequenced(grid), 15)
+        # TEST
+        self.assertEqual(solver.solve(grid, redeal=False),
+                         ('solved', [(19, 18)]))
+        # the five of the last row in the gap of the row above
+        grid = self._won()
+        grid[14], grid[18] = grid[18], None
+        # TEST
+        self.assertEqual(solver.getMoves(grid), [(14, 18)])
+        # all gaps on the right of fives
+        grid = self._won()
+        grid[17], grid[18], grid[19] = grid[18], None, grid[17]
+        # TEST
+        self.assertEqual(solver.getMoves(grid), [])
+        # TEST
+        self.assertEqual(solver.solve(grid), ('unsolved', []))
+
+    def test_rules(self):
+        grid = self._won()
+        grid[1], grid[4] = None, grid[1]
+        # TEST
+        self.assertEqual(MontanaSolver(4, 5, (1, 2, 3, 4)).getMoves(grid),
+                         [(4, 1)])
+        # any suit
+        # TEST
+        self.assertEqual(sorted(MontanaSolver(
+            4, 5, (1, 2, 3, 4), 'any_suit').getMoves(grid)),
+            [(4, 1), (6, 1), (11, 1), (16, 1)])
+        # any higher card
+        # TEST
+        self.assertEqual(sorted(MontanaSolver(
+            4, 5, (1, 2, 3, 4), 'higher').getMoves(grid)),
+            [(2, 1), (3, 1), (4, 1)])
+        # or a card on the left of the next one
+        grid[2], grid[9] = None, grid[2]
+        # TEST
+        self.assertEqual(MontanaSolver(4, 5, (1, 2, 3, 4)).getMoves(grid),
+                         [(4, 1)])
+        # TEST
+        self.assertEqual(sorted(MontanaSolver(
+            4, 5, (1, 2, 3, 4), 'both_sides').getMoves(grid)),
+            [(4, 1), (9, 2)])
+
+    def test_intractable(self):
+        grid = self._won()
+        for i in (3, 8, 13, 18):
+            grid[i], grid[i+1] = None, grid[i]
+        solver = MontanaSolver(4, 5, (1, 2, 3, 4), max_iters=1)
+        # the moves to the first gap are seen, and put one card in
+        # sequence
+        # TEST
+        self.assertEqual(solver.solve(grid), ('intractable', [(4, 3)]))
+        # TEST
+        self.assertEqual(MontanaSolver(4, 5, (1, 2, 3, 4)).solve(grid)[0],
+                         'solved')
+
+
+class PairingSolverTests(unittest.TestCase):
+    def test_accordion(self):
+        solver = PairingSolver('accordion')
+        line = [(0, 0), (1, 0)]
+        # TEST
+        self.assertEqual(solver.solve(line), ('solved', [(1, 0)]))
+        # TEST
+        self.assertEqual(solver.solve(line, final=(1, 0)),
+                         ('solved', [(1, 0)]))
+        # the ace has to be left, but can only be covered
+        # TEST
+        self.assertEqual(solver.solve(line, final=(0, 0)), ('unsolved', []))
+        solver = PairingSolver('relaxed_accordion')
+        # TEST
+        self.assertEqual(solver.solve(line, final=(0, 0)),
+                         ('solved', [(0, 1)]))
+
+    def test_push_pin(self):
+        solver = PairingSolver('push_pin')
+        # TEST
+        self.assertEqual(solver.solve([(0, 0), (5, 1), (3, 0)]),
+                         ('solved', [(1, None)]))
+        # TEST
+        self.assertEqual(solver.solve([(0, 0), (5, 1)], [(3, 0)]),
+                         ('solved', [(-1, None), (1, None)]))
+        # TEST
+        self.assertEqual(solver.solve([(0, 0), (5, 1), (3, 2)]),
+                         ('unsolved', []))
+
+    def test_runs(self):
+        solver = PairingSolver('decade')
+        # TEST
+        self.assertEqual(solver.solve([(2, 0), (6, 1), (1, 2)]),
+                         ('unsolved', []))
+        # all three make 20; the first two would leave the king
+        # TEST
+        self.assertEqual(solver.solve([(2, 0), (6, 1), (12, 2)]),
+                         ('solved', [(0, 2)]))
+        solver = PairingSolver('seven_up')
+        # TEST
+        self.assertEqual(solver.solve([(6, 0)]), ('solved', [(0, None)]))
+        # runs of up to four cards: 1 + 1 + 1 + 1 + 3 is no good
+        # TEST
+        self.assertEqual(solver.solve([(0, 0), (0, 1), (0, 2), (0, 3),
+                                       (2, 0)]), ('unsolved', []))
+        # TEST
+        self.assertEqual(solver.solve([(0, 0), (1, 0), (2, 0), (0, 1)]),
+                         ('solved', [(0, 3)]))
+
+    def test_monte_carlo(self):
+        grid = [None] * 25
+        grid[0], grid[6], grid[24] = (4, 0), (4, 1), (9, 0)
+        talon = [(9, 1)]
+        solver = PairingSolver('monte_carlo')
+        # the nines meet after a deal
+        # TEST
+        self.assertEqual(solver.solve(grid, talon),
+                         ('solved', [(0, 6), (-1, None), (0, 1)]))
+        # TEST
+        self.assertEqual(PairingSolver('monte_carlo', max_iters=1).solve(
+            grid, talon), ('intractable', []))
+        # TEST
+        self.assertEqual(solver.solve(grid, [(8, 1)]), ('unsolved', []))
+        # a pair can be anywhere, and the gaps are filled at once
+        grid[6], grid[12] = None, (4, 1)
+        # TEST
+        self.assertEqual(PairingSolver('simple_carlo').solve(grid, talon),
+                         ('solved', [(0, 12), (0, 1)]))
+        # kings go alone, the others in pairs of 13
+        grid[0], grid[12], grid[24] = (12, 0), (3, 1), (8, 1)
+        # TEST
+        self.assertEqual(PairingSolver('neighbour').solve(grid),
+                         ('solved', [(0, None), (0, 1)]))
+
+
+class PeggedSolverTests(unittest.TestCase):
+    SQUARE_STEPS = ((-4, 0), (4, 0), (0, -4), (0, 4))
+    TRIANGLE_STEPS = ((-2, -4), (-2, 4), (-4, 0), (4, 0), (2, -4), (2, 4))
+
+    def _board(self, rows):
+        # the positions of a board as laid out by Pegged.createGame()
+        m = max(rows)
+        return [(m - r + 2 * j, 2 * i)
+                for i, r in enumerate(rows) for j in range(r)]
+
+    def test_line(self):
+        solver = PeggedSolver(self._board((3,)), self.SQUARE_STEPS)
+        # TEST
+        self.assertEqual(solver.solve([0, 1]), ('solved', [(0, 2)]))
+        # TEST
+        self.assertEqual(solver.solve([0, 1], 2), ('solved', [(0, 2)]))
+        # TEST
+        self.assertEqual(solver.solve([0, 1], 0), ('unsolved', []))
+        # TEST
+        self.assertEqual(solver.solve([0, 2]), ('unsolved', []))
+
+    def test_symmetries(self):
+        solver = PeggedSolver(self._board((3, 3, 7, 7, 7, 3, 3)),
+                              self.SQUARE_STEPS)
+        # TEST
+        self.assertEqual(len(solver.symmetries), 8)
+        # the mirror images of a peg in a corner
+        keys = set(solver.getKey(1 << i)
+                   for i in (0, 2, 6, 12, 20, 26, 30, 32))
+        # TEST
+        self.assertEqual(len(keys), 1)
+        # TEST
+        self.assertNotEqual(solver.getKey(1 << 0, 0), solver.getKey(1 << 2, 0))
+        solver = PeggedSolver(self._board((1, 2, 3, 4, 5)),
+                              self.TRIANGLE_STEPS)
+        # TEST
+        self.assertEqual(len(solver.symmetries), 6)
+        # TEST
+        self.assertEqual(solver.getKey(1 << 0), solver.getKey(1 << 14))
+
+    def test_triangle(self):
+        board = self._board((1, 2, 3, 4, 5))
+        solver = PeggedSolver(board, self.TRIANGLE_STEPS)
+        pegs = set(range(15)) - set([4])
+        # TEST
+        self.assertEqual(solver.solve(pegs, 4), ('unsolved', []))
+        state, moves = solver.solve(pegs)
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(len(moves), 13)
+        for i, k in moves:
+            (xi, yi), (xk, yk) = board[i], board[k]
+            over = board.index(((xi + xk) // 2, (yi + yk) // 2))
+            # TEST
+            self.assertTrue(i in pegs and over in pegs and k not in pegs)
+            pegs -= set([i, over])
+            pegs.add(k)
+        # TEST
+        self.assertEqual(len(pegs), 1)
+
+    def test_intractable(self):
+        solver = PeggedSolver(self._board((3, 3, 7, 7, 7, 3, 3)),
+                              self.SQUARE_STEPS, max_iters=10)
+        pegs = set(range(33)) - set([16])
+        # TEST
+        self.assertEqual(solver.solve(pegs), ('intractable', []))
+
+
+class SlidingPuzzleSolverTests(unittest.TestCase):
+    # a 4x4 board 18 moves from home
+    BOARD = [4, 0, 6, 2, 8, 15, 1, 3, 5, 14, 10, 7, 12, 9, 13, 11]
+
+    def _play(self, size, tiles, moves):
+        tiles = list(tiles)
+        blank = tiles.index(size * size - 1)
+        for p in moves:
+            # TEST
+            self.assertEqual(abs(p // size - blank // size) +
+                             abs(p % size - blank % size), 1)
+            tiles[blank], tiles[p] = tiles[p], tiles[blank]
+            blank = p
+        return tiles
+
+    def _scramble(self, size, seed):
+        rnd = random.Random(seed)
+        solver = SlidingPuzzleSolver(size)
+        tiles = list(range(size * size))
+        blank = len(tiles) - 1
+        for i in range(1000):
+            p = rnd.choice(solver.neighbours[blank])
+            tiles[blank], tiles[p] = tiles[p], tiles[blank]
+            blank = p
+        return tiles
+
+    def test_optimal(self):
+        solver = SlidingPuzzleSolver(4)
+        # TEST
+        self.assertEqual(solver.solve(list(range(16))), ('solved', []))
+        # TEST
+        self.assertEqual(solver.solve([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11,
+                                       12, 13, 15, 14]),
+                         ('solved', [15]))
+        state, moves = solver.solve(self.BOARD)
+        # TEST
+        self.assertEqual(state, 'solved')
+        # TEST
+        self.assertEqual(len(moves), 18)
+        # TEST
+        self.assertEqual(self._play(4, self.BOARD, moves), list(range(16)))
+
+    def test_unsolvable(self):
+        tiles = [1, 0] + list(range(2, 16))
+        # TEST
+        self.assertFalse(SlidingPuzzleSolver.isSolvable(tiles))
+        # TEST
+        self.assertEqual(SlidingPuzzleSolver(4).solve(tiles),
+                         ('unsolved', []))
+
+    def test_pattern_db(self):
+        pdb = PatternDatabase(3)
+        pdb.build()
+        solver = SlidingPuzzleSolver(3)
+        for seed in range(5):
+            tiles = self._scramble(3, seed)
+            index, h = pdb.getIndex(tiles)
+            state, moves = solver.solve(tiles)
+            # TEST
+            self.assertTrue(h <= len(moves))
+            solver2 = SlidingPuzzleSolver(3, pattern_db=pdb)
+            state2, moves2 = solver2.solve(tiles)
+            # TEST
+            self.assertEqual((state2, len(moves2)), (state, len(moves)))
+            # TEST
+            self.assertEqual(self._play(3, tiles, moves2), list(range(9)))
+            # the weighted search, at most half as long again
+            state2, moves2 = solver2._searchPatterns(tiles, 100000, 1.5)
+            # TEST
+            self.assertTrue(len(moves) <= len(moves2) <= 1.5 * len(moves))
+            # TEST
+            self.assertEqual(self._play(3, tiles, moves2), list(range(9)))
+
+    def test_reduced(self):
+        for size in (4, 5, 7, 10):
+            tiles = self._scramble(size, size)
+            solver = SlidingPuzzleSolver(size, max_nodes=0)
+            state, moves = solver.solve(tiles)
+            # TEST
+            self.assertEqual(state, 'solved')
+            # TEST
+            self.assertEqual(self._play(size, tiles, moves),
+                             list(range(size * size)))
@@ -0,0 +1,108 @@
+import collections
+import itertools
+import unittest
+
+from .common_mocks import new_headless_game
+
+
+class SquaresTests(unittest.TestCase):
+    def _poker_score(self, cards):
+        # the score of a line by counting its ranks and suits
+        ranks = sorted(c.rank for c in cards)
+        counts = sorted(collections.Counter(ranks).values(), reverse=True)
+        counts += [0, 0]
+        flush = len(cards) == 5 and len(set(c.suit for c in cards)) == 1
+        straight = len(cards) == 5 and counts[0] == 1 and \
+            (ranks[4] - ranks[0] == 4 or ranks == [0, 9, 10, 11, 12])
+        if flush and straight:
+            return 100 if ranks[0] == 0 and ranks[4] == 12 else 75
+        for ok, value in ((counts[0] == 4, 50),
+                          (counts[:2] == [3, 2], 25),
+                          (flush, 20), (straight, 15),
+                          (counts[0] == 3, 10),
+                          (counts[:2] == [2, 2], 5),
+                          (counts[0] == 2, 2)):
+            if ok:
+                return value
+        return 0
+
+    def _cribbage_score(self, cards, upcard):
+        # the score of a line by counting over all choices of its cards
+        score = 0
+        if len(cards) == 4 and len(set(c.suit for c in cards)) == 1:
+            score += 4
+            if upcard and upcard.suit == cards[0].suit:
+                score += 1
+        if upcard:
+            score += len([c for c in cards
+                          if c.rank == 10 and c.suit == upcard.suit])
+            cards = cards + [upcard]
+        runs = {}
+        for n in range(2, len(cards) + 1):
+            for c in itertools.combinations(cards, n):
+                if sum(min(x.rank + 1, 10) for x in c) == 15:
+                    score += 2
+                ranks = sorted(x.rank for x in c)
+                if n == 2 and ranks[0] == ranks[1]:
+                    score += 2
+                if n >= 3 and ranks == list(range(ranks[0], ranks[0] + n)):
+                    runs[n] = runs.get(n, 0) + 1
+        if runs:
+            n = max(runs)
+            score += n * runs[n]
+        return score
+
+    def _check_scores(self, game):
+        for hand in game.poker_hands if hasattr(game, 'poker_hands') \
+                else game.cribbage_hands:
+            cards = [s.cards[0] for s in hand if s.cards]
+            if hasattr(game, 'poker_hands'):
+                # TEST
+                self.assertEqual(game.getHandScore(hand)[1],
+                                 self._poker_score(cards))
+            else:
+                upcard = None
+                if game.isBoardFull():
+                    upcard = game.getUpcardStack().cards[0]
+                # TEST
+                self.assertEqual(game.getHandScore(hand),
+                                 self._cribbage_score(cards, upcard))
+
+    def _play_hints(self, game):
+        while True:
+            self._check_scores(game)
+            hints = game.getHints(0)
+            if not hints:
+                break
+            empty = [r for r in game.s.rows if not r.cards]
+            # TEST
+            self.assertEqual(sorted(h[4].id for h in hints),
+                             [r.id for r in empty])
+            hint = hints[0]
+            # TEST
+            self.assertTrue(hint[4].acceptsCards(hint[3], hint[3].cards[-1:]))
+            hint[3].playMoveMove(1, hint[4])
+        # TEST
+        self.assertTrue(game.isBoardFull())
+        return game.getGameScore()
+
+    def test_poker_square(self):
+        scores = [self._play_hints(new_headless_game(gameid, seed))
+                  for gameid in (139, 799) for seed in ('1', '2', '3')]
+        # the advisor does a lot better than the 12 points or so of
+        # putting the cards anywhere
+        # TEST
+        self.assertTrue(sum(scores) / len(scores) > 60)
+
+    def test_cribbage_square(self):
+        scores = [self._play_hints(new_headless_game(gameid, seed))
+                  for gameid in (805, 808) for seed in ('1', '2', '3')]
+        # TEST
+        self.assertTrue(sum(scores) / len(scores) > 40)
+
+    def test_shuffle(self):
+        for gameid in (140, 817, 809):
+            game = new_headless_game(gameid)
+            self._check_scores(game)
+            # TEST
+            self.assertEqual(game.getHints(0), None)
@@ -0,0 +1,88 @@
+import unittest
+
+from pysollib.hint import FreeCellSolver_Hint
+from pysollib.zobrist import ZOBRIST_MASK, zobristStackHash
+
+from .common_mocks import new_headless_game
+
+
+class ZobristTests(unittest.TestCase):
+    def _full_hash(self, game):
+        h = 0
+        for stack in game.allstacks:
+            h += zobristStackHash(stack.zobrist_group, stack.cards)
+        return h & ZOBRIST_MASK
+
+    def _play(self, game, nmoves):
+        played = 0
+        for i in range(nmoves):
+            hints = game.getHints(2)
+            if not hints:
+                break
+            score, pos, ncards, from_stack, to_stack, color, forced = \
+                hints[0]
+            if ncards == 0:
+                game.dealCards()
+            elif from_stack is to_stack:
+                from_stack.playFlipMove()
+            else:
+                from_stack.playMoveMove(ncards, to_stack)
+            game.finishMove()
+            played += 1
+            # TEST
+            self.assertEqual(game.getSnapshot(), self._full_hash(game))
+        return played
+
+    def test_incremental_klondike(self):
+        game = new_headless_game(2)
+        start = game.getSnapshot()
+        # TEST
+        self.assertEqual(start, self._full_hash(game))
+        played = self._play(game, 20)
+        # TEST
+        self.assertTrue(played > 0)
+        while game.moves.index > 0:
+            game.undo()
+        # TEST
+        self.assertEqual(game.getSnapshot(), start)
+
+    def test_same_position_same_hash(self):
+        g1 = new_headless_game(2, '12345')
+        g2 = new_headless_game(2, '12345')
+        # TEST
+        self.assertEqual(g1.getSnapshot(), g2.getSnapshot())
+        self._play(g1, 1)
+        # TEST
+        self.assertNotEqual(g1.getSnapshot(), g2.getSnapshot())
+
+    def test_similar_stacks_permuted(self):
+        # FreeCell: a card in either free cell gives the same hash,
+        # but not the same card back in a tableau row
+        game = new_headless_game(8, '24')
+        row = game.s.rows[0]
+        cell1, cell2 = game.s.reserves[0], game.s.reserves[1]
+        card = row.cards[-1]
+        game.moveMove(1, row, cell1, frames=0)
+        h = game.getSnapshot()
+        game.moveMove(1, cell1, cell2, frames=0)
+        # TEST
+        self.assertEqual(game.getSnapshot(), h)
+        game.moveMove(1, row, cell1, frames=0)
+        # TEST
+        self.assertNotEqual(game.getSnapshot(), h)
+        # TEST
+        self.assertIs(cell2.cards[-1], card)
+        # TEST
+        self.assertEqual(game.getSnapshot(), self._full_hash(game))
+
+    def test_imported_board(self):
+        # importing a board reorders the talon in place
+        game = new_headless_game(8)
+        solver = FreeCellSolver_Hint(game, None)
+        with open('tests/unit/data/with-10-for-rank.txt', 'r+b') as fh:
+            game.newGame(
+                dealer=lambda: solver.importFileHelper(fh, game))
+        # TEST
+        self.assertFalse(game.s.talon.cards)
+        # TEST
+        self.assertEqual(game.getSnapshot(), self._full_hash(game))